@@ -1,191 +1,1026 @@
-from flask import Flask, jsonify, request
+import gzip
+import json
+import logging
+import mmap
+import os
+import queue
+import random
+import re
+import sqlite3
+import threading
+import time
+import urllib.request
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar, copy_context
+from datetime import datetime, timezone
+
+from flask import Flask, Response, request
 import cloudscraper
 from bs4 import BeautifulSoup
 
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
 app = Flask(__name__)
+logger = logging.getLogger(__name__)
 
-BASE_URL = "https://www.hltv.org"
+# 可指向 HLTV 镜像, 或保存了 HLTV 页面的本地服务器 (离线基准测试, 见 bench.py)
+BASE_URL = os.environ.get("HLTV_BASE_URL", "https://www.hltv.org").rstrip("/")
 
-def get_scraper():
-    return cloudscraper.create_scraper(
-        browser={
-            'browser': 'chrome',
-            'platform': 'windows',
-            'desktop': True
-        }
+# ========== 响应格式 ==========
+# 客户端可通过 fields=a,b,c 只取需要的字段, 通过 Accept: application/msgpack 使用 MessagePack 编码;
+# 响应体超过 GZIP_MIN_SIZE 且客户端支持时使用 gzip 压缩
+MSGPACK_TYPES = ("application/msgpack", "application/x-msgpack")
+GZIP_MIN_SIZE = 1024
+_FIELD_NAME = re.compile(r"^[A-Za-z0-9_]+$")
+
+
+def requested_fields():
+    """解析 fields 参数, 未指定时返回 None"""
+    raw = request.args.get("fields", "")
+    fields = tuple(f for f in (p.strip() for p in raw.split(",")) if _FIELD_NAME.match(f))
+    return fields or None
+
+
+def project(data, fields):
+    """字段投影: 列表中的每一项 (或单个对象) 只保留 fields 中的字段"""
+    if not fields:
+        return data
+    if isinstance(data, dict):
+        return {k: data[k] for k in fields if k in data}
+    if isinstance(data, list):
+        return [project(item, fields) if isinstance(item, dict) else item for item in data]
+    return data
+
+
+def response_format():
+    """协商响应格式, 返回 (是否 msgpack, 是否 gzip)"""
+    use_msgpack = False
+    if msgpack is not None:
+        best = request.accept_mimetypes.best_match(("application/json",) + MSGPACK_TYPES)
+        use_msgpack = best in MSGPACK_TYPES
+    use_gzip = "gzip" in request.headers.get("Accept-Encoding", "")
+    return use_msgpack, use_gzip
+
+
+def encode_body(payload, use_msgpack=False, use_gzip=False):
+    """编码响应体, 返回 (body, mimetype, content_encoding)"""
+    if use_msgpack:
+        body, mimetype = msgpack.packb(payload, use_bin_type=True), MSGPACK_TYPES[0]
+    else:
+        body, mimetype = json.dumps(payload, ensure_ascii=False).encode("utf-8"), "application/json"
+    if use_gzip and len(body) >= GZIP_MIN_SIZE:
+        return gzip.compress(body, 6), mimetype, "gzip"
+    return body, mimetype, None
+
+
+def build_response(body, mimetype, encoding, status=200, headers=None):
+    headers = dict(headers or {})
+    headers["Vary"] = "Accept, Accept-Encoding"
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(body, status=status, mimetype=mimetype, headers=headers)
+
+
+def respond(payload, status=200):
+    """按请求的字段和格式返回数据"""
+    if "data" in payload:
+        payload = dict(payload, data=project(payload["data"], requested_fields()))
+    body, mimetype, encoding = encode_body(payload, *response_format())
+    return build_response(body, mimetype, encoding, status)
+
+
+# ========== 链路追踪 ==========
+# 每个请求记录一个根 span, 每次抓取 HLTV 页面和解析页面各记录一个子 span。
+# 请求带有 traceparent 头 (插件发送) 时沿用其追踪 ID 和采样决定, 否则按 HLTV_TRACE_SAMPLE 采样;
+# 采样的 span 由后台线程批量写入 HLTV_TRACE_FILE (JSON Lines) 或发送到 HLTV_OTLP_ENDPOINT (OTLP/HTTP JSON)。
+# 各步骤耗时总是通过 Server-Timing 响应头返回 (插件记录在客户端 span 上)。
+TRACE_FILE = os.environ.get("HLTV_TRACE_FILE", "")
+TRACE_OTLP_ENDPOINT = os.environ.get("HLTV_OTLP_ENDPOINT", "")
+TRACE_SAMPLE_RATE = float(os.environ.get("HLTV_TRACE_SAMPLE", 0))
+TRACE_EXPORT = bool(TRACE_FILE or TRACE_OTLP_ENDPOINT)
+TRACE_SERVICE = "hltv-api-server"
+_TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+_OTLP_KINDS = {"internal": 1, "server": 2, "client": 3}
+
+
+class RequestTrace:
+    """一次请求 (或一次快照抓取) 的追踪状态"""
+
+    def __init__(self, trace_id, sampled):
+        self.trace_id = trace_id
+        self.sampled = sampled
+        # 进行中的 span: [span_id, parent_id, 名称, 类型, 开始时间, 计时起点, 属性]
+        self.stack = []
+        self.spans = []
+        # 步骤名称 -> 累计毫秒 (Server-Timing)
+        self.timings = {}
+        # 分支 (见 branch) 中顶层 span 的父 span
+        self.parent_id = None
+
+    def open(self, name, kind="internal", parent_id=None, attributes=None):
+        if parent_id is None:
+            parent_id = self.stack[-1][0] if self.stack else self.parent_id
+        span = [f"{random.getrandbits(64):016x}", parent_id, name, kind, time.time(), time.perf_counter(), attributes or {}]
+        self.stack.append(span)
+        return span[6]
+
+    def close(self, error=None):
+        span_id, parent_id, name, kind, start, t0, attributes = self.stack.pop()
+        duration_ms = (time.perf_counter() - t0) * 1000
+        # 根 span 在 Server-Timing 中记为 total
+        step = "total" if kind == "server" else name
+        self.timings[step] = self.timings.get(step, 0) + duration_ms
+        if self.sampled:
+            self.spans.append({
+                "trace_id": self.trace_id,
+                "span_id": span_id,
+                "parent_id": parent_id,
+                "name": name,
+                "kind": kind,
+                "service": TRACE_SERVICE,
+                "start": start,
+                "duration_ms": round(duration_ms, 3),
+                "attributes": attributes,
+                "error": error,
+            })
+
+    def branch(self):
+        """并发子任务使用的分支: 同一追踪, 顶层 span 挂在当前 span 下; 子任务完成后用 merge 合并"""
+        branch = RequestTrace(self.trace_id, self.sampled)
+        branch.parent_id = self.stack[-1][0] if self.stack else self.parent_id
+        return branch
+
+    def merge(self, branch):
+        self.spans.extend(branch.spans)
+        for step, ms in branch.timings.items():
+            self.timings[step] = self.timings.get(step, 0) + ms
+
+    def server_timing(self):
+        return ", ".join(f"{name};dur={ms:.1f}" for name, ms in self.timings.items())
+
+
+_current_trace = ContextVar("hltv_trace", default=None)
+
+
+def begin_trace(name, traceparent=None, **attributes):
+    """开始一条追踪 (根 span)"""
+    parent_id = None
+    sampled = TRACE_SAMPLE_RATE > 0 and random.random() < TRACE_SAMPLE_RATE
+    match = _TRACEPARENT.match(traceparent or "")
+    if match:
+        trace_id, parent_id, flags = match.groups()
+        sampled = bool(int(flags, 16) & 1)
+    else:
+        trace_id = f"{random.getrandbits(128):032x}"
+    trace = RequestTrace(trace_id, sampled and TRACE_EXPORT)
+    trace.open(name, "server", parent_id, attributes)
+    _current_trace.set(trace)
+    return trace
+
+
+def end_trace(error=None):
+    """结束当前追踪并导出采样的 span"""
+    trace = _current_trace.get()
+    if trace is None:
+        return None
+    _current_trace.set(None)
+    while trace.stack:
+        trace.close(error)
+    if trace.spans:
+        trace_exporter.submit(trace.spans)
+    return trace
+
+
+@contextmanager
+def trace_span(name, **attributes):
+    """在当前追踪中记录一个子 span, 产出属性字典 (没有追踪时为临时字典)"""
+    trace = _current_trace.get()
+    if trace is None:
+        yield attributes
+        return
+    attributes = trace.open(name, attributes=attributes)
+    error = None
+    try:
+        yield attributes
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        trace.close(error)
+
+
+def submit_traced(executor, fn, *args):
+    """提交到线程池并传递当前上下文; 任务中的 span 记录在追踪分支上, 返回 (分支, future)
+
+    各任务使用独立的分支 (span 栈不在线程间共用), 结果取回后由调用方 merge 到当前追踪。
+    """
+    trace = _current_trace.get()
+    branch = trace.branch() if trace is not None else None
+    context = copy_context()
+    context.run(_current_trace.set, branch)
+    return branch, executor.submit(context.run, fn, *args)
+
+
+@contextmanager
+def traced_run(name, **attributes):
+    """后台任务 (快照抓取) 的追踪, 按 HLTV_TRACE_SAMPLE 采样"""
+    begin_trace(name, **attributes)
+    error = None
+    try:
+        yield
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        end_trace(error)
+
+
+def otlp_payload(spans):
+    def value(v):
+        if isinstance(v, bool):
+            return {"boolValue": v}
+        if isinstance(v, int):
+            return {"intValue": str(v)}
+        if isinstance(v, float):
+            return {"doubleValue": v}
+        return {"stringValue": str(v)}
+
+    return {"resourceSpans": [{
+        "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": TRACE_SERVICE}}]},
+        "scopeSpans": [{"scope": {"name": "hltv-api-server"}, "spans": [{
+            "traceId": s["trace_id"],
+            "spanId": s["span_id"],
+            "parentSpanId": s["parent_id"] or "",
+            "name": s["name"],
+            "kind": _OTLP_KINDS.get(s["kind"], 1),
+            "startTimeUnixNano": str(int(s["start"] * 1e9)),
+            "endTimeUnixNano": str(int(s["start"] * 1e9 + s["duration_ms"] * 1e6)),
+            "attributes": [{"key": k, "value": value(v)} for k, v in s["attributes"].items()],
+            "status": {"code": 2, "message": s["error"]} if s["error"] else {"code": 1},
+        } for s in spans]}],
+    }]}
+
+
+class TraceExporter:
+    """后台线程批量导出 span, 请求线程只负责放入队列 (队列满时丢弃)"""
+
+    BATCH_SIZE = 512
+    FLUSH_INTERVAL = 2
+
+    def __init__(self, path="", otlp_endpoint=""):
+        self.path = path
+        endpoint = otlp_endpoint.rstrip("/")
+        self.otlp_url = endpoint if not endpoint or endpoint.endswith("/v1/traces") else f"{endpoint}/v1/traces"
+        self.queue = queue.Queue(maxsize=10000)
+        self.dropped = 0
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def submit(self, spans):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="hltv-trace-export", daemon=True)
+                    self._thread.start()
+        for span in spans:
+            try:
+                self.queue.put_nowait(span)
+            except queue.Full:
+                self.dropped += 1
+
+    def _run(self):
+        while True:
+            batch = [self.queue.get()]
+            deadline = time.monotonic() + self.FLUSH_INTERVAL
+            while len(batch) < self.BATCH_SIZE and time.monotonic() < deadline:
+                try:
+                    batch.append(self.queue.get(timeout=max(0.0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            try:
+                self.export(batch)
+            except Exception as e:
+                logger.warning(f"导出追踪数据失败 ({len(batch)} 个 span): {e}")
+
+    def export(self, spans):
+        if self.path:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write("".join(json.dumps(s, ensure_ascii=False) + "\n" for s in spans))
+        if self.otlp_url:
+            req = urllib.request.Request(
+                self.otlp_url,
+                data=json.dumps(otlp_payload(spans)).encode("utf-8"),
+                headers={"Content-Type": "application/json"},
+                method="POST",
+            )
+            urllib.request.urlopen(req, timeout=10).close()
+
+
+trace_exporter = TraceExporter(TRACE_FILE, TRACE_OTLP_ENDPOINT)
+
+
+@app.before_request
+def _begin_request_trace():
+    begin_trace(f"{request.method} {request.path}", request.headers.get("traceparent"), **{
+        "http.target": request.full_path.rstrip("?"),
+    })
+
+
+@app.after_request
+def _end_request_trace(response):
+    trace = end_trace(f"HTTP {response.status_code}" if response.status_code >= 500 else None)
+    if trace is not None:
+        response.headers["Server-Timing"] = trace.server_timing()
+    return response
+
+
+def fetch_soup(scraper, url, step, **attributes):
+    """抓取并解析 HLTV 页面, 抓取和解析分别记录为 fetch.<step> / parse.<step>"""
+    with trace_span(f"fetch.{step}", url=url, **attributes) as span:
+        resp = scraper.get(url, timeout=15)
+        span["http.status_code"] = resp.status_code
+        resp.raise_for_status()
+    with trace_span(f"parse.{step}", bytes=len(resp.content)):
+        return BeautifulSoup(resp.text, "html.parser")
+
+
+# ========== 快照模式 ==========
+# 设置 HLTV_SNAPSHOT_DIR 后, 后台任务按计划抓取全局数据 (比赛/排名/结果/赛事) 并写入带版本号的 JSON 快照,
+# 请求直接返回内存映射的快照内容, 不再逐请求抓取和解析; 选手/战队查询仍按需抓取。
+SNAPSHOT_DIR = os.environ.get("HLTV_SNAPSHOT_DIR", "")
+# 为 0 时只读取快照, 不运行抓取任务 (由其他进程负责抓取)
+SNAPSHOT_SCHEDULER = os.environ.get("HLTV_SNAPSHOT_SCHEDULER", "1") != "0"
+# 各数据集的抓取间隔 (秒)
+SNAPSHOT_INTERVALS = {
+    "matches": int(os.environ.get("HLTV_SNAPSHOT_MATCHES_INTERVAL", 60)),
+    "results": int(os.environ.get("HLTV_SNAPSHOT_RESULTS_INTERVAL", 300)),
+    "rankings": int(os.environ.get("HLTV_SNAPSHOT_RANKINGS_INTERVAL", 3600)),
+    "events": int(os.environ.get("HLTV_SNAPSHOT_EVENTS_INTERVAL", 3600)),
+}
+# 抓取失败后的重试间隔 (秒)
+SNAPSHOT_RETRY = 60
+# 每个数据集保留的历史版本数
+SNAPSHOT_KEEP = 3
+# 快照中保存的排名条数 (请求的 limit 更小时从快照中截取)
+SNAPSHOT_RANKING_LIMIT = 100
+
+
+class Snapshot:
+    """一个数据集的一个版本 (内存映射的 JSON 文件)"""
+
+    def __init__(self, name, version, created, path):
+        self.name = name
+        self.version = version
+        self.created = created
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._data = None
+        # (参数名, 值) -> 预先序列化的响应体, 同一版本同一参数只序列化一次
+        self._variants = {}
+        self._lock = threading.Lock()
+
+    @property
+    def age(self):
+        return max(0, int(time.time() - self.created))
+
+    def body(self):
+        return self._mm[:]
+
+    def variant(self, key, build):
+        """按参数筛选/编码后的响应 (首次请求时解析快照并缓存 build 的结果)"""
+        result = self._variants.get(key)
+        if result is None:
+            with self._lock:
+                if self._data is None:
+                    self._data = json.loads(self._mm[:])
+                result = build(self._data)
+                if len(self._variants) < 64:
+                    self._variants[key] = result
+        return result
+
+
+class SnapshotStore:
+    """快照目录
+
+    每个数据集的每个版本写入 ``<name>.<version>.json``, ``manifest.json`` 记录各数据集的当前版本。
+    文件先写入临时文件再原子重命名, 读取方 (可能是其他进程) 只会看到完整的快照。
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.manifest_path = os.path.join(directory, "manifest.json")
+        os.makedirs(directory, exist_ok=True)
+        self._snapshots = {}
+        self._manifest_mtime = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def _read_manifest(self):
+        try:
+            with open(self.manifest_path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _refresh(self):
+        # 每秒最多检查一次 manifest 是否变化
+        now = time.monotonic()
+        if now - self._checked_at < 1:
+            return
+        self._checked_at = now
+        try:
+            mtime = os.stat(self.manifest_path).st_mtime_ns
+        except OSError:
+            return
+        if mtime == self._manifest_mtime:
+            return
+        with self._lock:
+            manifest = self._read_manifest()
+            snapshots = dict(self._snapshots)
+            for name, entry in manifest.items():
+                current = snapshots.get(name)
+                if current is not None and current.version == entry["version"]:
+                    continue
+                try:
+                    snapshots[name] = Snapshot(
+                        name, entry["version"], entry["created"], os.path.join(self.directory, entry["file"])
+                    )
+                except OSError as e:
+                    logger.error(f"读取快照失败 {name}: {e}")
+            self._snapshots = snapshots
+            self._manifest_mtime = mtime
+
+    def get(self, name):
+        self._refresh()
+        return self._snapshots.get(name)
+
+    def publish(self, name, data):
+        """写入新版本快照并更新 manifest, 返回版本号"""
+        with self._lock:
+            manifest = self._read_manifest()
+            version = manifest.get(name, {}).get("version", 0) + 1
+            created = time.time()
+            filename = f"{name}.{version:08d}.json"
+            body = {
+                "success": True,
+                "data": data,
+                "snapshot": {
+                    "dataset": name,
+                    "version": version,
+                    "generated_at": datetime.fromtimestamp(created, timezone.utc).isoformat(),
+                },
+            }
+            self._write(filename, json.dumps(body, ensure_ascii=False).encode("utf-8"))
+            manifest[name] = {"version": version, "created": created, "file": filename}
+            self._write("manifest.json", json.dumps(manifest, indent=2).encode("utf-8"))
+            self._prune(name, version)
+        return version
+
+    def _write(self, filename, content):
+        path = os.path.join(self.directory, filename)
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(content)
+        os.replace(tmp, path)
+
+    def _prune(self, name, version):
+        # 删除旧版本 (已映射的旧文件在 POSIX 上仍可读, 直到读取方切换到新版本)
+        for filename in os.listdir(self.directory):
+            parts = filename.split(".")
+            if len(parts) == 3 and parts[0] == name and parts[2] == "json" and parts[1].isdigit():
+                if int(parts[1]) <= version - SNAPSHOT_KEEP:
+                    try:
+                        os.remove(os.path.join(self.directory, filename))
+                    except OSError:
+                        pass
+
+
+snapshot_store = SnapshotStore(SNAPSHOT_DIR) if SNAPSHOT_DIR else None
+
+
+def get_snapshot(name):
+    return snapshot_store.get(name) if snapshot_store else None
+
+
+def snapshot_response(snapshot, key=None, select=None):
+    """直接返回快照内容, 附带快照版本和年龄
+
+    需要筛选 (key/select)、字段投影或其他编码时, 每个版本的每种组合只生成一次响应体。
+    """
+    fields = requested_fields()
+    use_msgpack, use_gzip = response_format()
+    if key is None and fields is None and not use_msgpack and not use_gzip:
+        body, mimetype, encoding = snapshot.body(), "application/json", None
+    else:
+        def build(payload):
+            data = select(payload["data"]) if select else payload["data"]
+            return encode_body(dict(payload, data=project(data, fields)), use_msgpack, use_gzip)
+
+        body, mimetype, encoding = snapshot.variant((key, fields, use_msgpack, use_gzip), build)
+    age = snapshot.age
+    return build_response(body, mimetype, encoding, headers={
+        "Age": str(age),
+        "X-Snapshot-Age": str(age),
+        "X-Snapshot-Version": str(snapshot.version),
+        "Cache-Control": f"public, max-age={max(0, SNAPSHOT_INTERVALS.get(snapshot.name, 60) - age)}",
+    })
+
+
+def run_snapshot_scheduler(store):
+    """后台抓取任务: 按各数据集的间隔抓取并发布快照
+
+    多个进程共用同一个快照目录时, 通过文件锁保证只有一个进程在抓取。
+    """
+    lock_file = open(os.path.join(store.directory, ".scheduler.lock"), "w")
+    if fcntl is not None:
+        while True:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                break
+            except OSError:
+                time.sleep(30)
+
+    scrapers = {
+        "matches": scrape_matches,
+        "results": scrape_results,
+        "rankings": lambda scraper: scrape_rankings(scraper, SNAPSHOT_RANKING_LIMIT),
+        "events": scrape_events,
+    }
+    next_run = {}
+    # 重启后沿用未过期的快照
+    for name, entry in store._read_manifest().items():
+        next_run[name] = entry["created"] + SNAPSHOT_INTERVALS.get(name, 300)
+
+    logger.info(f"快照任务已启动: {store.directory}")
+    while True:
+        for name, scrape in scrapers.items():
+            if time.time() < next_run.get(name, 0):
+                continue
+            start = time.monotonic()
+            try:
+                with traced_run(f"snapshot {name}", dataset=name):
+                    data = scrape(get_scraper())
+                if not data:
+                    # 页面结构变化或被拦截时保留旧快照
+                    raise ValueError("未解析到数据")
+                version = store.publish(name, data)
+                next_run[name] = time.time() + SNAPSHOT_INTERVALS[name]
+                logger.info(f"快照已更新 {name} v{version}: {len(data)} 条, 耗时 {time.monotonic() - start:.1f}s")
+            except Exception as e:
+                next_run[name] = time.time() + SNAPSHOT_RETRY
+                logger.error(f"快照抓取失败 {name}: {e}")
+        time.sleep(1)
+
+
+def start_snapshot_scheduler():
+    thread = threading.Thread(
+        target=run_snapshot_scheduler, args=(snapshot_store,), name="hltv-snapshot", daemon=True
     )
+    thread.start()
+    return thread
+
+# ========== 未找到缓存 ==========
+# 选手/战队搜索没有结果时按归一化名称记住 HLTV_NOT_FOUND_TTL 秒 (0 = 关闭),
+# 期间相同名称 (忽略大小写、空格和标点) 的查询直接返回未找到, 不再请求 HLTV 搜索页
+NOT_FOUND_TTL = int(os.environ.get("HLTV_NOT_FOUND_TTL", 300))
+_NON_WORD = re.compile(r"[^0-9a-z\u4e00-\u9fff]+")
+
+
+class NotFoundCache:
+    """未找到结果的缓存: (类型, 归一化名称) -> 过期时间 (线程安全, 超出上限时淘汰最早写入的)"""
+
+    def __init__(self, ttl, max_size=4096):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.stored = 0
+
+    @staticmethod
+    def key(kind, name):
+        return kind, _NON_WORD.sub("", name.lower())
+
+    def contains(self, kind, name):
+        if self.ttl <= 0:
+            return False
+        key = self.key(kind, name)
+        with self._lock:
+            expires = self._entries.get(key)
+            if expires is None:
+                return False
+            if expires < time.monotonic():
+                del self._entries[key]
+                return False
+            self.hits += 1
+            return True
+
+    def add(self, kind, name):
+        key = self.key(kind, name)
+        if self.ttl <= 0 or not key[1]:
+            return
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = time.monotonic() + self.ttl
+            self.stored += 1
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        return {"ttl": self.ttl, "entries": len(self._entries), "hits": self.hits, "stored": self.stored}
+
+
+class SqliteNotFoundCache:
+    """跨进程共享的未找到缓存 (SQLite), 接口与 NotFoundCache 相同
+
+    多进程部署 (gunicorn) 时各工作进程使用同一个数据库文件, 一个进程确认未找到后其他进程直接命中。
+    连接在每个进程的每个线程第一次使用时创建: fork 前 (preload) 创建的对象不持有连接。
+    """
+
+    def __init__(self, path, ttl):
+        self.path = path
+        self.ttl = ttl
+        self._local = threading.local()
+
+    key = staticmethod(NotFoundCache.key)
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS not_found ("
+                "kind TEXT NOT NULL, name TEXT NOT NULL, expires REAL NOT NULL, PRIMARY KEY (kind, name))"
+            )
+            conn.execute("CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    @staticmethod
+    def _count(conn, name):
+        conn.execute(
+            "INSERT INTO counters (name, value) VALUES (?, 1) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + 1",
+            (name,),
+        )
+
+    def contains(self, kind, name):
+        if self.ttl <= 0:
+            return False
+        conn = self._conn()
+        row = conn.execute(
+            "SELECT expires FROM not_found WHERE kind = ? AND name = ?", self.key(kind, name)
+        ).fetchone()
+        # 时间使用墙上时间, 以便在进程间比较
+        if row is None or row[0] < time.time():
+            return False
+        self._count(conn, "hits")
+        return True
+
+    def add(self, kind, name):
+        key = self.key(kind, name)
+        if self.ttl <= 0 or not key[1]:
+            return
+        conn = self._conn()
+        now = time.time()
+        conn.execute("INSERT OR REPLACE INTO not_found (kind, name, expires) VALUES (?, ?, ?)", (*key, now + self.ttl))
+        conn.execute("DELETE FROM not_found WHERE expires < ?", (now,))
+        self._count(conn, "stored")
+
+    def stats(self):
+        conn = self._conn()
+        counters = dict(conn.execute("SELECT name, value FROM counters").fetchall())
+        entries = conn.execute("SELECT COUNT(*) FROM not_found WHERE expires >= ?", (time.time(),)).fetchone()[0]
+        return {
+            "ttl": self.ttl,
+            "entries": entries,
+            "hits": counters.get("hits", 0),
+            "stored": counters.get("stored", 0),
+            "shared": self.path,
+        }
+
+
+# 设置 HLTV_CACHE_DB 时未找到缓存保存在该 SQLite 文件中, 由同一台机器上的所有工作进程共享
+CACHE_DB = os.environ.get("HLTV_CACHE_DB", "")
+not_found_cache = SqliteNotFoundCache(CACHE_DB, NOT_FOUND_TTL) if CACHE_DB else NotFoundCache(NOT_FOUND_TTL)
+
+
+def not_found_response(label, name, cached=False):
+    """未找到选手/战队的响应 (not_found 标记供插件缓存)"""
+    resp = respond({"success": False, "not_found": True, "error": f"未找到{label} '{name}'"})
+    resp.headers["X-Cache"] = "HIT" if cached else "MISS"
+    return resp
+
+
+# ========== 抓取会话 ==========
+class ScraperPool:
+    """cloudscraper 会话池
+
+    创建会话较慢 (加载浏览器指纹和 TLS 配置), 每个线程第一次抓取时从池中取一个会话并一直复用
+    (保留连接和 Cloudflare cookie)。多进程部署时在 fork 前 preload, 工作进程直接继承已创建的会话;
+    此时会话还没有打开连接, 不会在进程间共用 socket。
+    """
+
+    def __init__(self):
+        self._idle = queue.LifoQueue()
+        self._local = threading.local()
+
+    @staticmethod
+    def create():
+        return cloudscraper.create_scraper(
+            browser={
+                'browser': 'chrome',
+                'platform': 'windows',
+                'desktop': True
+            }
+        )
+
+    def preload(self, count):
+        for _ in range(count):
+            self._idle.put(self.create())
+
+    def get(self):
+        scraper = getattr(self._local, "scraper", None)
+        if scraper is None or self._local.pid != os.getpid():
+            try:
+                scraper = self._idle.get_nowait()
+            except queue.Empty:
+                scraper = self.create()
+            self._local.scraper, self._local.pid = scraper, os.getpid()
+        return scraper
+
+
+scraper_pool = ScraperPool()
+
+
+def get_scraper():
+    return scraper_pool.get()
 
 @app.route('/')
 def index():
-    return jsonify({
+    return respond({
         "status": "ok",
         "endpoints": [
             "/api/matches",
             "/api/rankings",
             "/api/results",
+            "/api/events",
             "/api/player?name=<player_name>",
-            "/api/team?name=<team_name>"
-        ]
+            "/api/team?name=<team_name>",
+            "/api/match?id=<match_id>"
+        ],
+        "not_found_cache": not_found_cache.stats(),
     })
 
+def _unix_seconds(elem):
+    """元素 data-unix 属性 (毫秒) 转为 Unix 时间戳 (秒)"""
+    try:
+        return int(elem.get("data-unix")) // 1000
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+def scrape_matches(scraper):
+    """抓取即将进行/正在进行的比赛"""
+    soup = fetch_soup(scraper, f"{BASE_URL}/matches", "matches")
+    matches = []
+    
+    for match_elem in soup.select("div.match")[:15]:
+        try:
+            match_link = match_elem.select_one("a[href*='/matches/']")
+            if not match_link:
+                continue
+            
+            href = str(match_link.get("href", ""))
+            time_elem = match_elem.select_one(".match-time")
+            time_text = time_elem.get_text(strip=True) if time_elem else "TBD"
+            # 正在进行的比赛显示 LIVE 标记而不是开始时间
+            live = match_elem.select_one(".match-meta-live") is not None or time_text.upper() == "LIVE"
+            
+            meta_elem = match_elem.select_one(".match-meta:not(.match-meta-live)")
+            bo_type = meta_elem.get_text(strip=True) if meta_elem else "bo3"
+            
+            team_names = match_elem.select("div.match-teamname")
+            if len(team_names) >= 2:
+                team1 = team_names[0].get_text(strip=True)
+                team2 = team_names[1].get_text(strip=True)
+            else:
+                continue
+            
+            event_name = "Unknown"
+            if href:
+                parts = str(href).split("/")[-1].split("-vs-")
+                if len(parts) > 1:
+                    event_parts = parts[1].split("-", 1)
+                    if len(event_parts) > 1:
+                        event_name = event_parts[1].replace("-", " ").title()
+            
+            matches.append({
+                "team1": team1,
+                "team2": team2,
+                "event": event_name,
+                "time": "LIVE" if live else time_text,
+                "timestamp": _unix_seconds(time_elem),
+                "live": live,
+                "bo_type": bo_type,
+                "url": f"{BASE_URL}{href}" if href else ""
+            })
+        except:
+            continue
+    
+    return matches
+
 @app.route('/api/matches')
 def get_matches():
+    snapshot = get_snapshot("matches")
+    if snapshot:
+        return snapshot_response(snapshot)
     try:
-        scraper = get_scraper()
-        resp = scraper.get(f"{BASE_URL}/matches", timeout=15)
-        resp.raise_for_status()
-        
-        soup = BeautifulSoup(resp.text, "html.parser")
-        matches = []
-        
-        for match_elem in soup.select("div.match")[:15]:
-            try:
-                match_link = match_elem.select_one("a[href*='/matches/']")
-                if not match_link:
-                    continue
-                
-                href = str(match_link.get("href", ""))
-                time_elem = match_elem.select_one(".match-time")
-                time_text = time_elem.get_text(strip=True) if time_elem else "TBD"
-                
-                meta_elem = match_elem.select_one(".match-meta")
-                bo_type = meta_elem.get_text(strip=True) if meta_elem else "bo3"
-                
-                team_names = match_elem.select("div.match-teamname")
-                if len(team_names) >= 2:
-                    team1 = team_names[0].get_text(strip=True)
-                    team2 = team_names[1].get_text(strip=True)
-                else:
-                    continue
-                
-                event_name = "Unknown"
-                if href:
-                    parts = str(href).split("/")[-1].split("-vs-")
-                    if len(parts) > 1:
-                        event_parts = parts[1].split("-", 1)
-                        if len(event_parts) > 1:
-                            event_name = event_parts[1].replace("-", " ").title()
-                
-                matches.append({
-                    "team1": team1,
-                    "team2": team2,
-                    "event": event_name,
-                    "time": time_text,
-                    "bo_type": bo_type,
-                    "url": f"{BASE_URL}{href}" if href else ""
-                })
-            except:
-                continue
-        
-        return jsonify({"success": True, "data": matches})
+        return respond({"success": True, "data": scrape_matches(get_scraper())})
     except Exception as e:
-        return jsonify({"success": False, "error": str(e)}), 500
+        return respond({"success": False, "error": str(e)}), 500
+
+def scrape_rankings(scraper, limit=30):
+    """抓取战队排名 (含阵容)"""
+    soup = fetch_soup(scraper, f"{BASE_URL}/ranking/teams", "rankings")
+    teams = []
+    
+    for team_elem in soup.select(".ranked-team")[:limit]:
+        try:
+            rank_elem = team_elem.select_one("span.position")
+            rank_text = rank_elem.get_text(strip=True) if rank_elem else ""
+            rank = rank_text.replace("#", "") if rank_text else str(len(teams) + 1)
+            
+            name_elem = team_elem.select_one("span.name")
+            team_name = name_elem.get_text(strip=True) if name_elem else "Unknown"
+            
+            points_elem = team_elem.select_one("span.points")
+            points_text = points_elem.get_text(strip=True) if points_elem else "(0)"
+            points = "".join(c for c in points_text if c.isdigit())
+            
+            members_elems = team_elem.select(".rankingNicknames")
+            members = [m.get_text(strip=True) for m in members_elems[:5]]
+            
+            teams.append({
+                "rank": int(rank) if rank.isdigit() else len(teams) + 1,
+                "title": team_name,
+                "points": int(points) if points else 0,
+                "members": members
+            })
+        except:
+            continue
+    
+    return teams
 
 @app.route('/api/rankings')
 def get_rankings():
+    limit = request.args.get('limit', 30, type=int)
+    snapshot = get_snapshot("rankings")
+    if snapshot:
+        return snapshot_response(snapshot, ("limit", limit), lambda teams: teams[:limit])
     try:
-        limit = request.args.get('limit', 30, type=int)
-        scraper = get_scraper()
-        resp = scraper.get(f"{BASE_URL}/ranking/teams", timeout=15)
-        resp.raise_for_status()
-        
-        soup = BeautifulSoup(resp.text, "html.parser")
-        teams = []
-        
-        for team_elem in soup.select(".ranked-team")[:limit]:
-            try:
-                rank_elem = team_elem.select_one("span.position")
-                rank_text = rank_elem.get_text(strip=True) if rank_elem else ""
-                rank = rank_text.replace("#", "") if rank_text else str(len(teams) + 1)
-                
-                name_elem = team_elem.select_one("span.name")
-                team_name = name_elem.get_text(strip=True) if name_elem else "Unknown"
-                
-                points_elem = team_elem.select_one("span.points")
-                points_text = points_elem.get_text(strip=True) if points_elem else "(0)"
-                points = "".join(c for c in points_text if c.isdigit())
-                
-                members_elems = team_elem.select(".rankingNicknames")
-                members = [m.get_text(strip=True) for m in members_elems[:5]]
-                
-                teams.append({
-                    "rank": int(rank) if rank.isdigit() else len(teams) + 1,
-                    "title": team_name,
-                    "points": int(points) if points else 0,
-                    "members": members
-                })
-            except:
-                continue
-        
-        return jsonify({"success": True, "data": teams})
+        return respond({"success": True, "data": scrape_rankings(get_scraper(), limit)})
     except Exception as e:
-        return jsonify({"success": False, "error": str(e)}), 500
+        return respond({"success": False, "error": str(e)}), 500
+
+def scrape_results(scraper, stars=0):
+    """抓取最近的比赛结果 (stars > 0 时只取该星级及以上)"""
+    path = f"/results?stars={stars}" if stars > 0 else "/results"
+    soup = fetch_soup(scraper, f"{BASE_URL}{path}", "results")
+    results = []
+    
+    for result_con in soup.select(".result-con")[:20]:
+        try:
+            result_div = result_con.select_one("div.result")
+            if not result_div:
+                continue
+            
+            team1_elem = result_div.select_one("div.team1 .team") or result_div.select_one(".line-align.team1 .team")
+            team1 = team1_elem.get_text(strip=True) if team1_elem else "Unknown"
+            
+            team2_elem = result_div.select_one("div.team2 .team") or result_div.select_one(".line-align.team2 .team")
+            team2 = team2_elem.get_text(strip=True) if team2_elem else "Unknown"
+            
+            score_elem = result_div.select_one("td.result-score")
+            if score_elem:
+                score_text = score_elem.get_text(strip=True)
+                parts = score_text.split("-")
+                score1 = int(parts[0].strip()) if parts[0].strip().isdigit() else 0
+                score2 = int(parts[1].strip()) if len(parts) > 1 and parts[1].strip().isdigit() else 0
+            else:
+                score1, score2 = 0, 0
+            
+            event_elem = result_con.select_one(".event-name")
+            event = event_elem.get_text(strip=True) if event_elem else "Unknown"
+            
+            results.append({
+                "team1": team1,
+                "team2": team2,
+                "score1": score1,
+                "score2": score2,
+                "event": event,
+                "stars": len(result_con.select(".stars .fa-star"))
+            })
+        except:
+            continue
+    
+    return results
 
 @app.route('/api/results')
 def get_results():
+    stars = request.args.get('stars', 0, type=int)
+    snapshot = get_snapshot("results")
+    if snapshot:
+        return snapshot_response(
+            snapshot, ("stars", stars), lambda results: [r for r in results if r.get("stars", 0) >= stars]
+        )
     try:
-        scraper = get_scraper()
-        resp = scraper.get(f"{BASE_URL}/results", timeout=15)
-        resp.raise_for_status()
-        
-        soup = BeautifulSoup(resp.text, "html.parser")
-        results = []
+        return respond({"success": True, "data": scrape_results(get_scraper(), stars)})
+    except Exception as e:
+        return respond({"success": False, "error": str(e)}), 500
+
+# 赛事级别: 只获取 S 级 (Major) 和 A 级 (国际LAN)
+EVENT_TIERS = {
+    "MAJOR": ("S", "Major"),
+    "INTLLAN": ("A", "国际LAN"),
+}
+
+def _unix_date(elem):
+    try:
+        return datetime.fromtimestamp(int(elem.get("data-unix")) / 1000, timezone.utc).strftime("%Y-%m-%d")
+    except (TypeError, ValueError):
+        return None
+
+def scrape_events(scraper):
+    """抓取重要赛事 (S级 Major + A级 国际LAN), 按开始日期排序"""
+    events = []
+    for event_type, (tier, tier_name) in EVENT_TIERS.items():
+        try:
+            soup = fetch_soup(scraper, f"{BASE_URL}/events?eventType={event_type}", "events", event_type=event_type)
+        except Exception:
+            continue
         
-        for result_con in soup.select(".result-con")[:20]:
-            try:
-                result_div = result_con.select_one("div.result")
-                if not result_div:
-                    continue
-                
-                team1_elem = result_div.select_one("div.team1 .team") or result_div.select_one(".line-align.team1 .team")
-                team1 = team1_elem.get_text(strip=True) if team1_elem else "Unknown"
-                
-                team2_elem = result_div.select_one("div.team2 .team") or result_div.select_one(".line-align.team2 .team")
-                team2 = team2_elem.get_text(strip=True) if team2_elem else "Unknown"
-                
-                score_elem = result_div.select_one("td.result-score")
-                if score_elem:
-                    score_text = score_elem.get_text(strip=True)
-                    parts = score_text.split("-")
-                    score1 = int(parts[0].strip()) if parts[0].strip().isdigit() else 0
-                    score2 = int(parts[1].strip()) if len(parts) > 1 and parts[1].strip().isdigit() else 0
-                else:
-                    score1, score2 = 0, 0
-                
-                event_elem = result_con.select_one(".event-name")
-                event = event_elem.get_text(strip=True) if event_elem else "Unknown"
-                
-                results.append({
-                    "team1": team1,
-                    "team2": team2,
-                    "score1": score1,
-                    "score2": score2,
-                    "event": event
-                })
-            except:
+        for event_elem in soup.select("a.big-event, a.small-event"):
+            href = str(event_elem.get("href", ""))
+            if not href.startswith("/events/"):
                 continue
-        
-        return jsonify({"success": True, "data": results})
+            big = "big-event" in (event_elem.get("class") or [])
+            name_elem = event_elem.select_one(".big-event-name" if big else "div.name")
+            location_elem = event_elem.select_one(".big-event-location") if big else None
+            dates = event_elem.select("[data-unix]")
+            events.append({
+                "name": name_elem.get_text(strip=True) if name_elem else "Unknown",
+                "tier": tier,
+                "tier_name": tier_name,
+                "event_type": event_type,
+                "location": location_elem.get_text(strip=True) if location_elem else "TBD",
+                "start_date": _unix_date(dates[0]) if len(dates) >= 2 else None,
+                "end_date": _unix_date(dates[1]) if len(dates) >= 2 else None,
+                "url": f"{BASE_URL}{href}"
+            })
+    
+    events.sort(key=lambda e: (e["start_date"] is None, e["start_date"] or ""))
+    return events
+
+@app.route('/api/events')
+def get_events():
+    snapshot = get_snapshot("events")
+    if snapshot:
+        return snapshot_response(snapshot)
+    try:
+        return respond({"success": True, "data": scrape_events(get_scraper())})
     except Exception as e:
-        return jsonify({"success": False, "error": str(e)}), 500
+        return respond({"success": False, "error": str(e)}), 500
 
 @app.route('/api/player')
 def get_player():
     name = request.args.get('name', '')
     if not name:
-        return jsonify({"success": False, "error": "请提供选手名称"}), 400
+        return respond({"success": False, "error": "请提供选手名称"}), 400
+    if not_found_cache.contains("player", name):
+        return not_found_response("选手", name, cached=True)
     
     try:
         scraper = get_scraper()
         
         # 搜索选手
-        search_resp = scraper.get(f"{BASE_URL}/search?query={name}", timeout=15)
-        search_resp.raise_for_status()
-        soup = BeautifulSoup(search_resp.text, "html.parser")
+        soup = fetch_soup(scraper, f"{BASE_URL}/search?query={name}", "player_search")
         
         player_link = soup.select_one("a[href*='/player/']")
         if not player_link:
-            return jsonify({"success": False, "error": f"未找到选手 '{name}'"})
+            not_found_cache.add("player", name)
+            return not_found_response("选手", name)
         
         href = str(player_link.get("href", ""))
         player_url = BASE_URL + href
@@ -195,9 +1030,7 @@ def get_player():
         player_slug = href_parts[2] if len(href_parts) > 2 else ""
         
         # 获取选手页面
-        player_resp = scraper.get(player_url, timeout=15)
-        player_resp.raise_for_status()
-        player_soup = BeautifulSoup(player_resp.text, "html.parser")
+        player_soup = fetch_soup(scraper, player_url, "player")
         
         full_name_elem = player_soup.select_one(".playerRealname")
         full_name = full_name_elem.get_text(strip=True) if full_name_elem else name
@@ -217,9 +1050,7 @@ def get_player():
         if player_id and player_slug:
             try:
                 stats_url = f"{BASE_URL}/stats/players/{player_id}/{player_slug}"
-                stats_resp = scraper.get(stats_url, timeout=15)
-                stats_resp.raise_for_status()
-                stats_soup = BeautifulSoup(stats_resp.text, "html.parser")
+                stats_soup = fetch_soup(scraper, stats_url, "player_stats")
                 
                 for row in stats_soup.select(".stats-row"):
                     spans = row.select("span")
@@ -255,33 +1086,32 @@ def get_player():
             "url": player_url
         }
         
-        return jsonify({"success": True, "data": player_data})
+        return respond({"success": True, "data": player_data})
     except Exception as e:
-        return jsonify({"success": False, "error": str(e)}), 500
+        return respond({"success": False, "error": str(e)}), 500
 
 @app.route('/api/team')
 def get_team():
     name = request.args.get('name', '')
     if not name:
-        return jsonify({"success": False, "error": "请提供战队名称"}), 400
+        return respond({"success": False, "error": "请提供战队名称"}), 400
+    if not_found_cache.contains("team", name):
+        return not_found_response("战队", name, cached=True)
     
     try:
         scraper = get_scraper()
         
-        search_resp = scraper.get(f"{BASE_URL}/search?query={name}", timeout=15)
-        search_resp.raise_for_status()
-        soup = BeautifulSoup(search_resp.text, "html.parser")
+        soup = fetch_soup(scraper, f"{BASE_URL}/search?query={name}", "team_search")
         
         team_link = soup.select_one("a[href*='/team/']")
         if not team_link:
-            return jsonify({"success": False, "error": f"未找到战队 '{name}'"})
+            not_found_cache.add("team", name)
+            return not_found_response("战队", name)
         
         href = str(team_link.get("href", ""))
         team_url = BASE_URL + href
         
-        team_resp = scraper.get(team_url, timeout=15)
-        team_resp.raise_for_status()
-        team_soup = BeautifulSoup(team_resp.text, "html.parser")
+        team_soup = fetch_soup(scraper, team_url, "team")
         
         name_elem = team_soup.select_one(".profile-team-name")
         actual_name = name_elem.get_text(strip=True) if name_elem else name
@@ -306,9 +1136,243 @@ def get_team():
             "url": team_url
         }
         
-        return jsonify({"success": True, "data": team_data})
+        return respond({"success": True, "data": team_data})
     except Exception as e:
-        return jsonify({"success": False, "error": str(e)}), 500
+        return respond({"success": False, "error": str(e)}), 500
+
+# ========== 比赛详情 ==========
+# 已结束的比赛不会再变化, 响应允许 CDN/客户端永久缓存; 进行中和未开始的比赛只缓存很短时间
+MATCH_CACHE_CONTROL = {
+    "finished": "public, max-age=31536000, immutable",
+    "live": "public, max-age=30",
+    "upcoming": "public, max-age=300",
+}
+# 有地图数据页抓取失败 (partial) 时只缓存很短时间, 之后重新抓取
+MATCH_PARTIAL_CACHE_CONTROL = "public, max-age=30"
+# 同时抓取的地图数据页数
+MATCH_STATS_WORKERS = 5
+_map_stats_executor = None
+_map_stats_executor_pid = None
+_map_stats_executor_lock = threading.Lock()
+_MATCH_STATS_LINK = re.compile(r"^/stats/matches/mapstatsid/(\d+)/")
+
+
+def _number(text, cast=float):
+    """页面中的数值文本 (如 "95.3"、"20 (7)") 转为数字, 无法解析时返回 None"""
+    match = re.match(r"-?[0-9]+(?:\.[0-9]+)?", (text or "").strip())
+    if not match:
+        return None
+    try:
+        return cast(match.group(0))
+    except ValueError:
+        return None
+
+
+def _first_text(elem, selector):
+    found = elem.select_one(selector)
+    return found.get_text(strip=True) if found else ""
+
+
+def _match_status(soup):
+    countdown = _first_text(soup, ".countdown").lower()
+    if "match over" in countdown:
+        return "finished"
+    if "live" in countdown:
+        return "live"
+    return "upcoming"
+
+
+def parse_match_players(table, team):
+    """比赛页面的选手数据表 (每队一张: K-D / ADR / KAST / Rating)"""
+    players = []
+    for row in table.select("tr"):
+        nick = row.select_one(".player-nick") or row.select_one(".statsPlayerName")
+        if not nick:
+            continue
+        kd = _first_text(row, "td.kd").split("-")
+        players.append({
+            "name": nick.get_text(strip=True),
+            "team": team,
+            "kills": _number(kd[0], int) if kd else None,
+            "deaths": _number(kd[1], int) if len(kd) > 1 else None,
+            "adr": _number(_first_text(row, "td.adr")),
+            "kast": _first_text(row, "td.kast") or None,
+            "rating": _number(_first_text(row, "td.rating")),
+        })
+    return players
+
+
+def parse_map_stats(soup):
+    """单张地图数据页 (/stats/matches/mapstatsid/...) 的选手数据"""
+    players = []
+    for table in soup.select("table.stats-table.totalstats"):
+        team = _first_text(table, "th.st-teamname")
+        for row in table.select("tbody tr"):
+            name = _first_text(row, "td.st-player a")
+            if not name:
+                continue
+            players.append({
+                "name": name,
+                "team": team,
+                "kills": _number(_first_text(row, "td.st-kills"), int),
+                "deaths": _number(_first_text(row, "td.st-deaths"), int),
+                "adr": _number(_first_text(row, "td.st-adr")),
+                "kast": _first_text(row, "td.st-kdratio") or None,
+                "rating": _number(_first_text(row, "td.st-rating")),
+            })
+    return players
+
+
+def map_stats_executor():
+    """抓取地图数据页的线程池, 每个进程一个 (多进程部署时在工作进程中首次使用时创建)
+
+    线程长期存在, 各线程从 ScraperPool 取到的会话一直复用, 不会每个请求新建会话。
+    """
+    global _map_stats_executor, _map_stats_executor_pid
+    with _map_stats_executor_lock:
+        if _map_stats_executor is None or _map_stats_executor_pid != os.getpid():
+            _map_stats_executor = ThreadPoolExecutor(MATCH_STATS_WORKERS, thread_name_prefix="map-stats")
+            _map_stats_executor_pid = os.getpid()
+        return _map_stats_executor
+
+
+def fetch_map_stats(url):
+    """抓取一张地图的数据页 (在线程池中运行, 每个线程使用独立的 scraper), 失败时返回 None"""
+    try:
+        return parse_map_stats(fetch_soup(get_scraper(), url, "match_map_stats"))
+    except Exception as e:
+        logger.warning(f"抓取地图数据失败 {url}: {e}")
+        return None
+
+
+def scrape_match(scraper, match_id):
+    """抓取比赛页面 (比分、地图、全场选手数据), 再并发抓取各地图的数据页; 比赛不存在时返回 None
+
+    有地图数据页抓取失败或没有选手数据时 partial 为 True, 这样的结果不能按已结束的比赛永久缓存。
+    """
+    url = f"{BASE_URL}/matches/{match_id}/match"
+    soup = fetch_soup(scraper, url, "match", match_id=match_id)
+    team1 = _first_text(soup, ".team1-gradient .teamName")
+    team2 = _first_text(soup, ".team2-gradient .teamName")
+    if not team1 and not team2:
+        return None
+
+    time_elem = soup.select_one(".timeAndEvent .time")
+    match = {
+        "id": match_id,
+        "team1": team1 or "TBD",
+        "team2": team2 or "TBD",
+        "score1": _number(_first_text(soup, ".team1-gradient .won, .team1-gradient .lost, .team1-gradient .tie"), int),
+        "score2": _number(_first_text(soup, ".team2-gradient .won, .team2-gradient .lost, .team2-gradient .tie"), int),
+        "event": _first_text(soup, ".timeAndEvent .event a") or "Unknown",
+        "timestamp": _unix_seconds(time_elem),
+        "status": _match_status(soup),
+        "maps": [],
+        "players": [],
+        "partial": False,
+        "url": url,
+    }
+
+    stats_urls = []
+    for holder in soup.select(".mapholder"):
+        name = _first_text(holder, ".mapname")
+        if not name or name.upper() == "TBA":
+            continue
+        link = holder.select_one("a.results-stats")
+        href = str(link.get("href", "")) if link else ""
+        stats_url = f"{BASE_URL}{href}" if _MATCH_STATS_LINK.match(href) else None
+        match["maps"].append({
+            "name": name,
+            "score1": _number(_first_text(holder, ".results-left .results-team-score"), int),
+            "score2": _number(_first_text(holder, ".results-right .results-team-score"), int),
+            "stats_url": stats_url,
+            "players": [],
+        })
+        stats_urls.append(stats_url)
+
+    all_content = soup.select_one("#all-content")
+    if all_content is not None:
+        for table, team in zip(all_content.select("table.totalstats"), (match["team1"], match["team2"])):
+            match["players"].extend(parse_match_players(table, team))
+
+    # 地图数据页互不依赖, 并发抓取
+    pending = [(m, u) for m, u in zip(match["maps"], stats_urls) if u]
+    if pending:
+        with trace_span("fetch.match_map_stats", maps=len(pending)):
+            executor = map_stats_executor()
+            tasks = [submit_traced(executor, fetch_map_stats, u) for _, u in pending]
+            trace = _current_trace.get()
+            for (map_data, _), (branch, future) in zip(pending, tasks):
+                map_data["players"] = future.result() or []
+                if trace is not None:
+                    trace.merge(branch)
+    match["partial"] = any(m["stats_url"] and not m["players"] for m in match["maps"])
+    return match
+
+
+@app.route('/api/match')
+def get_match():
+    match_id = request.args.get('id', '')
+    if not match_id.isdigit():
+        return respond({"success": False, "error": "请提供比赛ID"}), 400
+    try:
+        match = scrape_match(get_scraper(), int(match_id))
+        if match is None:
+            return respond({"success": False, "not_found": True, "error": f"未找到比赛 {match_id}"})
+        resp = respond({"success": True, "data": match})
+        resp.headers["Cache-Control"] = (
+            MATCH_PARTIAL_CACHE_CONTROL if match["partial"] else MATCH_CACHE_CONTROL[match["status"]]
+        )
+        return resp
+    except Exception as e:
+        # HLTV 对不存在的比赛ID返回 404
+        if getattr(getattr(e, "response", None), "status_code", None) == 404:
+            return respond({"success": False, "not_found": True, "error": f"未找到比赛 {match_id}"})
+        return respond({"success": False, "error": str(e)}), 500
+
+# ========== 多进程部署 ==========
+class _BlankResponse:
+    status_code = 200
+    text = "<html><body></body></html>"
+    content = text.encode()
+
+    def raise_for_status(self):
+        pass
+
+
+class _BlankScraper:
+    """预热用: 所有页面都返回空文档"""
+
+    def get(self, url, timeout=None):
+        return _BlankResponse()
+
+
+def warm_up_parsers():
+    """用空页面运行一遍各解析函数, 预先编译其中的 CSS 选择器 (soupsieve 缓存编译结果)"""
+    blank = _BlankScraper()
+    for scrape in (scrape_matches, scrape_rankings, scrape_results, scrape_events, lambda s: scrape_match(s, 0)):
+        try:
+            scrape(blank)
+        except Exception:
+            pass
+
+
+def preload(scrapers=4):
+    """多进程部署时在 fork 前调用 (见 wsgi.py): 预先创建抓取会话并编译选择器, 工作进程继承后无需重复初始化"""
+    started = time.monotonic()
+    scraper_pool.preload(scrapers)
+    warm_up_parsers()
+    logger.info(f"预加载完成: {scrapers} 个抓取会话, 耗时 {time.monotonic() - started:.2f}s")
+
+
+def start_background_tasks():
+    if snapshot_store is not None and SNAPSHOT_SCHEDULER:
+        start_snapshot_scheduler()
+
+
+# 预加载后 fork 的工作进程不会继承主进程的线程, 由 gunicorn.conf.py 在 fork 后启动后台任务
+if os.environ.get("HLTV_PREFORK") != "1":
+    start_background_tasks()
 
 # Vercel 需要这个
 app = app
@@ -0,0 +1,229 @@
+"""
+API Server 多进程吞吐量基准
+
+启动一个离线页面服务器 (回答 cloudflare-worker/fixtures/ 中随仓库提交的页面, 生成方法见
+cloudflare-worker/bench.mjs --generate), 用 gunicorn.conf.py 依次以不同工作进程数启动 API Server
+(HLTV_BASE_URL 指向页面服务器), 以固定并发持续请求各接口, 比较吞吐量和延迟。
+
+    cd api-server
+    python bench.py [--workers 1,2,4] [--threads 4] [--concurrency 16] [--duration 10]
+
+每个请求都会重新抓取并解析页面 (不使用快照模式), 吞吐量主要取决于解析页面的 CPU 时间。
+"""
+
+import argparse
+import http.client
+import http.server
+import multiprocessing
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from urllib.parse import parse_qs, urlsplit
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+FIXTURES = os.path.join(HERE, "cloudflare-worker", "fixtures")
+
+ROUTES = [
+    "/api/matches",
+    "/api/rankings?limit=30",
+    "/api/results",
+    "/api/events",
+    "/api/player?name=ZywOo",
+    "/api/team?name=Vitality",
+    "/api/match?id=2376000",
+]
+
+
+def fixture_name(path):
+    """HLTV 路径 -> 页面文件名 (与 bench.mjs 相同)"""
+    parts = urlsplit(path)
+    query = parse_qs(parts.query)
+    pathname = parts.path
+    if pathname == "/matches":
+        return "matches.html"
+    if pathname == "/ranking/teams":
+        return "ranking.html"
+    if pathname == "/results":
+        return "results.html"
+    if pathname == "/events":
+        return f"events-{query.get('eventType', [''])[0]}.html"
+    if pathname == "/search":
+        return f"search-{query.get('query', [''])[0].lower()}.html"
+    if pathname.startswith("/stats/matches/mapstatsid/"):
+        return "mapstats.html"
+    if pathname.startswith("/stats/players/"):
+        return "player-stats.html"
+    if pathname.startswith("/player/"):
+        return "player.html"
+    if pathname.startswith("/team/"):
+        return "team.html"
+    if pathname.startswith("/matches/"):
+        return "match.html"
+    return None
+
+
+def serve_fixtures(directory, port):
+    """离线页面服务器 (单独的进程, 不与压测客户端争用 GIL)"""
+    pages = {}
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            name = fixture_name(self.path)
+            path = os.path.join(directory, name) if name else None
+            if path is None or not os.path.exists(path):
+                self.send_response(404)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            if name not in pages:
+                with open(path, "rb") as f:
+                    pages[name] = f.read()
+            body = pages[name]
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    http.server.ThreadingHTTPServer(("127.0.0.1", port), Handler).serve_forever()
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_ready(port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=2)
+            conn.request("GET", "/")
+            if conn.getresponse().status == 200:
+                return True
+        except OSError:
+            time.sleep(0.2)
+    return False
+
+
+def run_load(port, routes, concurrency, duration):
+    """concurrency 个客户端线程 (各自保持连接) 轮流请求 routes, 返回 (成功数, 失败数, 延迟列表)"""
+    latencies, errors = [], [0]
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+
+    def client(offset):
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        i = offset
+        local, failed = [], 0
+        while time.monotonic() < deadline:
+            route = routes[i % len(routes)]
+            i += 1
+            start = time.perf_counter()
+            try:
+                conn.request("GET", route)
+                resp = conn.getresponse()
+                resp.read()
+                if resp.status == 200:
+                    local.append(time.perf_counter() - start)
+                else:
+                    failed += 1
+            except (OSError, http.client.HTTPException):
+                failed += 1
+                conn.close()
+                conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        with lock:
+            latencies.extend(local)
+            errors[0] += failed
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return len(latencies), errors[0], latencies
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))] if values else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="API Server 多进程吞吐量基准")
+    parser.add_argument("--workers", default="1,2,4", help="工作进程数, 逗号分隔")
+    parser.add_argument("--threads", type=int, default=4, help="每个进程的线程数")
+    parser.add_argument("--concurrency", type=int, default=16, help="并发客户端数")
+    parser.add_argument("--duration", type=float, default=10, help="每组的压测时长 (秒)")
+    parser.add_argument("--fixtures", default=FIXTURES, help="保存的 HLTV 页面目录")
+    parser.add_argument("--routes", default=",".join(ROUTES), help="请求的接口, 逗号分隔")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.fixtures):
+        print(f"{args.fixtures} 不存在, 请先生成页面: cd cloudflare-worker && node bench.mjs --generate")
+        sys.exit(1)
+    routes = [r for r in args.routes.split(",") if r]
+
+    fixture_port = free_port()
+    fixture_server = multiprocessing.Process(
+        target=serve_fixtures, args=(args.fixtures, fixture_port), daemon=True
+    )
+    fixture_server.start()
+
+    print("=" * 72)
+    print(f"API Server 吞吐量 (gthread, 每进程 {args.threads} 线程, 并发 {args.concurrency}, 每组 {args.duration:g}s)")
+    print(f"CPU 核数: {os.cpu_count()}  接口: {len(routes)} 个轮流请求")
+    print("=" * 72)
+    print(f"{'进程数':<8}{'请求数':>10}{'失败':>8}{'吞吐量':>12}{'p50':>10}{'p95':>10}{'加速比':>10}")
+    baseline = None
+    try:
+        for workers in (int(w) for w in args.workers.split(",")):
+            port = free_port()
+            with tempfile.TemporaryDirectory() as tmp:
+                env = dict(
+                    os.environ,
+                    HLTV_BIND=f"127.0.0.1:{port}",
+                    HLTV_WORKERS=str(workers),
+                    HLTV_THREADS=str(args.threads),
+                    HLTV_BASE_URL=f"http://127.0.0.1:{fixture_port}",
+                    HLTV_CACHE_DB=os.path.join(tmp, "cache.db"),
+                )
+                env.pop("HLTV_SNAPSHOT_DIR", None)
+                server = subprocess.Popen(
+                    [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py"],
+                    cwd=HERE, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                )
+                try:
+                    if not wait_ready(port):
+                        print(f"{workers:<8}启动失败")
+                        continue
+                    # 预热: 每个接口请求一次
+                    run_load(port, routes, len(routes), 0.5)
+                    ok, failed, latencies = run_load(port, routes, args.concurrency, args.duration)
+                finally:
+                    server.terminate()
+                    server.wait(timeout=30)
+            throughput = ok / args.duration
+            baseline = baseline or throughput
+            print(
+                f"{workers:<8}{ok:>10}{failed:>8}{throughput:>9.1f}/s"
+                f"{percentile(latencies, 0.5) * 1000:>8.0f}ms{percentile(latencies, 0.95) * 1000:>8.0f}ms"
+                f"{throughput / baseline if baseline else 0:>9.2f}x"
+            )
+    finally:
+        fixture_server.terminate()
+    print("=" * 72)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,435 @@
+/**
+ * Worker 解析性能基准
+ *
+ * 在本地 workerd (Miniflare, 随 wrangler 安装) 中运行 worker.js，
+ * 上游 HLTV 请求由 fixtures/ 目录下的 HTML 页面回答，统计每个路由每次请求的 CPU 时间和耗时。
+ *
+ * fixtures/ 随仓库提交：页面按 HLTV 的页面结构生成 (固定随机种子, 条目数和页面大小接近真实页面)，
+ * 重新生成:
+ *   node bench.mjs --generate
+ * 也可以换成真实页面 (通过已部署的 worker 的 /api/proxy 端点获取原始 HTML, 覆盖 fixtures/):
+ *   node bench.mjs --save https://hltv-api-proxy.your-name.workers.dev
+ *
+ * 运行基准:
+ *   node bench.mjs [--iterations 50] [--script worker.js]
+ *
+ * CPU 时间读取 workerd 子进程的 /proc/<pid>/stat (仅 Linux, 精度为一个时钟周期, 按整个路由的请求累计后平均)，
+ * 不包括 Node 中回答上游请求的时间；其他平台只输出耗时。
+ *
+ * --script 可指定其他版本的 worker 做对比，例如:
+ *   git show HEAD~1:api-server/cloudflare-worker/worker.js > /tmp/worker-old.js
+ *   node bench.mjs --script /tmp/worker-old.js
+ */
+
+import { existsSync, mkdirSync, readdirSync, readFileSync, writeFileSync } from "node:fs";
+import { dirname, join } from "node:path";
+import { fileURLToPath } from "node:url";
+
+const HERE = dirname(fileURLToPath(import.meta.url));
+const FIXTURES = join(HERE, "fixtures");
+
+// 示例选手/战队 (保存页面时用于搜索)
+const SAMPLE_PLAYER = "ZywOo";
+const SAMPLE_TEAM = "Vitality";
+const SAMPLE_MATCH = 2376000;
+
+// 路由 -> 基准请求
+const ROUTES = [
+  "/api/matches",
+  "/api/rankings?limit=30",
+  "/api/results",
+  "/api/events",
+  `/api/player?name=${SAMPLE_PLAYER}`,
+  `/api/team?name=${SAMPLE_TEAM}`,
+  `/api/match?id=${SAMPLE_MATCH}`,
+];
+
+// HLTV 路径 -> 页面文件名
+function fixtureName(url) {
+  const { pathname, searchParams } = new URL(url);
+  if (pathname === "/matches") return "matches.html";
+  if (pathname === "/ranking/teams") return "ranking.html";
+  if (pathname === "/results") return "results.html";
+  if (pathname === "/events") return `events-${searchParams.get("eventType")}.html`;
+  if (pathname === "/search") return `search-${(searchParams.get("query") || "").toLowerCase()}.html`;
+  if (pathname.startsWith("/stats/matches/mapstatsid/")) return "mapstats.html";
+  if (pathname.startsWith("/stats/players/")) return "player-stats.html";
+  if (pathname.startsWith("/player/")) return "player.html";
+  if (pathname.startsWith("/team/")) return "team.html";
+  if (pathname.startsWith("/matches/")) return "match.html";
+  return null;
+}
+
+function parseArgs(argv) {
+  const args = { iterations: 50, script: join(HERE, "worker.js"), save: null, generate: false };
+  for (let i = 0; i < argv.length; i++) {
+    if (argv[i] === "--iterations") args.iterations = parseInt(argv[++i]);
+    else if (argv[i] === "--script") args.script = argv[++i];
+    else if (argv[i] === "--save") args.save = argv[++i].replace(/\/$/, "");
+    else if (argv[i] === "--generate") args.generate = true;
+  }
+  return args;
+}
+
+async function saveFixtures(proxy) {
+  mkdirSync(FIXTURES, { recursive: true });
+  const get = async (path) => {
+    const res = await fetch(`${proxy}/api/proxy?path=${encodeURIComponent(path)}`);
+    if (!res.ok) throw new Error(`${path}: HTTP ${res.status}`);
+    return await res.text();
+  };
+  const save = async (path) => {
+    const html = await get(path);
+    writeFileSync(join(FIXTURES, fixtureName(`https://www.hltv.org${path}`)), html);
+    console.log(`saved ${path} (${(html.length / 1024).toFixed(0)} KB)`);
+    return html;
+  };
+
+  await save("/matches");
+  await save("/ranking/teams");
+  await save("/results");
+  await save("/events?eventType=MAJOR");
+  await save("/events?eventType=INTLLAN");
+
+  const search = await save(`/search?query=${SAMPLE_PLAYER}`);
+  const player = search.match(/href="(\/player\/\d+\/[^"]+)"/);
+  if (player) {
+    await save(player[1]);
+    const [, , id, slug] = player[1].split("/");
+    await save(`/stats/players/${id}/${slug}`);
+  }
+  const teamSearch = await save(`/search?query=${SAMPLE_TEAM}`);
+  const team = teamSearch.match(/href="(\/team\/\d+\/[^"]+)"/);
+  if (team) {
+    await save(team[1]);
+  }
+  const match = await save(`/matches/${SAMPLE_MATCH}/match`);
+  const mapStats = match.match(/href="(\/stats\/matches\/mapstatsid\/\d+\/[^"]+)"/);
+  if (mapStats) {
+    await save(mapStats[1]);
+  }
+}
+
+// ========== 生成页面 ==========
+// 固定种子的伪随机数 (mulberry32), 每次生成的页面相同
+function random(seed) {
+  return () => {
+    seed = (seed + 0x6d2b79f5) | 0;
+    let t = Math.imul(seed ^ (seed >>> 15), 1 | seed);
+    t = (t + Math.imul(t ^ (t >>> 7), 61 | t)) ^ t;
+    return ((t ^ (t >>> 14)) >>> 0) / 4294967296;
+  };
+}
+
+const TEAMS = [
+  "Vitality", "MOUZ", "Spirit", "The MongolZ", "Aurora", "FaZe", "Natus Vincere", "Falcons", "G2", "Liquid",
+  "FURIA", "3DMAX", "Virtus.pro", "paiN", "Astralis", "HEROIC", "Complexity", "Eternal Fire", "MIBR", "B8",
+  "GamerLegion", "BIG", "Lynn Vision", "TYLOO", "Legacy", "SAW", "fnatic", "Imperial", "Wildcard", "M80",
+];
+const MAPS = ["Mirage", "Inferno", "Nuke", "Ancient", "Anubis", "Dust2", "Train"];
+const EVENTS = ["IEM Cologne Major 2026", "BLAST Premier World Final", "PGL Astana", "ESL Pro League Season 23",
+  "IEM Chengdu", "BLAST Open Lisbon", "CCT Season 3 Europe", "Thunderpick World Championship"];
+
+function slug(text) {
+  return text.toLowerCase().replace(/[^a-z0-9]+/g, "-").replace(/^-|-$/g, "");
+}
+
+// 页面外框: 导航栏、侧栏 (新闻/论坛链接) 和内联脚本, 解析时需要跳过的内容
+function page(title, content, rng) {
+  const news = Array.from({ length: 40 }, (_, i) =>
+    `<a href="/news/${40000 + i}/${slug(EVENTS[i % EVENTS.length])}-recap" class="newsline article">` +
+    `<img class="newsflag flag" src="/img/static/flags/30x20/EU.gif"><div class="newstext">` +
+    `${EVENTS[i % EVENTS.length]} recap part ${i}</div><div class="newstc"><div class="newsrecent">${i + 1}h</div>` +
+    `<div>${Math.floor(rng() * 400)} comments</div></div></a>`
+  ).join("\n");
+  const threads = Array.from({ length: 60 }, (_, i) =>
+    `<div class="activity"><a href="/forums/threads/${2700000 + i}/thread-${i}" class="activity-link">` +
+    `<span class="activity-title">Discussion thread ${i} about ${TEAMS[i % TEAMS.length]}</span>` +
+    `<span class="activity-replies">${Math.floor(rng() * 999)}</span></a></div>`
+  ).join("\n");
+  const config = JSON.stringify(Array.from({ length: 200 }, (_, i) => ({ id: i, key: `feature_${i}`, enabled: rng() > 0.5 })));
+  return `<!DOCTYPE html>
+<html lang="en"><head><meta charset="utf-8"><title>${title} | HLTV.org</title>
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<link rel="stylesheet" href="/css/main.css"><link rel="stylesheet" href="/css/theme-dark.css">
+<script>window.__CONFIG__ = ${config};</script>
+</head><body class="dark-theme">
+<div class="navbar"><nav class="navcon"><a href="/" class="navhome">HLTV</a>
+<a class="navnews" href="/">News</a><a class="navmatches" href="/matches">Matches</a><a class="navresults" href="/results">Results</a>
+<a class="navevents" href="/events">Events</a><a class="navstats" href="/stats">Stats</a><a class="navgalleries" href="/galleries">Galleries</a>
+<a class="navforums" href="/forums">Forums</a><a class="navbets" href="/betting/money">Betting</a></nav></div>
+<div class="colCon"><aside class="leftCol"><div class="sidebar-box">${news}</div></aside>
+<main class="contentCol">
+${content}
+</main>
+<aside class="rightCol"><div class="sidebar-box">${threads}</div></aside></div>
+<footer class="footer"><div class="footer-links"><a href="/about">About</a><a href="/contact">Contact</a>
+<a href="/privacy">Privacy</a></div></footer>
+<script src="/scripts/main.js" defer></script>
+</body></html>
+`;
+}
+
+function generateFixtures() {
+  const rng = random(2026);
+  const pick = (list) => list[Math.floor(rng() * list.length)];
+  const nick = (i) => `${["s", "z", "k", "m", "r", "t"][i % 6]}${slug(TEAMS[i % TEAMS.length]).slice(0, 3)}${i}`;
+  const roster = (team) => (team === "Vitality" ? ["apEX", "ZywOo", "flameZ", "mezii", "ropz"]
+    : Array.from({ length: 5 }, (_, i) => nick(TEAMS.indexOf(team) * 5 + i)));
+  const unix = (offset) => 1760000000000 + offset * 3600000;
+  const pages = {};
+
+  // 比赛列表: 今明两天约 100 场
+  pages["matches.html"] = page("CS2 Matches", Array.from({ length: 100 }, (_, i) => {
+    const [t1, t2] = [pick(TEAMS), pick(TEAMS)];
+    const event = pick(EVENTS);
+    const live = i < 3;
+    return `<div class="match-wrapper" data-match-id="${2376000 + i}" data-stars="${i % 3}">` +
+      `<div class="match"><a href="/matches/${2376000 + i}/${slug(t1)}-vs-${slug(t2)}-${slug(event)}" class="match-top">` +
+      (live ? `<div class="match-meta match-meta-live">LIVE</div>` : `<div class="match-time" data-unix="${unix(i)}">${String(i % 24).padStart(2, "0")}:00</div>`) +
+      `<div class="match-meta">${i % 7 === 0 ? "bo5" : "bo3"}</div></a>` +
+      `<div class="match-teams"><div class="match-team team1"><img class="match-team-logo" src="/img/${slug(t1)}.png">` +
+      `<div class="match-teamname text-ellipsis">${t1}</div></div><div class="match-team team2">` +
+      `<img class="match-team-logo" src="/img/${slug(t2)}.png"><div class="match-teamname text-ellipsis">${t2}</div></div></div>` +
+      `<div class="match-event"><div class="match-event-name text-ellipsis">${event}</div></div></div></div>`;
+  }).join("\n"), rng);
+
+  // 战队排名: 前 100 名 (含阵容)
+  pages["ranking.html"] = page("CS2 World Ranking", Array.from({ length: 100 }, (_, i) => {
+    const team = i < TEAMS.length ? TEAMS[i] : `Team ${i + 1}`;
+    const players = i < TEAMS.length ? roster(team) : Array.from({ length: 5 }, (_, j) => nick(i * 5 + j));
+    return `<div class="ranked-team standard-box"><div class="ranking-header"><span class="position">#${i + 1}</span>` +
+      `<div class="relative"><span class="team-logo"><img src="/img/${slug(team)}.png" title="${team}"></span>` +
+      `<div class="teamLine sectionTeamPlayers"><span class="name">${team}</span>` +
+      `<span class="points">(${Math.max(1, 1000 - i * 9)} points)</span></div></div></div>` +
+      `<div class="lineup-con"><table class="lineup"><tbody><tr>` +
+      players.map((p, j) => `<td class="player-holder"><a href="/player/${20000 + i * 5 + j}/${slug(p)}" class="pointer">` +
+        `<img class="playerPicture" src="/img/p${j}.png"><div class="nick"><img class="flag" src="/img/flags/EU.gif" title="Europe">` +
+        `<div class="rankingNicknames"><span>${p}</span></div></div></a></td>`).join("") +
+      `</tr></tbody></table></div></div>`;
+  }).join("\n"), rng);
+
+  // 结果: 约 100 场
+  pages["results.html"] = page("CS2 Results", Array.from({ length: 100 }, (_, i) => {
+    const [t1, t2] = [pick(TEAMS), pick(TEAMS)];
+    const score = rng() > 0.5 ? [2, 1] : [2, 0];
+    const stars = i % 4;
+    return `<div class="result-con" data-zonedgrouping-entry-unix="${unix(-i)}"><a href="/matches/${2375000 + i}/${slug(t1)}-vs-${slug(t2)}" class="a-reset">` +
+      `<div class="result"><table><tbody><tr><td class="team-cell"><div class="line-align team1">` +
+      `<img class="team-logo" src="/img/${slug(t1)}.png"><div class="team team-won">${t1}</div></div></td>` +
+      `<td class="result-score"><span class="score-won">${score[0]}</span> - <span class="score-lost">${score[1]}</span></td>` +
+      `<td class="team-cell"><div class="line-align team2"><div class="team ">${t2}</div>` +
+      `<img class="team-logo" src="/img/${slug(t2)}.png"></div></td><td class="event"><img class="event-logo" src="/img/e.png">` +
+      `<span class="event-name">${pick(EVENTS)}</span></td><td class="star-cell"><div class="map-text">bo3</div>` +
+      `<div class="stars">${'<i class="fa fa-star star"></i>'.repeat(stars)}</div></td></tr></tbody></table></div></a></div>`;
+  }).join("\n"), rng);
+
+  // 赛事: 各级别几个大型赛事 + 数十个小型赛事
+  for (const type of ["MAJOR", "INTLLAN"]) {
+    const big = Array.from({ length: 4 }, (_, i) => {
+      const name = `${EVENTS[i]}${type === "MAJOR" ? "" : " LAN"}`;
+      return `<a href="/events/${8000 + i}/${slug(name)}" class="a-reset big-event"><div class="big-event-info">` +
+        `<div class="big-event-name">${name}</div><span class="big-event-location">Cologne, Germany</span>` +
+        `<span data-unix="${unix(24 * (i + 10))}">start</span><span data-unix="${unix(24 * (i + 20))}">end</span></div></a>`;
+    });
+    const small = Array.from({ length: 40 }, (_, i) => {
+      const name = `${pick(EVENTS)} ${type === "MAJOR" ? "Qualifier" : "Stage"} ${i + 1}`;
+      return `<a href="/events/${8100 + i}/${slug(name)}" class="a-reset small-event standard-box"><table><tbody><tr>` +
+        `<td class="col-value event-col"><div class="text-ellipsis"><div class="table-cell name">${name}</div></div></td>` +
+        `<td class="col-value small-col">${8 + (i % 9)} teams</td>` +
+        `<td class="col-value small-col"><span data-unix="${unix(24 * i)}"></span> - <span data-unix="${unix(24 * i + 72)}"></span></td>` +
+        `</tr></tbody></table></a>`;
+    });
+    pages[`events-${type}.html`] = page("CS2 Events", big.concat(small).join("\n"), rng);
+  }
+
+  // 搜索结果: 选手、战队、文章各一组
+  const searchPage = (query, playerHref, teamHref) => page(`Search: ${query}`,
+    `<table class="table"><tbody><tr><td class="table-header">Player</td></tr>` +
+    `<tr><td><a href="${playerHref}">${query}</a></td></tr></tbody></table>` +
+    `<table class="table"><tbody><tr><td class="table-header">Team</td></tr>` +
+    `<tr><td><a href="${teamHref}">Team ${query}</a></td></tr></tbody></table>` +
+    Array.from({ length: 20 }, (_, i) => `<div class="search-article"><a href="/news/${41000 + i}/${slug(query)}-${i}">${query} news ${i}</a></div>`).join(""), rng);
+  pages["search-zywoo.html"] = searchPage("ZywOo", "/player/11893/zywoo", "/team/9565/vitality");
+  pages["search-vitality.html"] = searchPage("Vitality", "/player/7322/apex", "/team/9565/vitality");
+
+  // 选手页和数据页
+  pages["player.html"] = page("ZywOo", `<div class="playerProfile"><div class="playerContainer">` +
+    `<h1 class="playerNickname">ZywOo</h1><div class="playerRealname" title="Mathieu Herbaut">` +
+    `<img alt="France" src="/img/flags/FR.gif" class="flag" title="France"> Mathieu Herbaut</div>` +
+    `<div class="playerTeam"><a href="/team/9565/vitality" itemprop="text">Vitality</a></div>` +
+    `<div class="player-stat-holder">` +
+    [["Rating 3.0", "1.31"], ["KPR", "0.87"], ["ADR", "89.4"], ["KAST", "75.2%"], ["Maps", "1140"]]
+      .map(([label, value]) => `<div class="player-stat"><b>${label}</b><span class="statsVal"><p>${value}</p></span></div>`).join("") +
+    `</div></div>` +
+    Array.from({ length: 30 }, (_, i) => `<div class="trophy"><span class="trophyDescription">${pick(EVENTS)} ${2018 + (i % 8)}</span></div>`).join("") +
+    `</div>`, rng);
+  pages["player-stats.html"] = page("ZywOo stats", `<div class="player-summary-stat-box">` +
+    [["Rating 2.0", "1.29"], ["DPR", "0.61"], ["KAST", "74.9%"], ["Impact", "1.36"], ["ADR", "88.1"], ["KPR", "0.86"]]
+      .map(([label, value]) => `<div class="player-summary-stat-box-data-wrapper"><div class="player-summary-stat-box-data-text">${label}</div>` +
+        `<div class="player-summary-stat-box-data traditionalData">${value}</div></div>`).join("") +
+    `</div><div class="statistics"><div class="columns">` +
+    [["Total kills", "27311"], ["Headshot %", "41.2%"], ["Total deaths", "19002"], ["K/D Ratio", "1.44"],
+      ["Damage / round", "88.1"], ["Grenade dmg / Round", "4.9"], ["Maps played", "1140"], ["Rounds played", "30210"],
+      ["Kills / round", "0.86"], ["Assists / round", "0.12"], ["Deaths / round", "0.61"], ["Impact rating", "1.36"],
+      ["Rating 2.0", "1.29"]]
+      .map(([label, value]) => `<div class="stats-row"><span>${label}</span><span>${value}</span></div>`).join("") +
+    `</div></div>`, rng);
+
+  // 战队页: 排名、阵容、教练和近期比赛
+  pages["team.html"] = page("Vitality", `<div class="profile-team-container"><div class="profile-team-info">` +
+    `<h1 class="profile-team-name text-ellipsis">Vitality</h1><div class="team-country text-ellipsis">France</div></div>` +
+    `<div class="profile-team-stats-container"><div class="profile-team-stat"><b>World ranking</b>` +
+    `<span class="right"><a href="/ranking/teams">#1</a></span></div>` +
+    `<div class="profile-team-stat"><b>Weeks in top30 for core</b><span class="right">87</span></div>` +
+    `<div class="profile-team-stat"><b>Average player age</b><span class="right">25.4</span></div></div></div>` +
+    `<div class="bodyshot-team-bg"><div class="bodyshot-team g-grid">` +
+    roster("Vitality").map((p, i) => `<a href="/player/${7322 + i}/${slug(p)}" class="col-custom" title="${p}">` +
+      `<img class="bodyshot-team-img" src="/img/${slug(p)}.png"><div class="playerFlagName">` +
+      `<span class="gtSmartphone-only"><img class="flag" src="/img/flags/FR.gif" title="France"></span>` +
+      `<span class="text-ellipsis bold">${p}</span></div></a>`).join("") +
+    `</div></div><div class="profile-team-coach"><b>Coach</b><div class="text-ellipsis">XTQZZZ</div></div>` +
+    `<table class="table-container match-table"><tbody>` +
+    Array.from({ length: 40 }, (_, i) => `<tr class="team-row"><td class="date-cell"><span data-unix="${unix(-24 * i)}">date</span></td>` +
+      `<td class="team-center-cell"><div class="team-flex"><div class="team-name">Vitality</div>` +
+      `<div class="score-cell">${i % 3 ? "2 - 0" : "1 - 2"}</div><div class="team-name">${pick(TEAMS)}</div></div></td></tr>`).join("") +
+    `</tbody></table>`, rng);
+
+  // 比赛详情和一张地图的数据页
+  const stats = (team, players) => `<table class="stats-table totalstats"><thead><tr>` +
+    `<th class="st-teamname text-ellipsis">${team}</th><th class="st-kills">K (hs)</th><th class="st-assists">A (f)</th>` +
+    `<th class="st-deaths">D</th><th class="st-kdratio">KAST</th><th class="st-adr">ADR</th><th class="st-rating">Rating</th></tr></thead><tbody>` +
+    players.map((p) => `<tr><td class="st-player"><a href="/stats/players/1/${slug(p)}">${p}</a></td>` +
+      `<td class="st-kills">${10 + Math.floor(rng() * 20)} (${Math.floor(rng() * 10)})</td><td class="st-assists">${Math.floor(rng() * 8)}</td>` +
+      `<td class="st-deaths">${8 + Math.floor(rng() * 16)}</td><td class="st-kdratio">${(60 + rng() * 30).toFixed(1)}%</td>` +
+      `<td class="st-adr">${(50 + rng() * 60).toFixed(1)}</td><td class="st-rating">${(0.6 + rng() * 0.9).toFixed(2)}</td></tr>`).join("") +
+    `</tbody></table>`;
+  const opponent = "Natus Vincere";
+  pages["mapstats.html"] = page("Map stats", stats("Vitality", roster("Vitality")) + stats(opponent, roster(opponent)), rng);
+  const matchStats = (team, players) => `<table class="table totalstats"><tbody><tr class="header-row"><td class="players">${team}</td>` +
+    `<td class="kd">K-D</td><td class="adr">ADR</td><td class="kast">KAST</td><td class="rating">Rating</td></tr>` +
+    players.map((p) => `<tr><td class="players"><div class="flag-align"><span class="player-nick">${p}</span></div></td>` +
+      `<td class="kd text-center">${40 + Math.floor(rng() * 20)}-${30 + Math.floor(rng() * 20)}</td>` +
+      `<td class="adr text-center">${(60 + rng() * 40).toFixed(1)}</td><td class="kast text-center">${(65 + rng() * 20).toFixed(1)}%</td>` +
+      `<td class="rating text-center">${(0.8 + rng() * 0.6).toFixed(2)}</td></tr>`).join("") +
+    `</tbody></table>`;
+  pages["match.html"] = page("Vitality vs. Natus Vincere", `<div class="teamsBox">` +
+    `<div class="team"><div class="team1-gradient"><a href="/team/9565/vitality"><div class="teamName">Vitality</div></a><div class="won">2</div></div></div>` +
+    `<div class="timeAndEvent"><div class="time" data-unix="${unix(0)}">18:00</div><div class="date" data-unix="${unix(0)}">date</div>` +
+    `<div class="event text-ellipsis"><a href="/events/8000/iem-cologne-major-2026" title="${EVENTS[0]}">${EVENTS[0]}</a></div></div>` +
+    `<div class="countdown">Match over</div>` +
+    `<div class="team"><div class="team2-gradient"><a href="/team/4608/natus-vincere"><div class="teamName">${opponent}</div></a><div class="lost">1</div></div></div>` +
+    `</div><div class="flexbox-column">` +
+    ["Mirage", "Inferno", "Nuke"].map((map, i) => `<div class="mapholder"><div class="played"><div class="mapname">${map}</div></div>` +
+      `<div class="results played"><div class="results-left ${i === 1 ? "lost" : "won"}"><div class="results-teamname">Vitality</div>` +
+      `<div class="results-team-score">${i === 1 ? 10 : 13}</div></div><span class="results-center">` +
+      `<a href="/stats/matches/mapstatsid/${200001 + i}/vitality-vs-natus-vincere" class="results-stats">STATS</a></span>` +
+      `<div class="results-right ${i === 1 ? "won" : "lost"}"><div class="results-teamname">${opponent}</div>` +
+      `<div class="results-team-score">${i === 1 ? 13 : 9 - i}</div></div></div></div>`).join("") +
+    `</div><div id="all-content" class="stats-content">` +
+    matchStats("Vitality", roster("Vitality")) + matchStats(opponent, roster(opponent)) +
+    `</div>`, rng);
+
+  mkdirSync(FIXTURES, { recursive: true });
+  for (const [name, html] of Object.entries(pages)) {
+    writeFileSync(join(FIXTURES, name), html);
+    console.log(`generated ${name} (${(html.length / 1024).toFixed(0)} KB)`);
+  }
+}
+
+// ========== 基准 ==========
+const CLOCK_TICKS = 100;
+
+// Miniflare 启动的 workerd 子进程累计的 CPU 时间 (毫秒); 读不到 /proc 时返回 null
+function workerdCpuMs() {
+  try {
+    let ticks = 0;
+    let found = false;
+    for (const pid of readdirSync("/proc")) {
+      if (!/^\d+$/.test(pid)) continue;
+      let stat;
+      try {
+        stat = readFileSync(`/proc/${pid}/stat`, "utf8");
+      } catch (e) {
+        continue;
+      }
+      // 进程名之后依次为 state ppid ... utime(第 14 项) stime(第 15 项)
+      const fields = stat.slice(stat.lastIndexOf(")") + 2).split(" ");
+      if (Number(fields[1]) !== process.pid) continue;
+      ticks += Number(fields[11]) + Number(fields[12]);
+      found = true;
+    }
+    return found ? (ticks * 1000) / CLOCK_TICKS : null;
+  } catch (e) {
+    return null;
+  }
+}
+
+async function bench({ iterations, script }) {
+  if (!existsSync(FIXTURES)) {
+    console.error("fixtures/ 不存在，请先运行: node bench.mjs --generate");
+    process.exit(1);
+  }
+  const { Miniflare } = await import("miniflare");
+  const pages = new Map();
+  const mf = new Miniflare({
+    modules: true,
+    scriptPath: script,
+    compatibilityDate: "2024-01-01",
+    cache: false,
+    outboundService: async (request) => {
+      const name = fixtureName(request.url);
+      if (!name || !existsSync(join(FIXTURES, name))) {
+        return new Response("not found", { status: 404 });
+      }
+      if (!pages.has(name)) pages.set(name, readFileSync(join(FIXTURES, name)));
+      return new Response(pages.get(name), { headers: { "Content-Type": "text/html" } });
+    },
+  });
+
+  console.log(`worker: ${script}`);
+  console.log(
+    `${"route".padEnd(28)} ${"items".padStart(6)} ${"cpu ms".padStart(8)} ` +
+    `${"avg ms".padStart(8)} ${"p95 ms".padStart(8)} ${"max ms".padStart(8)}`
+  );
+  try {
+    // 预热: 编译脚本, 每个路由请求一次
+    for (const route of ROUTES) {
+      await (await mf.dispatchFetch(`http://localhost${route}`)).text();
+    }
+    for (const route of ROUTES) {
+      const times = [];
+      let items = 0;
+      const cpuStart = workerdCpuMs();
+      for (let i = 0; i < iterations; i++) {
+        // 每次使用不同的查询参数，绕过 worker 内的缓存
+        const sep = route.includes("?") ? "&" : "?";
+        const t0 = performance.now();
+        const res = await mf.dispatchFetch(`http://localhost${route}${sep}bench=${i}`);
+        const body = await res.json();
+        times.push(performance.now() - t0);
+        items = Array.isArray(body.data) ? body.data.length : body.success ? 1 : 0;
+      }
+      const cpuEnd = workerdCpuMs();
+      const cpu = cpuStart === null || cpuEnd === null ? "n/a" : ((cpuEnd - cpuStart) / iterations).toFixed(2);
+      times.sort((a, b) => a - b);
+      const avg = times.reduce((a, b) => a + b, 0) / times.length;
+      const p95 = times[Math.min(times.length - 1, Math.ceil(times.length * 0.95) - 1)];
+      console.log(
+        `${route.padEnd(28)} ${String(items).padStart(6)} ${cpu.padStart(8)} ${avg.toFixed(2).padStart(8)} ` +
+        `${p95.toFixed(2).padStart(8)} ${times[times.length - 1].toFixed(2).padStart(8)}`
+      );
+    }
+  } finally {
+    await mf.dispose();
+  }
+}
+
+const args = parseArgs(process.argv.slice(2));
+if (args.generate) {
+  generateFixtures();
+} else if (args.save) {
+  await saveFixtures(args.save);
+} else {
+  await bench(args);
+}
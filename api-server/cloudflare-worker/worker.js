@@ -52,27 +52,30 @@ export default {
             "/api/events",
             "/api/player?name=device",
             "/api/team?name=Tyloo",
+            "/api/match?id=2370000",
             "/api/proxy?path=/matches"
           ]
         });
       }
 
+      let handler = null;
+
       if (path === "/api/matches") {
-        return await handleMatches();
+        handler = () => handleMatches();
       }
 
       if (path === "/api/rankings") {
         const limit = parseInt(url.searchParams.get("limit") || "30");
-        return await handleRankings(limit);
+        handler = () => handleRankings(limit);
       }
 
       if (path === "/api/results") {
         const stars = parseInt(url.searchParams.get("stars") || "0");
-        return await handleResults(stars);
+        handler = () => handleResults(stars);
       }
 
       if (path === "/api/events") {
-        return await handleEvents();
+        handler = () => handleEvents();
       }
 
       if (path === "/api/player") {
@@ -80,7 +83,7 @@ export default {
         if (!name) {
           return jsonResponse({ success: false, error: "请提供选手名称 ?name=xxx" }, 400);
         }
-        return await handlePlayer(name);
+        handler = () => handlePlayer(name);
       }
 
       if (path === "/api/team") {
@@ -88,7 +91,19 @@ export default {
         if (!name) {
           return jsonResponse({ success: false, error: "请提供战队名称 ?name=xxx" }, 400);
         }
-        return await handleTeam(name);
+        handler = () => handleTeam(name);
+      }
+
+      if (path === "/api/match") {
+        const id = url.searchParams.get("id") || "";
+        if (!/^\d+$/.test(id)) {
+          return jsonResponse({ success: false, error: "请提供比赛ID ?id=xxx" }, 400);
+        }
+        handler = () => handleMatch(parseInt(id));
+      }
+
+      if (handler) {
+        return await cachedResponse(request, ctx, url, handler);
       }
 
       // 通用代理端点 - 直接转发到 HLTV
@@ -106,7 +121,7 @@ export default {
 };
 
 function jsonResponse(data, status = 200) {
-  return new Response(JSON.stringify(data, null, 2), {
+  return new Response(JSON.stringify(data), {
     status,
     headers: {
       "Content-Type": "application/json",
@@ -115,7 +130,228 @@ function jsonResponse(data, status = 200) {
   });
 }
 
-async function fetchHLTV(path) {
+// ========== 边缘缓存 ==========
+// 解析后的 JSON 按路由和查询参数缓存: ttl 内直接返回, 过期后 stale 秒内先返回旧数据并在后台刷新。
+// 设置了 notFoundTtl 的路由, 搜索不到的结果 (not_found) 也缓存 notFoundTtl 秒 (没有 stale 窗口),
+// 与 API Server 的未找到缓存 (HLTV_NOT_FOUND_TTL) 相同, 期间同名查询不再请求 HLTV 搜索页
+const CACHE_VERSION = "v1";
+const CACHE_ROUTES = {
+  "/api/matches": { ttl: 60, stale: 600 },
+  "/api/rankings": { ttl: 3600, stale: 86400 },
+  "/api/results": { ttl: 300, stale: 3600 },
+  "/api/events": { ttl: 3600, stale: 86400 },
+  "/api/player": { ttl: 600, stale: 86400, notFoundTtl: 300 },
+  "/api/team": { ttl: 3600, stale: 86400, notFoundTtl: 300 },
+  // 已结束的比赛不会再变化, 按 finalTtl 缓存 (一年); 缺少地图数据 (partial) 的结果按 ttl 缓存
+  "/api/match": { ttl: 30, stale: 300, finalTtl: 31536000 },
+};
+const CACHE_ROUTE_DEFAULT = { ttl: 60, stale: 600 };
+
+// isolate 内存缓存 (workers.dev 域名下 Cache API 不生效, 内存缓存仍然可用)
+const MEMORY_CACHE_MAX = 200;
+const memoryCache = new Map();
+// 正在进行的刷新, 同一个 key 同时只请求一次 HLTV
+const pendingRefresh = new Map();
+
+// fields 参数不影响抓取结果, 不计入缓存 key, 返回时再做投影
+function cacheKeyFor(url) {
+  const params = [...url.searchParams.entries()]
+    .filter(([k]) => k !== "fields")
+    .map(([k, v]) => [k, v.toLowerCase()])
+    .sort(([a], [b]) => (a < b ? -1 : a > b ? 1 : 0));
+  const query = new URLSearchParams(params).toString();
+  return `${url.origin}/__cache/${CACHE_VERSION}${url.pathname}${query ? "?" + query : ""}`;
+}
+
+async function sha1Hex(text) {
+  const digest = await crypto.subtle.digest("SHA-1", new TextEncoder().encode(text));
+  return [...new Uint8Array(digest)].map((b) => b.toString(16).padStart(2, "0")).join("");
+}
+
+function rememberEntry(key, entry) {
+  memoryCache.delete(key);
+  memoryCache.set(key, entry);
+  while (memoryCache.size > MEMORY_CACHE_MAX) {
+    memoryCache.delete(memoryCache.keys().next().value);
+  }
+}
+
+async function loadEntry(key) {
+  const entry = memoryCache.get(key);
+  if (entry) {
+    return entry;
+  }
+  const cached = await caches.default.match(key);
+  if (!cached) {
+    return null;
+  }
+  const loaded = {
+    body: await cached.text(),
+    etag: cached.headers.get("ETag"),
+    cachedAt: Number(cached.headers.get("X-Cached-At") || 0),
+    ttl: Number(cached.headers.get("X-Cache-Ttl") || 0) || null,
+    notFound: cached.headers.get("X-Not-Found") === "1",
+  };
+  rememberEntry(key, loaded);
+  return loaded;
+}
+
+async function storeEntry(key, entry, route) {
+  rememberEntry(key, entry);
+  // Cache API 按 max-age 淘汰, 保留到 stale 窗口结束
+  await caches.default.put(key, new Response(entry.body, {
+    headers: {
+      "Content-Type": "application/json",
+      "Cache-Control": `public, max-age=${entryTtl(entry, route) + staleWindow(entry, route)}`,
+      "ETag": entry.etag,
+      "X-Cached-At": String(entry.cachedAt),
+      "X-Cache-Ttl": String(entryTtl(entry, route)),
+      "X-Not-Found": entry.notFound ? "1" : "0",
+    }
+  }));
+}
+
+// 缓存条目的有效期: 路由设置了 finalTtl 时, 已结束 (status 为 finished) 且完整 (没有 partial) 的数据按 finalTtl 缓存
+function entryTtl(entry, route) {
+  return entry.ttl || route.ttl;
+}
+
+// 未找到的结果过期后不再返回旧数据
+function staleWindow(entry, route) {
+  return entry.notFound ? 0 : route.stale;
+}
+
+function finalTtl(route, payload) {
+  const data = payload && payload.data;
+  return route.finalTtl && data && data.status === "finished" && !data.partial ? route.finalTtl : null;
+}
+
+// 调用 handler 获取最新数据; 成功的数据 (以及路由允许缓存的未找到结果) 写入缓存并返回 entry,
+// 失败时返回原始响应内容 (不缓存)
+function refreshEntry(key, route, handler) {
+  let pending = pendingRefresh.get(key);
+  if (!pending) {
+    pending = (async () => {
+      const response = await handler();
+      const body = await response.text();
+      let payload = null;
+      try {
+        payload = JSON.parse(body);
+      } catch (e) {
+        payload = null;
+      }
+      const notFound = Boolean(route.notFoundTtl && payload && payload.success === false && payload.not_found === true);
+      if (response.status !== 200 || !payload || (payload.success !== true && !notFound)) {
+        return { failed: { body, status: response.status, headers: [...response.headers] } };
+      }
+      const entry = {
+        body,
+        etag: `"${await sha1Hex(body)}"`,
+        cachedAt: Date.now(),
+        ttl: notFound ? route.notFoundTtl : finalTtl(route, payload),
+        notFound,
+      };
+      await storeEntry(key, entry, route);
+      return { entry };
+    })().finally(() => pendingRefresh.delete(key));
+    pendingRefresh.set(key, pending);
+  }
+  return pending;
+}
+
+// 字段投影: fields=a,b,c 时列表中的每一项 (或单个对象) 只保留这些字段
+const MAX_PROJECTIONS = 100;
+const projections = new Map();
+
+function parseFields(url) {
+  const fields = (url.searchParams.get("fields") || "")
+    .split(",")
+    .map((f) => f.trim())
+    .filter((f) => /^[A-Za-z0-9_]+$/.test(f));
+  return fields.length ? fields : null;
+}
+
+function projectItem(item, fields) {
+  if (!item || typeof item !== "object" || Array.isArray(item)) return item;
+  const out = {};
+  for (const f of fields) {
+    if (f in item) out[f] = item[f];
+  }
+  return out;
+}
+
+// 同一份缓存数据的同一投影只计算一次
+function projectEntry(entry, fields) {
+  const key = `${entry.etag}|${fields.join(",")}`;
+  let projected = projections.get(key);
+  if (!projected) {
+    const payload = JSON.parse(entry.body);
+    const data = Array.isArray(payload.data)
+      ? payload.data.map((item) => projectItem(item, fields))
+      : projectItem(payload.data, fields);
+    projected = {
+      body: JSON.stringify({ ...payload, data }),
+      etag: `${entry.etag.slice(0, -1)}-${fields.join(".")}"`,
+      cachedAt: entry.cachedAt,
+      ttl: entry.ttl,
+      notFound: entry.notFound,
+    };
+    projections.set(key, projected);
+    if (projections.size > MAX_PROJECTIONS) {
+      projections.delete(projections.keys().next().value);
+    }
+  }
+  return projected;
+}
+
+function entryResponse(request, entry, route, status, fields = null) {
+  if (fields) {
+    entry = projectEntry(entry, fields);
+  }
+  const age = Math.max(0, Math.floor((Date.now() - entry.cachedAt) / 1000));
+  const headers = {
+    "Content-Type": "application/json",
+    "Cache-Control": `public, max-age=${Math.max(0, entryTtl(entry, route) - age)}, stale-while-revalidate=${staleWindow(entry, route)}`,
+    "ETag": entry.etag,
+    "Vary": "Accept-Encoding",
+    "Age": String(age),
+    "X-Cache": status,
+    ...corsHeaders
+  };
+  if (request.headers.get("If-None-Match") === entry.etag) {
+    return new Response(null, { status: 304, headers });
+  }
+  return new Response(entry.body, { headers });
+}
+
+async function cachedResponse(request, ctx, url, handler) {
+  const route = CACHE_ROUTES[url.pathname] || CACHE_ROUTE_DEFAULT;
+  const key = cacheKeyFor(url);
+  const fields = parseFields(url);
+  const entry = await loadEntry(key);
+
+  if (entry) {
+    const age = (Date.now() - entry.cachedAt) / 1000;
+    const ttl = entryTtl(entry, route);
+    if (age < ttl) {
+      return entryResponse(request, entry, route, "HIT", fields);
+    }
+    if (age < ttl + staleWindow(entry, route)) {
+      // 先返回旧数据, 后台刷新 (刷新失败时保留旧数据)
+      ctx.waitUntil(refreshEntry(key, route, handler).catch(() => null));
+      return entryResponse(request, entry, route, "STALE", fields);
+    }
+  }
+
+  const result = await refreshEntry(key, route, handler);
+  if (result.entry) {
+    return entryResponse(request, result.entry, route, "MISS", fields);
+  }
+  const { body, status, headers } = result.failed;
+  return new Response(body, { status, headers });
+}
+
+async function requestHLTV(path) {
   const response = await fetch(`${BASE_URL}${path}`, {
     headers: browserHeaders,
     cf: {
@@ -124,17 +360,36 @@ async function fetchHLTV(path) {
       cacheEverything: false,
     }
   });
-  
+
   if (!response.ok) {
-    throw new Error(`HLTV 请求失败: ${response.status}`);
+    const error = new Error(`HLTV 请求失败: ${response.status}`);
+    error.status = response.status;
+    throw error;
+  }
+
+  return response;
+}
+
+// 流式解析页面: HTMLRewriter 在数据到达时逐块回调, 不缓冲整页;
+// isDone() 返回 true 后取消读取, 剩余内容不再下载和解析
+async function streamHLTV(path, rewriter, isDone = () => false) {
+  const response = await requestHLTV(path);
+  const reader = rewriter.transform(response).body.getReader();
+  while (true) {
+    const { done } = await reader.read();
+    if (done) {
+      return;
+    }
+    if (isDone()) {
+      await reader.cancel();
+      return;
+    }
   }
-  
-  return await response.text();
 }
 
 async function proxyToHLTV(path) {
-  const html = await fetchHLTV(path);
-  return new Response(html, {
+  const response = await requestHLTV(path);
+  return new Response(response.body, {
     headers: {
       "Content-Type": "text/html",
       ...corsHeaders
@@ -142,81 +397,74 @@ async function proxyToHLTV(path) {
   });
 }
 
-// 简单的 HTML 解析辅助函数
-function extractText(html, selector) {
-  // 这是一个简化版本，实际可能需要更复杂的解析
-  const regex = new RegExp(`<[^>]*class="[^"]*${selector}[^"]*"[^>]*>([^<]*)<`, 'i');
-  const match = html.match(regex);
-  return match ? match[1].trim() : null;
+// 文本处理器: HTMLRewriter 会把一个文本节点拆成多块回调, 拼完整后再交给 callback
+function onText(callback) {
+  let buffer = "";
+  return {
+    text(chunk) {
+      buffer += chunk.text;
+      if (chunk.lastInTextNode) {
+        const text = buffer.trim();
+        buffer = "";
+        if (text) {
+          callback(text);
+        }
+      }
+    }
+  };
 }
 
-function extractAllMatches(html, pattern) {
-  const results = [];
-  let match;
-  const regex = new RegExp(pattern, 'gi');
-  while ((match = regex.exec(html)) !== null) {
-    results.push(match);
-  }
-  return results;
+function unixToDate(value) {
+  const unix = parseInt(value || "");
+  return unix ? new Date(unix).toISOString().split('T')[0] : null;
 }
 
 async function handleMatches() {
   try {
-    const html = await fetchHLTV("/matches");
-    
-    // 提取比赛信息 - 使用正则表达式解析
     const matches = [];
-    
-    // 匹配 match 容器
-    const matchPattern = /<div[^>]*class="[^"]*\bmatch\b[^"]*"[^>]*>([\s\S]*?)<\/div>\s*<\/div>\s*<\/div>/gi;
-    const matchBlocks = html.match(matchPattern) || [];
-    
-    for (const block of matchBlocks.slice(0, 15)) {
-      try {
-        // 提取队伍名
-        const teamPattern = /<div[^>]*class="[^"]*match-teamname[^"]*"[^>]*>([^<]+)<\/div>/gi;
-        const teams = [];
-        let teamMatch;
-        while ((teamMatch = teamPattern.exec(block)) !== null) {
-          teams.push(teamMatch[1].trim());
-        }
-        
-        if (teams.length < 2) continue;
-        
-        // 提取时间
-        const timeMatch = block.match(/<div[^>]*class="[^"]*match-time[^"]*"[^>]*>([^<]+)<\/div>/i);
-        const time = timeMatch ? timeMatch[1].trim() : "TBD";
-        
-        // 提取 BO 类型
-        const metaMatch = block.match(/<div[^>]*class="[^"]*match-meta[^"]*"[^>]*>([^<]+)<\/div>/i);
-        const boType = metaMatch ? metaMatch[1].trim() : "bo3";
-        
-        // 提取链接和赛事
-        const hrefMatch = block.match(/href="(\/matches\/[^"]+)"/i);
-        const href = hrefMatch ? hrefMatch[1] : "";
-        
-        let event = "Unknown";
-        if (href) {
-          const parts = href.split("/").pop().split("-vs-");
-          if (parts.length > 1) {
-            const eventParts = parts[1].split("-").slice(1);
-            event = eventParts.join(" ").replace(/\b\w/g, c => c.toUpperCase());
+    const LIMIT = 15;
+    let current = null;
+
+    // 比赛容器: <div class="match-wrapper"><div class="match">...</div></div>, 只处理最外层
+    const openMatch = {
+      element(el) {
+        if (current) return;
+        current = { teams: [], time: null, unix: null, live: false, meta: null, href: "" };
+        const block = current;
+        el.onEndTag(() => {
+          current = null;
+          if (block.teams.length >= 2 && matches.length < LIMIT) {
+            matches.push(buildMatch(block));
           }
-        }
-        
-        matches.push({
-          team1: teams[0],
-          team2: teams[1],
-          time: time,
-          bo_type: boType,
-          event: event,
-          url: href ? `${BASE_URL}${href}` : ""
         });
-      } catch (e) {
-        continue;
       }
-    }
-    
+    };
+
+    const rewriter = new HTMLRewriter()
+      .on("div.match-wrapper", openMatch)
+      .on("div.match", openMatch)
+      .on(".match-teamname", onText((text) => current && current.teams.push(text)))
+      .on(".match-time", {
+        element(el) {
+          if (current && current.unix === null) current.unix = el.getAttribute("data-unix");
+        }
+      })
+      .on(".match-time", onText((text) => current && current.time === null && (current.time = text)))
+      // 正在进行的比赛显示 LIVE 标记而不是开始时间
+      .on(".match-meta-live", {
+        element() {
+          if (current) current.live = true;
+        }
+      })
+      .on(".match-meta:not(.match-meta-live)", onText((text) => current && current.meta === null && (current.meta = text)))
+      .on('a[href^="/matches/"]', {
+        element(el) {
+          if (current && !current.href) current.href = el.getAttribute("href");
+        }
+      });
+
+    await streamHLTV("/matches", rewriter, () => matches.length >= LIMIT);
+
     return jsonResponse({
       success: true,
       message: `成功获取 ${matches.length} 场比赛`,
@@ -228,40 +476,71 @@ async function handleMatches() {
   }
 }
 
+function buildMatch(block) {
+  const href = block.href;
+  let event = "Unknown";
+  if (href) {
+    const parts = href.split("/").pop().split("-vs-");
+    if (parts.length > 1) {
+      const eventParts = parts[1].split("-").slice(1);
+      event = eventParts.join(" ").replace(/\b\w/g, c => c.toUpperCase());
+    }
+  }
+  const live = block.live || (block.time || "").toUpperCase() === "LIVE";
+  const unix = parseInt(block.unix || "");
+  return {
+    team1: block.teams[0],
+    team2: block.teams[1],
+    time: live ? "LIVE" : block.time || "TBD",
+    timestamp: unix ? Math.floor(unix / 1000) : null,
+    live: live,
+    bo_type: block.meta || "bo3",
+    event: event,
+    url: href ? `${BASE_URL}${href}` : ""
+  };
+}
+
 async function handleRankings(limit = 30) {
   try {
-    const html = await fetchHLTV("/ranking/teams");
-    
     const teams = [];
-    
-    // 匹配排名行
-    const rankPattern = /<div[^>]*class="[^"]*ranked-team[^"]*"[^>]*>([\s\S]*?)<\/div>\s*<\/div>\s*<\/div>\s*<\/div>/gi;
-    const rankBlocks = html.match(rankPattern) || [];
-    
-    for (const block of rankBlocks.slice(0, limit)) {
-      try {
-        // 排名
-        const posMatch = block.match(/<span[^>]*class="[^"]*position[^"]*"[^>]*>#?(\d+)<\/span>/i);
-        const rank = posMatch ? parseInt(posMatch[1]) : teams.length + 1;
-        
-        // 队名
-        const nameMatch = block.match(/<span[^>]*class="[^"]*name[^"]*"[^>]*>([^<]+)<\/span>/i);
-        const name = nameMatch ? nameMatch[1].trim() : "Unknown";
-        
-        // 积分 - 格式: <span class="points">(930 points)</span>
-        const pointsMatch = block.match(/<span[^>]*class="[^"]*points[^"]*"[^>]*>\((\d+)/i);
-        const points = pointsMatch ? parseInt(pointsMatch[1]) : 0;
-        
-        teams.push({
-          rank: rank,
-          title: name,
-          points: points
-        });
-      } catch (e) {
-        continue;
-      }
-    }
-    
+    let current = null;
+
+    const rewriter = new HTMLRewriter()
+      .on("div.ranked-team", {
+        element(el) {
+          if (current) return;
+          current = { rank: null, name: null, points: null, members: [] };
+          const block = current;
+          el.onEndTag(() => {
+            current = null;
+            if (teams.length >= limit) return;
+            teams.push({
+              rank: block.rank || teams.length + 1,
+              title: block.name || "Unknown",
+              points: block.points || 0,
+              members: block.members
+            });
+          });
+        }
+      })
+      // 排名 - 格式: <span class="position">#1</span>
+      .on("span.position", onText((text) => {
+        const m = text.match(/#?(\d+)/);
+        if (current && current.rank === null && m) current.rank = parseInt(m[1]);
+      }))
+      .on("span.name", onText((text) => current && current.name === null && (current.name = text)))
+      // 积分 - 格式: <span class="points">(930 points)</span>
+      .on("span.points", onText((text) => {
+        const m = text.match(/\((\d+)/);
+        if (current && current.points === null && m) current.points = parseInt(m[1]);
+      }))
+      // 阵容 - 格式: <div class="rankingNicknames"><span>ZywOo</span></div>
+      .on(".rankingNicknames", onText((text) => {
+        if (current && current.members.length < 5) current.members.push(text);
+      }));
+
+    await streamHLTV("/ranking/teams", rewriter, () => teams.length >= limit);
+
     return jsonResponse({
       success: true,
       message: `成功获取 ${teams.length} 支战队排名`,
@@ -277,83 +556,47 @@ async function handleResults(minStars = 0) {
   try {
     // 如果指定了星级，使用 HLTV 的 stars 参数过滤
     const path = minStars > 0 ? `/results?stars=${minStars}` : "/results";
-    const html = await fetchHLTV(path);
-    
     const results = [];
-    
-    // 简化解析 - 提取结果容器
-    const resultPattern = /<div[^>]*class="[^"]*result-con[^"]*"[^>]*>([\s\S]*?)<\/a>/gi;
-    const resultBlocks = html.match(resultPattern) || [];
-    
-    for (const block of resultBlocks.slice(0, 30)) {
-      try {
-        // 提取星级
-        const starsMatch = block.match(/<div[^>]*class="[^"]*stars[^"]*"[^>]*>([\s\S]*?)<\/div>/i);
-        let stars = 0;
-        if (starsMatch) {
-          stars = (starsMatch[1].match(/fa-star/g) || []).length;
-        }
-        
-        // 提取队伍
-        const teamPattern = /<div[^>]*class="[^"]*team[^"]*"[^>]*>([^<]+)<\/div>/gi;
-        const teams = [];
-        let teamMatch;
-        while ((teamMatch = teamPattern.exec(block)) !== null) {
-          const text = teamMatch[1].trim();
-          if (text && !text.match(/^\d/)) {
-            teams.push(text);
-          }
-        }
-        
-        // 比分 - 格式: <span class="score-won">13</span> - <span class="score-lost">7</span>
-        // 或者: <td class="result-score">..scores..</td>
-        let score1 = 0, score2 = 0;
-        
-        // 方法1: 匹配 score-won 和 score-lost
-        const scoreWonMatch = block.match(/<span[^>]*class="[^"]*score-won[^"]*"[^>]*>(\d+)<\/span>/i);
-        const scoreLostMatch = block.match(/<span[^>]*class="[^"]*score-lost[^"]*"[^>]*>(\d+)<\/span>/i);
-        
-        if (scoreWonMatch && scoreLostMatch) {
-          // 需要判断哪个队伍赢了
-          // 在 result-score 中，第一个 span 是左边队伍的分数
-          const scoreSection = block.match(/<td[^>]*class="[^"]*result-score[^"]*"[^>]*>([\s\S]*?)<\/td>/i);
-          if (scoreSection) {
-            const scores = scoreSection[1].match(/>(\d+)</g);
-            if (scores && scores.length >= 2) {
-              score1 = parseInt(scores[0].replace(/[><]/g, ''));
-              score2 = parseInt(scores[1].replace(/[><]/g, ''));
-            }
-          }
-        }
-        
-        // 方法2: 如果上面失败，尝试简单的数字匹配
-        if (score1 === 0 && score2 === 0) {
-          const simpleScoreMatch = block.match(/>(\d+)<\/span>\s*-\s*<span[^>]*>(\d+)</i);
-          if (simpleScoreMatch) {
-            score1 = parseInt(simpleScoreMatch[1]);
-            score2 = parseInt(simpleScoreMatch[2]);
-          }
-        }
-        
-        // 赛事
-        const eventMatch = block.match(/<span[^>]*class="[^"]*event-name[^"]*"[^>]*>([^<]+)<\/span>/i);
-        const event = eventMatch ? eventMatch[1].trim() : "Unknown";
-        
-        if (teams.length >= 2) {
-          results.push({
-            team1: teams[0],
-            team2: teams[1],
-            score1: score1,
-            score2: score2,
-            event: event,
-            stars: stars
+    const LIMIT = 30;
+    let current = null;
+
+    const rewriter = new HTMLRewriter()
+      .on("div.result-con", {
+        element(el) {
+          if (current) return;
+          current = { stars: 0, teams: [], scores: [], event: null };
+          const block = current;
+          el.onEndTag(() => {
+            current = null;
+            if (block.teams.length < 2 || results.length >= LIMIT) return;
+            results.push({
+              team1: block.teams[0],
+              team2: block.teams[1],
+              score1: block.scores.length >= 2 ? block.scores[0] : 0,
+              score2: block.scores.length >= 2 ? block.scores[1] : 0,
+              event: block.event || "Unknown",
+              stars: block.stars
+            });
           });
         }
-      } catch (e) {
-        continue;
-      }
-    }
-    
+      })
+      // 星级 - 每颗星是一个 <i class="fa fa-star">
+      .on(".stars .fa-star", {
+        element() {
+          if (current) current.stars += 1;
+        }
+      })
+      .on("div.team", onText((text) => {
+        if (current && !/^\d/.test(text)) current.teams.push(text);
+      }))
+      // 比分 - 格式: <td class="result-score"><span class="score-won">13</span> - <span class="score-lost">7</span></td>
+      .on(".result-score span", onText((text) => {
+        if (current && /^\d+$/.test(text)) current.scores.push(parseInt(text));
+      }))
+      .on("span.event-name", onText((text) => current && current.event === null && (current.event = text)));
+
+    await streamHLTV(path, rewriter, () => results.length >= LIMIT);
+
     const starFilter = minStars > 0 ? ` (${minStars}星及以上)` : "";
     return jsonResponse({
       success: true,
@@ -366,64 +609,84 @@ async function handleResults(minStars = 0) {
   }
 }
 
+// 在搜索页中查找第一个指定类型的链接 (如 /player/123/name), 找到后停止读取
+async function searchHLTV(name, kind) {
+  const pattern = new RegExp(`^/${kind}/\\d+/[^"]+$`);
+  let found = null;
+  const rewriter = new HTMLRewriter().on(`a[href^="/${kind}/"]`, {
+    element(el) {
+      const href = el.getAttribute("href");
+      if (!found && pattern.test(href)) found = href;
+    }
+  });
+  await streamHLTV(`/search?query=${encodeURIComponent(name)}`, rewriter, () => found !== null);
+  return found;
+}
+
 async function handlePlayer(name) {
   try {
     // 搜索选手
-    const searchHtml = await fetchHLTV(`/search?query=${encodeURIComponent(name)}`);
-    
-    // 查找选手链接
-    const playerMatch = searchHtml.match(/href="(\/player\/\d+\/[^"]+)"/i);
-    if (!playerMatch) {
-      return jsonResponse({ success: false, error: `未找到选手 '${name}'` });
+    const playerPath = await searchHLTV(name, "player");
+    if (!playerPath) {
+      return jsonResponse({ success: false, not_found: true, error: `未找到选手 '${name}'` });
     }
-    
-    const playerPath = playerMatch[1];
-    const playerHtml = await fetchHLTV(playerPath);
-    
-    // 解析选手信息 - 结构: <div class="playerRealname"...><img...> Mathieu Herbaut</div>
-    // 名字在 <img> 标签之后
-    const fullNameMatch = playerHtml.match(/<div[^>]*class="[^"]*playerRealname[^"]*"[^>]*>(?:<img[^>]*>)?\s*([^<]+)<\/div>/i);
-    const fullName = fullNameMatch ? fullNameMatch[1].trim() : name;
-    
-    // 提取战队名 - 从 team 链接: <a href="/team/..." itemprop="text">Vitality</a>
-    const teamMatch = playerHtml.match(/<a[^>]*href="\/team\/\d+\/[^"]*"[^>]*itemprop="text"[^>]*>([^<]+)<\/a>/i);
-    const team = teamMatch ? teamMatch[1].trim() : "Unknown";
-    
-    // 提取 Rating 3.0 - 结构: <div class="player-stat"><b>Rating 3.0</b><span class="statsVal">\n<p>1.27</p>
-    const ratingMatch = playerHtml.match(/<b>Rating 3\.0<\/b><span[^>]*class="[^"]*statsVal[^"]*"[^>]*>\s*<p>([0-9.]+)<\/p>/i);
-    const rating = ratingMatch ? ratingMatch[1] : "N/A";
-    
+
+    // 解析选手信息 - 结构: <div class="playerRealname"...><img class="flag" title="France"...> Mathieu Herbaut</div>
+    let fullName = null, country = null, team = null, rating = null, statLabel = null;
+    const profile = new HTMLRewriter()
+      .on(".playerRealname", onText((text) => fullName === null && (fullName = text)))
+      .on(".playerRealname .flag", { element(el) { if (country === null) country = el.getAttribute("title"); } })
+      // 战队 - 格式: <a href="/team/..." itemprop="text">Vitality</a>
+      .on('a[href^="/team/"][itemprop="text"]', onText((text) => team === null && (team = text)))
+      // Rating 3.0 - 结构: <div class="player-stat"><b>Rating 3.0</b><span class="statsVal"><p>1.27</p>
+      .on(".player-stat b", onText((text) => { statLabel = text; }))
+      .on(".player-stat .statsVal p", onText((text) => {
+        if (rating === null && statLabel === "Rating 3.0" && /^[0-9.]+$/.test(text)) rating = text;
+      }));
+    await streamHLTV(playerPath, profile, () => fullName !== null && team !== null && rating !== null);
+
     // 获取统计页面
     const pathParts = playerPath.split("/");
     const playerId = pathParts[2];
     const playerSlug = pathParts[3];
-    
-    let stats = {};
+
+    const stats = {};
     try {
-      const statsHtml = await fetchHLTV(`/stats/players/${playerId}/${playerSlug}`);
-      
-      // KPR
-      const kprMatch = statsHtml.match(/Kills\s*\/\s*round[\s\S]*?<span[^>]*>([0-9.]+)<\/span>/i);
-      if (kprMatch) stats.kpr = kprMatch[1];
-      
-      // ADR
-      const adrMatch = statsHtml.match(/Damage\s*\/\s*round[\s\S]*?<span[^>]*>([0-9.]+)<\/span>/i);
-      if (adrMatch) stats.adr = adrMatch[1];
-      
-      // KAST
-      const kastMatch = statsHtml.match(/KAST[\s\S]*?([0-9.]+)%/i);
-      if (kastMatch) stats.kast = kastMatch[1] + "%";
+      // 统计项为 "标签 ... 数值" 的相邻文本节点, 按文档顺序扫描
+      let pending = null;
+      const labels = [
+        ["kpr", /Kills\s*\/\s*round/i, /^([0-9.]+)$/],
+        ["adr", /Damage\s*\/\s*round/i, /^([0-9.]+)$/],
+        ["kast", /KAST/i, /([0-9.]+)%/],
+      ];
+      const statsPage = new HTMLRewriter().onDocument(onText((text) => {
+        if (pending) {
+          const m = text.match(pending[2]);
+          if (m) {
+            stats[pending[0]] = pending[0] === "kast" ? m[1] + "%" : m[1];
+            pending = null;
+            return;
+          }
+        }
+        const label = labels.find(([key, re]) => !(key in stats) && re.test(text));
+        if (label) pending = label;
+      }));
+      await streamHLTV(
+        `/stats/players/${playerId}/${playerSlug}`, statsPage,
+        () => labels.every(([key]) => key in stats)
+      );
     } catch (e) {
       // 统计页面获取失败，继续
     }
-    
+
     return jsonResponse({
       success: true,
       data: {
         name: name,
-        full_name: fullName,
-        team: team,
-        rating: rating,
+        full_name: fullName || name,
+        team: team || "Unknown",
+        country: country || "Unknown",
+        rating: rating || "N/A",
         kpr: stats.kpr || "N/A",
         adr: stats.adr || "N/A",
         kast: stats.kast || "N/A",
@@ -447,94 +710,76 @@ const EVENT_TIERS = {
   // OTHER: { tier: "D", name: "其他" },
 };
 
+// 解析一个赛事列表页 (大型赛事 big-event 和小型赛事 small-event)
+async function streamEvents(eventType, tierInfo, events) {
+  let current = null;
+
+  const openEvent = (kind) => ({
+    element(el) {
+      const href = el.getAttribute("href") || "";
+      if (current || !/^\/events\/\d+\//.test(href)) return;
+      current = { kind, href, name: null, location: null, dates: [] };
+      const block = current;
+      el.onEndTag(() => {
+        current = null;
+        events.push({
+          name: block.name || "Unknown",
+          tier: tierInfo.tier,
+          tier_name: tierInfo.name,
+          event_type: eventType,
+          location: block.location || "TBD",
+          start_date: block.dates.length >= 2 ? unixToDate(block.dates[0]) : null,
+          end_date: block.dates.length >= 2 ? unixToDate(block.dates[1]) : null,
+          url: `${BASE_URL}${block.href}`
+        });
+      });
+    }
+  });
+
+  const rewriter = new HTMLRewriter()
+    // 结构: <a href="/events/xxx" class="... big-event ...">内容</a>
+    .on("a.big-event", openEvent("big"))
+    .on("a.small-event", openEvent("small"))
+    .on(".big-event-name", onText((text) => {
+      if (current && current.kind === "big" && current.name === null) current.name = text;
+    }))
+    .on(".big-event-location", onText((text) => {
+      if (current && current.kind === "big" && current.location === null) current.location = text;
+    }))
+    // 小型赛事名称 - <div class="table-cell name">xxx</div>
+    .on("div.name", onText((text) => {
+      if (current && current.kind === "small" && current.name === null) current.name = text;
+    }))
+    .on("[data-unix]", {
+      element(el) {
+        if (current) current.dates.push(el.getAttribute("data-unix"));
+      }
+    });
+
+  await streamHLTV(`/events?eventType=${eventType}`, rewriter);
+}
+
 async function handleEvents() {
   try {
     const events = [];
-    
+
     // 只获取 S 和 A 级别赛事 (MAJOR 和 INTLLAN)
     for (const [eventType, tierInfo] of Object.entries(EVENT_TIERS)) {
       try {
-        const html = await fetchHLTV(`/events?eventType=${eventType}`);
-        
-        // 解析大型赛事 (big-event) - 结构: <a href="/events/xxx" class="... big-event ...">内容</a>
-        const bigEventPattern = /<a[^>]*href="(\/events\/\d+\/[^"]+)"[^>]*class="[^"]*big-event[^"]*"[^>]*>([\s\S]*?)<\/a>/gi;
-        let match;
-        
-        while ((match = bigEventPattern.exec(html)) !== null) {
-          const eventUrl = match[1];
-          const eventBlock = match[2];
-          
-          // 提取赛事名称
-          const nameMatch = eventBlock.match(/<div[^>]*class="[^"]*big-event-name[^"]*"[^>]*>([^<]+)<\/div>/i);
-          const name = nameMatch ? nameMatch[1].trim() : "Unknown";
-          
-          // 提取地点
-          const locationMatch = eventBlock.match(/<span[^>]*class="[^"]*big-event-location[^"]*"[^>]*>([^<]+)<\/span>/i);
-          const location = locationMatch ? locationMatch[1].trim() : "TBD";
-          
-          // 提取日期
-          const dateMatches = eventBlock.match(/data-unix="(\d+)"/g);
-          let startDate = null, endDate = null;
-          if (dateMatches && dateMatches.length >= 2) {
-            startDate = parseInt(dateMatches[0].match(/\d+/)[0]);
-            endDate = parseInt(dateMatches[1].match(/\d+/)[0]);
-          }
-          
-          events.push({
-            name: name,
-            tier: tierInfo.tier,
-            tier_name: tierInfo.name,
-            event_type: eventType,
-            location: location,
-            start_date: startDate ? new Date(startDate).toISOString().split('T')[0] : null,
-            end_date: endDate ? new Date(endDate).toISOString().split('T')[0] : null,
-            url: `${BASE_URL}${eventUrl}`
-          });
-        }
-        
-        // 解析小型赛事 (small-event) - 结构: <a href="/events/xxx" class="... small-event ...">内容</a>
-        const smallEventPattern = /<a[^>]*href="(\/events\/\d+\/[^"]+)"[^>]*class="[^"]*small-event[^"]*"[^>]*>([\s\S]*?)<\/a>/gi;
-        
-        while ((match = smallEventPattern.exec(html)) !== null) {
-          const eventUrl = match[1];
-          const eventBlock = match[2];
-          
-          // 提取赛事名称 - <div class="table-cell name">xxx</div>
-          const nameMatch = eventBlock.match(/<div[^>]*class="[^"]*\bname\b[^"]*"[^>]*>([^<]+)<\/div>/i);
-          const name = nameMatch ? nameMatch[1].trim() : "Unknown";
-          
-          // 提取日期
-          const dateMatches = eventBlock.match(/data-unix="(\d+)"/g);
-          let startDate = null, endDate = null;
-          if (dateMatches && dateMatches.length >= 2) {
-            startDate = parseInt(dateMatches[0].match(/\d+/)[0]);
-            endDate = parseInt(dateMatches[1].match(/\d+/)[0]);
-          }
-          
-          events.push({
-            name: name,
-            tier: tierInfo.tier,
-            tier_name: tierInfo.name,
-            event_type: eventType,
-            location: "TBD",
-            start_date: startDate ? new Date(startDate).toISOString().split('T')[0] : null,
-            end_date: endDate ? new Date(endDate).toISOString().split('T')[0] : null,
-            url: `${BASE_URL}${eventUrl}`
-          });
-        }
+        await streamEvents(eventType, tierInfo, events);
       } catch (e) {
         // 某个类型获取失败，继续下一个
         continue;
       }
     }
-    
+
     // 按开始日期排序（最近的在前）
     events.sort((a, b) => {
       if (!a.start_date) return 1;
       if (!b.start_date) return -1;
       return new Date(a.start_date) - new Date(b.start_date);
     });
-    
+
     return jsonResponse({
       success: true,
       message: `成功获取 ${events.length} 场重要赛事 (S级: Major, A级: 国际LAN)`,
@@ -549,41 +794,32 @@ async function handleEvents() {
 async function handleTeam(name) {
   try {
     // 搜索战队
-    const searchHtml = await fetchHLTV(`/search?query=${encodeURIComponent(name)}`);
-    
-    // 查找战队链接
-    const teamMatch = searchHtml.match(/href="(\/team\/\d+\/[^"]+)"/i);
-    if (!teamMatch) {
-      return jsonResponse({ success: false, error: `未找到战队 '${name}'` });
+    const teamPath = await searchHLTV(name, "team");
+    if (!teamPath) {
+      return jsonResponse({ success: false, not_found: true, error: `未找到战队 '${name}'` });
     }
-    
-    const teamPath = teamMatch[1];
-    const teamHtml = await fetchHLTV(teamPath);
-    
+
     // 解析战队信息
-    const nameMatch = teamHtml.match(/<h1[^>]*class="[^"]*profile-team-name[^"]*"[^>]*>([^<]+)<\/h1>/i);
-    const actualName = nameMatch ? nameMatch[1].trim() : name;
-    
-    // 排名
-    const rankMatch = teamHtml.match(/#(\d+)/);
-    const rank = rankMatch ? `#${rankMatch[1]}` : "N/A";
-    
-    // 成员
+    let actualName = null, rank = null;
     const members = [];
-    const memberPattern = /<span[^>]*class="[^"]*text-ellipsis[^"]*"[^>]*>([^<]+)<\/span>/gi;
-    let memberMatch;
-    while ((memberMatch = memberPattern.exec(teamHtml)) !== null && members.length < 5) {
-      const text = memberMatch[1].trim();
-      if (text && text.length > 1 && text.length < 20) {
-        members.push(text);
-      }
-    }
-    
+    const rewriter = new HTMLRewriter()
+      .on("h1.profile-team-name", onText((text) => actualName === null && (actualName = text)))
+      // 排名 - 页面中第一个 "#12" 形式的文本
+      .onDocument(onText((text) => {
+        const m = text.match(/^#(\d+)$/);
+        if (rank === null && m) rank = `#${m[1]}`;
+      }))
+      // 成员
+      .on("span.text-ellipsis", onText((text) => {
+        if (members.length < 5 && text.length > 1 && text.length < 20) members.push(text);
+      }));
+    await streamHLTV(teamPath, rewriter, () => actualName !== null && rank !== null && members.length >= 5);
+
     return jsonResponse({
       success: true,
       data: {
-        name: actualName,
-        rank: rank,
+        name: actualName || name,
+        rank: rank || "N/A",
         members: members.slice(0, 5),
         url: `${BASE_URL}${teamPath}`
       },
@@ -593,3 +829,191 @@ async function handleTeam(name) {
     return jsonResponse({ success: false, error: error.message }, 500);
   }
 }
+
+// 比赛页面的比分字段 (胜/负/平各一个 class)
+const SCORE_CLASSES = ["won", "lost", "tie"];
+
+function parseNumber(text) {
+  const m = (text || "").match(/-?\d+(?:\.\d+)?/);
+  return m ? Number(m[0]) : null;
+}
+
+function matchStatus(text) {
+  const lower = text.toLowerCase();
+  if (lower.includes("match over")) return "finished";
+  if (lower.includes("live")) return "live";
+  return "upcoming";
+}
+
+// 选手数据行: 各列只取第一个单元格 (新版页面同一列有多种口径的数据)
+function statsRow(rewriter, scope, columns, rows, getTeam) {
+  let row = null;
+  rewriter.on(`${scope} tr`, {
+    element(el) {
+      const current = { team: getTeam() };
+      row = current;
+      el.onEndTag(() => {
+        row = null;
+        if (current.name) rows.push(current);
+      });
+    }
+  });
+  for (const [selector, apply] of columns) {
+    rewriter.on(`${scope} ${selector}`, onText((text) => {
+      if (row) apply(row, text);
+    }));
+  }
+}
+
+function setOnce(key, value) {
+  return (row, text) => {
+    if (!(key in row)) row[key] = value(text);
+  };
+}
+
+function playerLine(row) {
+  return {
+    name: row.name,
+    team: row.team,
+    kills: row.kills ?? null,
+    deaths: row.deaths ?? null,
+    adr: row.adr ?? null,
+    kast: row.kast || null,
+    rating: row.rating ?? null,
+  };
+}
+
+// 单张地图数据页 (/stats/matches/mapstatsid/...) 的选手数据
+async function streamMapStats(path) {
+  const rows = [];
+  const teams = [];
+  const rewriter = new HTMLRewriter()
+    .on("table.totalstats th.st-teamname", onText((text) => teams.push(text)));
+  statsRow(rewriter, "table.totalstats tbody", [
+    ["td.st-player a", setOnce("name", (t) => t)],
+    ["td.st-kills", setOnce("kills", parseNumber)],
+    ["td.st-deaths", setOnce("deaths", parseNumber)],
+    ["td.st-kdratio", setOnce("kast", (t) => t)],
+    ["td.st-adr", setOnce("adr", parseNumber)],
+    ["td.st-rating", setOnce("rating", parseNumber)],
+  ], rows, () => teams[teams.length - 1] || null);
+  await streamHLTV(path, rewriter);
+  return rows.map(playerLine);
+}
+
+async function handleMatch(id) {
+  try {
+    const path = `/matches/${id}/match`;
+    const match = {
+      id,
+      team1: null,
+      team2: null,
+      score1: null,
+      score2: null,
+      event: null,
+      timestamp: null,
+      status: "upcoming",
+      maps: [],
+      players: [],
+      partial: false,
+      url: `${BASE_URL}${path}`,
+    };
+    let currentMap = null;
+    let table = -1;
+    const rows = [];
+
+    const rewriter = new HTMLRewriter()
+      .on(".team1-gradient .teamName", onText((text) => match.team1 === null && (match.team1 = text)))
+      .on(".team2-gradient .teamName", onText((text) => match.team2 === null && (match.team2 = text)))
+      .on(".timeAndEvent .time", {
+        element(el) {
+          const unix = parseInt(el.getAttribute("data-unix") || "");
+          if (match.timestamp === null && unix) match.timestamp = Math.floor(unix / 1000);
+        }
+      })
+      .on(".timeAndEvent .event a", onText((text) => match.event === null && (match.event = text)))
+      .on(".countdown", onText((text) => { match.status = matchStatus(text); }))
+      // 地图 - 结构: <div class="mapholder"><div class="mapname">Mirage</div>...<div class="results-team-score">13</div>
+      .on(".mapholder", {
+        element(el) {
+          const block = { name: null, score1: null, score2: null, stats: null };
+          currentMap = block;
+          el.onEndTag(() => {
+            currentMap = null;
+            if (!block.name || block.name.toUpperCase() === "TBA") return;
+            match.maps.push({
+              name: block.name,
+              score1: block.score1,
+              score2: block.score2,
+              stats_url: block.stats ? `${BASE_URL}${block.stats}` : null,
+              players: [],
+            });
+          });
+        }
+      })
+      .on(".mapholder .mapname", onText((text) => currentMap && currentMap.name === null && (currentMap.name = text)))
+      .on(".mapholder .results-left .results-team-score", onText((text) => {
+        if (currentMap) currentMap.score1 = parseNumber(text);
+      }))
+      .on(".mapholder .results-right .results-team-score", onText((text) => {
+        if (currentMap) currentMap.score2 = parseNumber(text);
+      }))
+      .on(".mapholder a.results-stats", {
+        element(el) {
+          const href = el.getAttribute("href") || "";
+          if (currentMap && /^\/stats\/matches\/mapstatsid\/\d+\//.test(href)) currentMap.stats = href;
+        }
+      })
+      // 全场选手数据 - 每队一张 <table class="totalstats">
+      .on("#all-content table.totalstats", {
+        element() {
+          table += 1;
+        }
+      });
+    for (const cls of SCORE_CLASSES) {
+      rewriter
+        .on(`.team1-gradient .${cls}`, onText((text) => match.score1 === null && (match.score1 = parseNumber(text))))
+        .on(`.team2-gradient .${cls}`, onText((text) => match.score2 === null && (match.score2 = parseNumber(text))));
+    }
+    statsRow(rewriter, "#all-content", [
+      [".player-nick", setOnce("name", (t) => t)],
+      ["td.kd", setOnce("kd", (t) => t)],
+      ["td.adr", setOnce("adr", parseNumber)],
+      ["td.kast", setOnce("kast", (t) => t)],
+      ["td.rating", setOnce("rating", parseNumber)],
+    ], rows, () => (table === 0 ? match.team1 : match.team2));
+
+    try {
+      await streamHLTV(path, rewriter);
+    } catch (error) {
+      if (error.status === 404) {
+        return jsonResponse({ success: false, not_found: true, error: `未找到比赛 ${id}` });
+      }
+      throw error;
+    }
+    if (match.team1 === null && match.team2 === null) {
+      return jsonResponse({ success: false, not_found: true, error: `未找到比赛 ${id}` });
+    }
+    match.team1 = match.team1 || "TBD";
+    match.team2 = match.team2 || "TBD";
+    match.event = match.event || "Unknown";
+    match.players = rows.map((row) => {
+      const [kills, deaths] = (row.kd || "").split("-").map(parseNumber);
+      return playerLine({ ...row, kills, deaths });
+    });
+
+    // 各地图数据页互不依赖, 并发获取 (单张失败时该地图没有选手数据, 结果标记为 partial)
+    await Promise.all(match.maps.filter((m) => m.stats_url).map(async (m) => {
+      try {
+        m.players = await streamMapStats(m.stats_url.slice(BASE_URL.length));
+      } catch (e) {
+        m.players = [];
+      }
+    }));
+    match.partial = match.maps.some((m) => m.stats_url && m.players.length === 0);
+
+    return jsonResponse({ success: true, data: match, source: "hltv-cf-worker" });
+  } catch (error) {
+    return jsonResponse({ success: false, error: error.message }, 500);
+  }
+}
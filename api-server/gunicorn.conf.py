@@ -0,0 +1,45 @@
+"""
+gunicorn 配置: 自建服务器上的多进程部署
+
+    cd api-server
+    pip install -r requirements.txt
+    gunicorn -c gunicorn.conf.py
+
+| 环境变量 | 默认值 | 说明 |
+| HLTV_BIND | 0.0.0.0:8000 | 监听地址 |
+| HLTV_WORKERS | CPU 核数 | 工作进程数 (页面解析是 CPU 密集的, 多进程才能利用多核) |
+| HLTV_THREADS | 4 | 每个进程的线程数 (等待 HLTV 响应时处理其他请求) |
+| HLTV_CACHE_DB | <临时目录>/hltv-api-cache.db | 各进程共享的未找到缓存 |
+
+快照模式 (HLTV_SNAPSHOT_DIR) 下快照目录本身就在进程间共享, 抓取任务通过文件锁只在一个进程中运行。
+"""
+
+import multiprocessing
+import os
+import tempfile
+
+# 在 fork 前导入应用时生效 (index.py 在导入时读取)
+os.environ.setdefault("HLTV_PREFORK", "1")
+os.environ.setdefault("HLTV_CACHE_DB", os.path.join(tempfile.gettempdir(), "hltv-api-cache.db"))
+
+wsgi_app = "wsgi:app"
+bind = os.environ.get("HLTV_BIND", "0.0.0.0:8000")
+workers = int(os.environ.get("HLTV_WORKERS", 0)) or multiprocessing.cpu_count()
+worker_class = "gthread"
+threads = int(os.environ.get("HLTV_THREADS", 4))
+# 在主进程中导入应用并预加载, 工作进程 (包括按 max_requests 重启的) 直接继承
+preload_app = True
+# 比赛详情需要依次抓取比赛页和各地图数据页
+timeout = 60
+graceful_timeout = 30
+keepalive = 5
+max_requests = 5000
+max_requests_jitter = 500
+accesslog = os.environ.get("HLTV_ACCESS_LOG") or None
+
+
+def post_fork(server, worker):
+    """主进程中的线程不会被继承, 快照抓取等后台任务在每个工作进程中启动 (文件锁保证只有一个在抓取)"""
+    from api import index
+
+    index.start_background_tasks()
@@ -0,0 +1,18 @@
+"""
+生产环境入口 (多进程 pre-fork, 见 gunicorn.conf.py)
+
+    cd api-server
+    gunicorn -c gunicorn.conf.py
+
+gunicorn 以 preload_app 在 fork 前导入本模块: 应用、解析依赖、抓取会话和编译好的选择器
+只在主进程初始化一次, 工作进程以写时复制的方式共享。
+"""
+
+import os
+
+from api.index import app, preload
+
+# 每个工作线程一个抓取会话
+preload(int(os.environ.get("HLTV_THREADS", 4)))
+
+__all__ = ["app"]
@@ -6,10 +6,11 @@ from nonebot.plugin import PluginMetadata
 from .config import ConfigModel
 from . import matcher  # 导入 matcher 以注册命令
 
-# 尝试加载 WebUI
+# 尝试加载 WebUI (未启用时不导入)
 try:
-    from . import web_ui
-    web_ui.init_web_ui()
+    if matcher.config.enable_web_ui:
+        from . import web_ui
+        web_ui.init_web_ui()
 except ImportError:
     pass
 except Exception as e:
@@ -24,8 +25,12 @@ __plugin_meta__ = PluginMetadata(
         "/cs2比赛 - 查看当前CS2比赛\n"
         "/cs2战队 <战队名> - 查询战队信息\n"
         "/cs2结果 - 查看最近比赛结果\n"
-        "/cs2排名 - 查看战队排名\n"
+        "/cs2排名 [变化] - 查看战队排名(及排名变化)\n"
         "/cs2选手 <选手名> - 查询选手信息\n"
+        "/cs2对比 <选手1> <选手2> ... - 对比选手数据\n"
+        "/cs2详情 <比赛ID/链接> [地图序号] - 查看比赛详情\n"
+        "/cs2榜单 <指标> [战队/国家] - 查看选手数据榜单\n"
+        "/cs2日报 [订阅/退订] - 订阅每日日报\n"
         "\n"
         "也支持在对话中自动识别CS2相关话题"
     ),
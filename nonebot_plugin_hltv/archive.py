@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from __future__ import annotations
+
+import json
+import logging
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class MatchArchive:
+    """已结束比赛的详情 (不会再变化), 永久保存在磁盘上
+
+    按比赛ID寻址: ``<root>/<ID 后两位>/<ID>.json``, 按后两位分目录避免单个目录下文件过多。
+    读写都是阻塞的文件操作, 在事件循环中应通过 ``asyncio.to_thread`` 调用。
+    """
+
+    def __init__(self, root: Path) -> None:
+        self.root = Path(root)
+
+    def path(self, match_id: int) -> Path:
+        return self.root / f"{match_id % 100:02d}" / f"{match_id}.json"
+
+    def get(self, match_id: int) -> Optional[Dict[str, Any]]:
+        path = self.path(match_id)
+        if not path.exists():
+            return None
+        try:
+            return json.loads(path.read_text(encoding="utf-8"))
+        except Exception as e:
+            logger.error(f"读取比赛存档失败 {match_id}: {e}")
+            return None
+
+    def put(self, match_id: int, data: Dict[str, Any]) -> None:
+        path = self.path(match_id)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(data, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+            tmp.replace(path)
+        except Exception as e:
+            logger.error(f"保存比赛存档失败 {match_id}: {e}")
@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+# 当前上下文的截止时间 (time.monotonic), None 表示不限制
+_deadline: ContextVar[Optional[float]] = ContextVar("hltv_request_deadline", default=None)
+
+
+def remaining_budget() -> Optional[float]:
+    """当前上下文剩余的延迟预算 (秒, 可能为负), 未设置预算时返回 None"""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+@contextmanager
+def request_budget(seconds: Optional[float]) -> Iterator[None]:
+    """在 with 块内 (包括其中创建的任务) 的上游请求共用 seconds 秒的延迟预算
+
+    排队、请求和重试都计入预算; 嵌套时取较早的截止时间。seconds 为空或不大于 0 时不限制。
+    """
+    if not seconds or seconds <= 0:
+        yield
+        return
+    deadline = time.monotonic() + seconds
+    outer = _deadline.get()
+    token = _deadline.set(deadline if outer is None else min(deadline, outer))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+
+
+class TTLCache:
+    """内存 TTL 缓存 (LRU 淘汰)
+
+    过期的数据不会立即删除，可通过 ``get_stale`` 取出用于降级。
+    """
+
+    def __init__(self, max_size: int = 512) -> None:
+        self.max_size = max_size
+        # key -> (过期时间, 写入时间, 数据)
+        self._data: "OrderedDict[str, Tuple[float, float, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key, count=False) is not None
+
+    def get(self, key: str, count: bool = True) -> Optional[Any]:
+        """获取未过期的数据"""
+        entry = self._data.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if count:
+                self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        if count:
+            self.hits += 1
+        return entry[2]
+
+    def get_stale(self, key: str) -> Optional[Tuple[Any, float]]:
+        """获取数据 (包括已过期的)，返回 (数据, 已缓存秒数)"""
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        return entry[2], time.monotonic() - entry[1]
+
+    def expires_in(self, key: str) -> Optional[float]:
+        """数据剩余有效秒数, 不存在或已过期时返回 None"""
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        remaining = entry[0] - time.monotonic()
+        return remaining if remaining > 0 else None
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        now = time.monotonic()
+        self._data[key] = (now + ttl, now, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
@@ -1,6 +1,8 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+from typing import Literal
+
 from nonebot import get_plugin_config
 from pydantic import BaseModel
 
@@ -12,29 +14,68 @@ class ConfigModel(BaseModel):
     hltv_api_url: str = ""  # API Server URL (如: https://your-app.vercel.app)
 
     # 缓存配置
-    cache_duration_matches: int = 60  # 比赛数据缓存时间(秒)
+    cache_duration_matches: int = 60  # 比赛数据缓存时间(秒), API Server 不返回比赛开始时间时使用
     cache_duration_teams: int = 3600  # 战队排名缓存时间(秒)
     cache_duration_results: int = 300  # 比赛结果缓存时间(秒)
+    cache_duration_players: int = 600  # 选手数据缓存时间(秒)
+    cache_duration_not_found: int = 300  # 未找到的选手/战队名称的缓存时间(秒), 0 为不缓存
+    # 缓存后端: memory (进程内) / sqlite (同一台机器上的多个机器人进程共享, 只有一个进程请求上游)
+    cache_backend: Literal["memory", "sqlite"] = "memory"
+    cache_shared_path: str = ""  # 共享缓存数据库路径, 为空时使用 <hltv_data_dir>/shared_cache.db
+    # 比赛数据按开始时间自适应刷新 (代替 cache_duration_matches): 有比赛进行中时按最短间隔, 没有安排比赛时按最长间隔
+    enable_match_polling: bool = True  # 在后台按自适应间隔刷新比赛数据
+    poll_interval_min: int = 30  # 最短刷新间隔(秒)
+    poll_interval_max: int = 1800  # 最长刷新间隔(秒)
+
+    # 本地数据目录 (排名历史等)
+    hltv_data_dir: str = "data/nonebot_plugin_hltv"
 
     # 查询配置
     max_matches_per_query: int = 10  # 每次查询最大比赛数量
     max_teams_in_ranking: int = 30  # 战队排名最大数量
     max_results_per_query: int = 20  # 每次查询最大结果数量
     default_query_days: int = 1  # 默认查询天数
+    max_players_in_compare: int = 5  # 选手对比最大人数
+    compare_concurrency: int = 3  # 选手对比并发请求数
+    upstream_concurrency: int = 6  # 对 API Server 的最大并发请求数 (命令优先于后台请求)
+    # 每条命令的延迟预算(秒), 其中的排队、请求和失败重试共用; 超出时使用过期的缓存数据并附加说明, 0 为不限制
+    command_budget: float = 10
 
     # 功能开关
     enable_caching: bool = True  # 启用缓存机制
     enable_detailed_logging: bool = True  # 启用详细日志
-    enable_topic_detection: bool = True  # 启用话题检测
+    enable_topic_detection: bool = False  # 启用话题检测 (被动回复群消息, 默认关闭)
+    topic_reply_cooldown: int = 600  # 同一群同一话题的回复冷却时间(秒)
+    enable_web_ui: bool = True  # 启用 WebUI (/hltv), 关闭时不加载 FastAPI/Jinja2 相关模块
+    enable_load_test: bool = False  # 允许 WebUI 测试接口的压测模式 (只能压测自建的 API Server)
+
+    # 每日日报 (上期日报以来的高星级赛事结果 + 今天的比赛), 只获取和渲染一次后推送到所有订阅的群
+    digest_time: str = "09:00"  # 每天推送时间 (HH:MM, 本地时间), 为空时不推送
+    digest_min_stars: int = 4  # 日报包含的最低赛事星级 (5=S级, 4=A级及以上)
+    digest_send_rate: float = 1.0  # 每个机器人账号每秒发送的日报消息数
+    digest_send_attempts: int = 3  # 每个群最多发送次数 (失败后按随机退避重试)
+
+    # 选手榜单 (/cs2榜单): 后台按批量优先级获取排名前 N 战队全部选手的数据, 榜单查询只读本地数据表
+    leaderboard_teams: int = 30  # 收录排名前多少支战队的选手
+    leaderboard_refresh: int = 21600  # 后台刷新间隔(秒), 0 为不刷新
+    leaderboard_concurrency: int = 2  # 刷新时的并发请求数
+
+    # 链路追踪 (命令 -> 数据请求 -> API Server), 两项都为 0 时关闭
+    trace_sample_rate: float = 0.0  # 采样比例 (0~1)
+    trace_slow_threshold: float = 0  # 耗时超过该秒数的命令/请求总是记录 (0 = 不按耗时保留)
+    trace_export: str = ""  # 导出目标: 文件路径 (JSON Lines) 或 OTLP 采集器地址 (http://...:4318), 为空时使用 <hltv_data_dir>/traces.jsonl
 
     # 工具响应配置
     context_depth_default: str = "basic"  # 默认上下文深度
     include_match_ratings: bool = True  # 包含比赛重要程度
     show_live_scores: bool = True  # 显示实时比分
     show_ranking_changes: bool = True  # 显示排名变化
+    ranking_trend_weeks: int = 4  # 排名趋势对比的周数
 
     class Config:
         extra = "ignore"
+        # 配置不可变, 热更新时整体替换
+        frozen = True
 
 
 def get_config() -> ConfigModel:
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import json
+import logging
+import random
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def result_key(match: Dict[str, Any]) -> str:
+    """比赛结果的标识 (API 不返回结果的日期和ID, 用对阵、比分和赛事区分)"""
+    return "|".join(
+        str(match.get(k, "")) for k in ("team1", "team2", "score1", "score2", "event")
+    )
+
+
+def select_results(
+    results: Iterable[Dict[str, Any]], min_stars: int, seen: Iterable[str] = ()
+) -> List[Dict[str, Any]]:
+    """选出达到星级且上一期日报时还没有的比赛结果"""
+    seen = set(seen)
+    return [
+        m for m in results
+        if int(m.get("stars") or 0) >= min_stars and result_key(m) not in seen
+    ]
+
+
+def todays_matches(matches: Iterable[Dict[str, Any]], now: Optional[float] = None) -> List[Dict[str, Any]]:
+    """进行中及今天 (本地时间) 开始的比赛; 没有开始时间的比赛 (旧版 API Server) 全部保留"""
+    now = time.time() if now is None else now
+    today = date.fromtimestamp(now)
+    selected = []
+    for match in matches:
+        start = match.get("timestamp")
+        if match.get("live") or not isinstance(start, (int, float)) or date.fromtimestamp(start) == today:
+            selected.append(match)
+    return selected
+
+
+def seconds_until(clock: str, now: Optional[datetime] = None) -> float:
+    """距下一次 HH:MM (本地时间) 的秒数"""
+    now = now or datetime.now()
+    hour, minute = (int(part) for part in clock.split(":", 1))
+    target = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if target <= now:
+        target += timedelta(days=1)
+    return (target - now).total_seconds()
+
+
+class DigestStore:
+    """日报订阅 (群号 -> 订阅时所在的机器人账号) 及上一期日报时已有的比赛结果, 保存为 JSON 文件"""
+
+    def __init__(self, path: Optional[Path] = None) -> None:
+        self.path = path
+        self.groups: Dict[int, str] = {}
+        self.last_results: List[str] = []
+        self.last_sent: Optional[str] = None
+        if path is not None:
+            self._load()
+
+    def __len__(self) -> int:
+        return len(self.groups)
+
+    def _load(self) -> None:
+        if not self.path or not self.path.exists():
+            return
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            self.groups = {int(k): str(v) for k, v in data.get("groups", {}).items()}
+            self.last_results = list(data.get("last_results", []))
+            self.last_sent = data.get("last_sent")
+        except Exception as e:
+            logger.error(f"读取日报订阅失败: {e}")
+
+    def _save(self) -> None:
+        if not self.path:
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            data = {
+                "groups": {str(k): v for k, v in self.groups.items()},
+                "last_results": self.last_results,
+                "last_sent": self.last_sent,
+            }
+            tmp = self.path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(data, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+            tmp.replace(self.path)
+        except Exception as e:
+            logger.error(f"保存日报订阅失败: {e}")
+
+    def subscribe(self, group_id: int, self_id: str) -> bool:
+        """订阅日报, 已订阅时只更新机器人账号, 返回是否为新订阅"""
+        is_new = group_id not in self.groups
+        self.groups[group_id] = self_id
+        self._save()
+        return is_new
+
+    def unsubscribe(self, group_id: int) -> bool:
+        if self.groups.pop(group_id, None) is None:
+            return False
+        self._save()
+        return True
+
+    def record_sent(
+        self, results: Iterable[Dict[str, Any]], day: Optional[str] = None, scheduled: bool = True
+    ) -> None:
+        """记录一期日报及当时已有的比赛结果, 下一期只包含之后出现的结果
+
+        只有定时推送记录推送日期 (last_sent), 手动推送后当天的定时推送照常进行。
+        """
+        self.last_results = [result_key(m) for m in results]
+        if scheduled:
+            self.last_sent = day or date.today().isoformat()
+        self._save()
+
+
+# 发送函数: (机器人账号, 群号) -> 发送结果, 失败时抛出异常
+SendFunc = Callable[[str, int], Awaitable[Any]]
+
+
+class DigestSender:
+    """把同一条消息发送到多个群
+
+    每个机器人账号按 rate 条/秒匀速发送 (各账号并行), 发送失败的群按抖动的指数退避重新排队,
+    最多尝试 attempts 次。群的订阅账号不在线时由其他在线账号发送。
+    """
+
+    # 报告中最多列出的失败群数
+    MAX_FAILURES = 20
+
+    def __init__(self, rate: float = 1.0, attempts: int = 3, backoff: float = 2.0) -> None:
+        self.rate = max(rate, 0.01)
+        self.attempts = max(attempts, 1)
+        self.backoff = backoff
+
+    @staticmethod
+    def assign(groups: Dict[int, str], bots: List[str]) -> Dict[str, List[int]]:
+        """按订阅账号分配各群的发送账号, 订阅账号不在线的群轮流分给在线账号"""
+        plan: Dict[str, List[int]] = {self_id: [] for self_id in bots}
+        orphans = 0
+        for group_id, self_id in groups.items():
+            if self_id not in plan:
+                self_id = bots[orphans % len(bots)]
+                orphans += 1
+            plan[self_id].append(group_id)
+        return plan
+
+    async def broadcast(self, groups: Dict[int, str], bots: List[str], send: SendFunc) -> Dict[str, Any]:
+        """发送到所有群, 返回发送报告 (成功/失败数、重试次数、耗时和吞吐量)"""
+        started = time.monotonic()
+        report: Dict[str, Any] = {
+            "groups": len(groups),
+            "bots": len(bots),
+            "sent": 0,
+            "failed": 0,
+            "retries": 0,
+            "failures": [],
+        }
+        if groups and not bots:
+            report["failed"] = len(groups)
+            report["failures"] = [
+                {"group_id": g, "error": "没有在线的机器人账号"} for g in list(groups)[: self.MAX_FAILURES]
+            ]
+        elif groups:
+            plan = self.assign(groups, bots)
+            await asyncio.gather(
+                *(self._run_bot(self_id, targets, send, report) for self_id, targets in plan.items() if targets)
+            )
+        elapsed = time.monotonic() - started
+        report["seconds"] = round(elapsed, 2)
+        report["throughput"] = round(report["sent"] / elapsed, 2) if elapsed > 0 else 0.0
+        report["time"] = time.time()
+        return report
+
+    async def _run_bot(self, self_id: str, targets: List[int], send: SendFunc, report: Dict[str, Any]) -> None:
+        """按速率依次发送一个账号负责的群; 失败的群在退避时间后重新排队, 期间不阻塞其他群"""
+        interval = 1 / self.rate
+        # (可发送时间, 序号, 群号, 已尝试次数)
+        pending: List[Tuple[float, int, int, int]] = [(0.0, i, g, 0) for i, g in enumerate(targets)]
+        seq = len(pending)
+        next_send = time.monotonic()
+        while pending:
+            ready_at, _, group_id, tries = heapq.heappop(pending)
+            wait = max(ready_at, next_send) - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            next_send = time.monotonic() + interval
+            try:
+                await send(self_id, group_id)
+                report["sent"] += 1
+                continue
+            except Exception as e:
+                tries += 1
+                error = f"{type(e).__name__}: {e}"
+            if tries >= self.attempts:
+                logger.warning(f"日报发送失败 (群 {group_id}, 账号 {self_id}): {error}")
+                report["failed"] += 1
+                if len(report["failures"]) < self.MAX_FAILURES:
+                    report["failures"].append({"group_id": group_id, "error": error})
+                continue
+            report["retries"] += 1
+            delay = random.uniform(0, self.backoff * 2 ** (tries - 1))
+            heapq.heappush(pending, (time.monotonic() + delay, seq, group_id, tries))
+            seq += 1
@@ -0,0 +1,493 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from __future__ import annotations
+
+import json
+import logging
+import math
+import struct
+import time
+from array import array
+from bisect import bisect_left
+from datetime import date, timedelta
+from itertools import filterfalse, repeat
+from operator import sub
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class RankingSnapshot:
+    """单次排名快照 (列式存储: 战队ID / 排名 / 积分 三列等长数组)"""
+
+    __slots__ = ("date", "ids", "ranks", "points")
+
+    def __init__(self, day: str, ids: array, ranks: array, points: array) -> None:
+        self.date = day
+        self.ids = ids
+        self.ranks = ranks
+        self.points = points
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "date": self.date,
+            "ids": self.ids.tolist(),
+            "ranks": self.ranks.tolist(),
+            "points": self.points.tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "RankingSnapshot":
+        return cls(
+            data["date"],
+            array("I", data["ids"]),
+            array("H", data["ranks"]),
+            array("I", data["points"]),
+        )
+
+
+def _delta(reference: array, deltas: Iterable[int]) -> List[Optional[int]]:
+    """reference 为 0 (对比快照中未上榜) 的位置变化量为 None"""
+    return [d if r else None for r, d in zip(reference, deltas)]
+
+
+class RankingHistory:
+    """战队排名历史
+
+    每次获取到排名数据时记录一个快照，与上一次快照完全相同时不重复记录。
+    计算排名变化时把对比快照的排名/积分列按最新快照的战队ID列对齐, 再整列相减,
+    不需要逐队查找历史; 只有最后组装返回的字典时按战队逐个进行。
+    """
+
+    def __init__(self, path: Optional[Path] = None, max_snapshots: int = 120) -> None:
+        self.path = path
+        self.max_snapshots = max_snapshots
+        self._team_names: List[str] = []
+        self._team_ids: Dict[str, int] = {}
+        self.snapshots: List[RankingSnapshot] = []
+        if path is not None:
+            self._load()
+
+    def _load(self) -> None:
+        if not self.path or not self.path.exists():
+            return
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            self._team_names = list(data.get("teams", []))
+            self._team_ids = {name: i for i, name in enumerate(self._team_names)}
+            self.snapshots = [RankingSnapshot.from_dict(s) for s in data.get("snapshots", [])]
+        except Exception as e:
+            logger.error(f"读取排名历史失败: {e}")
+
+    def _save(self) -> None:
+        if not self.path:
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            data = {
+                "teams": self._team_names,
+                "snapshots": [s.to_dict() for s in self.snapshots],
+            }
+            tmp = self.path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(data, separators=(",", ":")), encoding="utf-8")
+            tmp.replace(self.path)
+        except Exception as e:
+            logger.error(f"保存排名历史失败: {e}")
+
+    def team_id(self, name: str) -> int:
+        tid = self._team_ids.get(name)
+        if tid is None:
+            tid = len(self._team_names)
+            self._team_names.append(name)
+            self._team_ids[name] = tid
+        return tid
+
+    def team_name(self, tid: int) -> str:
+        return self._team_names[tid]
+
+    def record(self, teams: Iterable[Dict[str, Any]], day: Optional[str] = None) -> bool:
+        """记录一次排名数据，返回是否产生了新快照"""
+        ids, ranks, points = array("I"), array("H"), array("I")
+        for team in teams:
+            name = team.get("title")
+            if not name:
+                continue
+            ids.append(self.team_id(name))
+            ranks.append(int(team.get("rank") or 0))
+            points.append(int(team.get("points") or 0))
+        if not ids:
+            return False
+
+        snapshot = RankingSnapshot(day or date.today().isoformat(), ids, ranks, points)
+        if self.snapshots:
+            last = self.snapshots[-1]
+            n = min(len(last), len(snapshot))
+            unchanged = (
+                last.ids[:n] == ids[:n] and last.ranks[:n] == ranks[:n] and last.points[:n] == points[:n]
+            )
+            if unchanged or last.date == snapshot.date:
+                # 排名未更新或同一天内, 只保留最完整的一份数据
+                if len(snapshot) <= len(last):
+                    if unchanged or len(snapshot) < len(last):
+                        return False
+                if unchanged:
+                    snapshot.date = last.date
+                self.snapshots[-1] = snapshot
+                self._save()
+                return True
+
+        self.snapshots.append(snapshot)
+        if len(self.snapshots) > self.max_snapshots:
+            del self.snapshots[: len(self.snapshots) - self.max_snapshots]
+        self._save()
+        return True
+
+    @staticmethod
+    def _align(snapshot: RankingSnapshot, ids: array, column: str) -> array:
+        """按 ids 的顺序取出快照中某一列的值 (0 表示未上榜), 整列一次完成"""
+        lookup = dict(zip(snapshot.ids, getattr(snapshot, column)))
+        return array("I", map(lookup.get, ids, repeat(0, len(ids))))
+
+    def _snapshot_before(self, days: int) -> Optional[RankingSnapshot]:
+        """找到距最新快照至少 days 天之前的快照 (没有则取最早的一份)"""
+        if len(self.snapshots) < 2:
+            return None
+        latest = date.fromisoformat(self.snapshots[-1].date)
+        target = (latest - timedelta(days=days)).isoformat()
+        for snapshot in reversed(self.snapshots[:-1]):
+            if snapshot.date <= target:
+                return snapshot
+        return self.snapshots[0]
+
+    def changes(self, trend_weeks: int = 4) -> Dict[str, Dict[str, Any]]:
+        """计算最新快照相对上一快照和 N 周前快照的排名/积分变化
+
+        Returns:
+            战队名 -> {rank, points, rank_delta, points_delta, trend_rank, trend_points, new}
+            rank_delta 为正表示排名上升；new 表示上一快照中未上榜
+        """
+        if not self.snapshots:
+            return {}
+        latest = self.snapshots[-1]
+        previous = self.snapshots[-2] if len(self.snapshots) > 1 else None
+        past = self._snapshot_before(trend_weeks * 7)
+
+        ids, ranks, points = latest.ids, latest.ranks, latest.points
+        rank_delta = points_delta = trend_rank = trend_points = [None] * len(ids)
+        new = [False] * len(ids)
+        if previous is not None:
+            prev_rank = self._align(previous, ids, "ranks")
+            prev_points = self._align(previous, ids, "points")
+            rank_delta = _delta(prev_rank, map(sub, prev_rank, ranks))
+            points_delta = _delta(prev_rank, map(sub, points, prev_points))
+            # 上一快照未上榜, 且排名在上一快照覆盖的范围内
+            covered = len(previous)
+            new = [not r and rank <= covered for r, rank in zip(prev_rank, ranks)]
+        if past is not None:
+            past_rank = self._align(past, ids, "ranks")
+            past_points = self._align(past, ids, "points")
+            trend_rank = _delta(past_rank, map(sub, past_rank, ranks))
+            trend_points = _delta(past_rank, map(sub, points, past_points))
+
+        # 各列已对齐计算完成, 这里只按战队组装返回的字典
+        return {
+            self._team_names[tid]: {
+                "rank": row[0],
+                "points": row[1],
+                "rank_delta": row[2],
+                "points_delta": row[3],
+                "trend_rank": row[4],
+                "trend_points": row[5],
+                "new": row[6],
+            }
+            for tid, *row in zip(
+                ids, ranks, points, rank_delta, points_delta, trend_rank, trend_points, new
+            )
+        }
+
+    def span(self, trend_weeks: int = 4) -> Tuple[Optional[str], Optional[str]]:
+        """返回 (上一快照日期, 趋势对比快照日期)"""
+        previous = self.snapshots[-2].date if len(self.snapshots) > 1 else None
+        past = self._snapshot_before(trend_weeks * 7)
+        return previous, past.date if past else None
+
+
+# 选手数据历史记录的指标
+PLAYER_METRICS = ("rating", "kpr", "adr", "kast")
+
+DAY = 86400
+
+
+def parse_stat(value: Any) -> float:
+    """'1.25' / '72.1%' -> 浮点数, 无法解析 (如 'N/A') 时为 nan"""
+    try:
+        return float(str(value).strip().rstrip("%"))
+    except (TypeError, ValueError):
+        return math.nan
+
+
+class PlayerSeries:
+    """单个选手的数据序列 (时间戳及每个指标各一个等长数组)"""
+
+    __slots__ = ("times", "values")
+
+    def __init__(self) -> None:
+        self.times = array("I")
+        self.values = {metric: array("f") for metric in PLAYER_METRICS}
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    def append(self, ts: int, values: Iterable[float]) -> None:
+        self.times.append(ts)
+        for metric, value in zip(PLAYER_METRICS, values):
+            self.values[metric].append(value)
+
+
+def _mean(values: Iterable[float]) -> float:
+    valid = list(filterfalse(math.isnan, values))
+    return math.fsum(valid) / len(valid) if valid else math.nan
+
+
+class PlayerStatsHistory:
+    """选手数据历史
+
+    每次从 API 获取到选手数据时追加一个数据点, 保存为只追加的二进制文件:
+    ``N`` 记录登记选手名 (按出现顺序编号), ``P`` 记录一个数据点 (选手编号、时间戳、各指标)。
+    选手每新增 compact_every 个数据点 (及启动时) 对其旧数据降采样:
+    最近 raw_days 天保留全部数据点, raw_days ~ daily_days 天每天一个点, 更早的每周一个点,
+    超过 retention_days 天的丢弃, 因此每名选手的数据点数有上限。
+    文件中已被降采样替代的记录超过保留的数据点数时重写文件, 文件大小同样有上限。
+    """
+
+    _NAME = struct.Struct("<cH")
+    _POINT = struct.Struct("<cII" + "f" * len(PLAYER_METRICS))
+
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        raw_days: int = 2,
+        daily_days: int = 90,
+        retention_days: int = 365,
+        compact_every: int = 64,
+    ) -> None:
+        self.path = path
+        self.raw_days = raw_days
+        self.daily_days = daily_days
+        self.retention_days = retention_days
+        self.compact_every = compact_every
+        self._names: List[str] = []
+        self._ids: Dict[str, int] = {}
+        self._series: List[PlayerSeries] = []
+        # 每名选手上次降采样后新增的数据点数
+        self._since_compact: List[int] = []
+        # 保留的数据点数 / 文件中的数据点记录数
+        self._points = 0
+        self._file_points = 0
+        if path is not None:
+            self._load()
+
+    def __len__(self) -> int:
+        """数据点总数"""
+        return self._points
+
+    @staticmethod
+    def _key(name: str) -> str:
+        return name.strip().lower()
+
+    def _player_id(self, name: str) -> Tuple[int, bool]:
+        key = self._key(name)
+        pid = self._ids.get(key)
+        if pid is not None:
+            return pid, False
+        pid = len(self._names)
+        self._names.append(key)
+        self._ids[key] = pid
+        self._series.append(PlayerSeries())
+        self._since_compact.append(0)
+        return pid, True
+
+    def _name_record(self, name: str) -> bytes:
+        encoded = name.encode("utf-8")
+        return self._NAME.pack(b"N", len(encoded)) + encoded
+
+    def _point_record(self, pid: int, series: PlayerSeries, i: int) -> bytes:
+        return self._POINT.pack(
+            b"P", pid, series.times[i], *(series.values[m][i] for m in PLAYER_METRICS)
+        )
+
+    def _load(self) -> None:
+        if not self.path or not self.path.exists():
+            return
+        try:
+            data = self.path.read_bytes()
+        except OSError as e:
+            logger.error(f"读取选手数据历史失败: {e}")
+            return
+        offset = 0
+        while offset < len(data):
+            kind = data[offset:offset + 1]
+            if kind == b"N" and offset + self._NAME.size <= len(data):
+                _, size = self._NAME.unpack_from(data, offset)
+                end = offset + self._NAME.size + size
+                if end > len(data):
+                    break
+                self._player_id(data[offset + self._NAME.size:end].decode("utf-8", "replace"))
+            elif kind == b"P" and offset + self._POINT.size <= len(data):
+                _, pid, ts, *values = self._POINT.unpack_from(data, offset)
+                end = offset + self._POINT.size
+                if pid < len(self._series):
+                    self._series[pid].append(ts, values)
+                    self._points += 1
+            else:
+                # 写入中断留下的不完整记录, 下面重写文件时丢弃
+                logger.warning(f"选手数据历史文件在 {offset} 字节处损坏, 忽略之后的数据")
+                break
+            offset = end
+        self._file_points = self._points
+        if self.compact() < self._file_points or offset < len(data):
+            self._rewrite()
+
+    def _rewrite(self) -> None:
+        if not self.path:
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            chunks = []
+            for pid, (name, series) in enumerate(zip(self._names, self._series)):
+                chunks.append(self._name_record(name))
+                chunks.extend(self._point_record(pid, series, i) for i in range(len(series)))
+            tmp = self.path.with_suffix(".tmp")
+            tmp.write_bytes(b"".join(chunks))
+            tmp.replace(self.path)
+            self._file_points = self._points
+        except Exception as e:
+            logger.error(f"保存选手数据历史失败: {e}")
+
+    def _append(self, chunk: bytes) -> None:
+        if not self.path:
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.path.open("ab") as f:
+                f.write(chunk)
+        except Exception as e:
+            logger.error(f"保存选手数据历史失败: {e}")
+
+    def record(self, player: Dict[str, Any], ts: Optional[float] = None) -> bool:
+        """记录一次选手数据, 返回是否产生了新数据点 (没有选手名或指标全部缺失时不记录)"""
+        name = player.get("name") if isinstance(player, dict) else None
+        if not name:
+            return False
+        values = [parse_stat(player.get(metric)) for metric in PLAYER_METRICS]
+        if all(math.isnan(v) for v in values):
+            return False
+
+        pid, is_new = self._player_id(name)
+        series = self._series[pid]
+        # 时间戳保持递增 (系统时间回拨时沿用上一个时间戳)
+        ts = int(time.time() if ts is None else ts)
+        if series.times and ts < series.times[-1]:
+            ts = series.times[-1]
+        series.append(ts, values)
+        self._points += 1
+        chunk = self._point_record(pid, series, len(series) - 1)
+        self._append(self._name_record(self._names[pid]) + chunk if is_new else chunk)
+        self._file_points += 1
+
+        self._since_compact[pid] += 1
+        if self._since_compact[pid] >= self.compact_every:
+            self._compact_player(pid, ts)
+            if self._file_points - self._points > max(self._points, self.compact_every):
+                self._rewrite()
+        return True
+
+    def _downsample(self, series: PlayerSeries, now: float) -> PlayerSeries:
+        """按数据点的时间分桶: 近期每个点一个桶, 之后每天/每周一个桶, 桶内各指标取均值"""
+        raw_since = now - self.raw_days * DAY
+        daily_since = now - self.daily_days * DAY
+        times = series.times
+        start = bisect_left(times, int(now - self.retention_days * DAY))
+        raw_start = max(bisect_left(times, int(raw_since)), start)
+        daily_start = max(bisect_left(times, int(daily_since)), start)
+
+        result = PlayerSeries()
+        i = start
+        while i < raw_start:
+            # 时间戳递增, 同一桶的数据点连续排列: 二分查找桶的结束位置, 每个桶按切片整段求均值
+            width = DAY if i >= daily_start else 7 * DAY
+            limit = raw_start if i >= daily_start else min(daily_start, raw_start)
+            j = bisect_left(times, (times[i] // width + 1) * width, i + 1, limit)
+            result.append(times[j - 1], [_mean(series.values[m][i:j]) for m in PLAYER_METRICS])
+            i = j
+        result.times.extend(times[raw_start:])
+        for metric in PLAYER_METRICS:
+            result.values[metric].extend(series.values[metric][raw_start:])
+        return result
+
+    def _compact_player(self, pid: int, now: float) -> None:
+        before = len(self._series[pid])
+        self._series[pid] = self._downsample(self._series[pid], now)
+        self._points -= before - len(self._series[pid])
+        self._since_compact[pid] = 0
+
+    def compact(self, now: Optional[float] = None) -> int:
+        """对所有选手的旧数据降采样, 返回剩余的数据点数 (不写文件)"""
+        now = time.time() if now is None else now
+        for pid in range(len(self._series)):
+            self._compact_player(pid, now)
+        return self._points
+
+    def series(self, name: str) -> Optional[PlayerSeries]:
+        pid = self._ids.get(self._key(name))
+        return None if pid is None else self._series[pid]
+
+    def trends(
+        self, name: str, windows: Iterable[int] = (30, 90), now: Optional[float] = None
+    ) -> List[Tuple[int, Dict[str, float]]]:
+        """最新数据点相对各时间窗口内最早数据点的变化
+
+        每个窗口二分查找起点后只取两个数据点相减, 耗时与数据点数无关。
+
+        Returns:
+            [(实际覆盖的天数, {指标: 变化量})], 按窗口从小到大排列;
+            数据不足一个窗口时按实际天数计算, 与更小的窗口覆盖相同数据时省略
+        """
+        series = self.series(name)
+        if series is None or len(series) < 2:
+            return []
+        now = time.time() if now is None else now
+        last = len(series) - 1
+        result: List[Tuple[int, Dict[str, float]]] = []
+        previous_start = None
+        for days in sorted(windows):
+            start = bisect_left(series.times, int(now - days * DAY))
+            if start >= last or start == previous_start:
+                continue
+            previous_start = start
+            covered = max(1, min(days, round((series.times[last] - series.times[start]) / DAY)))
+            deltas = {
+                metric: values[last] - values[start]
+                for metric, values in series.values.items()
+                if not math.isnan(values[last]) and not math.isnan(values[start])
+            }
+            result.append((covered, deltas))
+        return result
+
+
+def format_rank_delta(delta: Optional[int], new: bool = False) -> str:
+    """排名变化标记: ↑2 / ↓1 / - / NEW"""
+    if new:
+        return "NEW"
+    if delta is None:
+        return ""
+    if delta > 0:
+        return f"↑{delta}"
+    if delta < 0:
+        return f"↓{-delta}"
+    return "-"
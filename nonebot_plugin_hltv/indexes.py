@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from __future__ import annotations
+
+import re
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+_NON_WORD = re.compile(r"[^0-9a-z\u4e00-\u9fff]+")
+
+
+def normalize_name(name: Any) -> str:
+    """名称归一化: 小写并去掉空格和标点 ("Natus Vincere" -> "natusvincere")"""
+    return _NON_WORD.sub("", str(name or "").lower())
+
+
+class NameIndex:
+    """归一化名称 -> 条目下标 的倒排索引"""
+
+    def __init__(self) -> None:
+        self._postings: Dict[str, List[int]] = {}
+
+    def add(self, name: Any, pos: int) -> None:
+        key = normalize_name(name)
+        if key:
+            postings = self._postings.setdefault(key, [])
+            if not postings or postings[-1] != pos:
+                postings.append(pos)
+
+    def exact(self, name: Any) -> List[int]:
+        return list(self._postings.get(normalize_name(name), []))
+
+    def lookup(self, query: str) -> List[int]:
+        """精确匹配优先, 否则按子串匹配所有名称"""
+        key = normalize_name(query)
+        if not key:
+            return []
+        if key in self._postings:
+            return list(self._postings[key])
+        found = set()
+        for name, postings in self._postings.items():
+            if key in name:
+                found.update(postings)
+        return sorted(found)
+
+
+class DatasetIndexes:
+    """比赛/结果/赛事数据的二级索引
+
+    每次数据刷新时重建索引 (按战队名、赛事名、星级/级别)，
+    筛选查询只需查索引，不需要重新请求或遍历全部数据。
+    """
+
+    # 结果数据保留条数 (不同星级筛选的结果会合并到一起)
+    MAX_RESULTS = 200
+    # 结果在这段时间 (秒) 内的各次刷新中都没有出现时移除 (已被数据源更正或删除的结果不会一直保留)
+    RESULT_MAX_AGE = 3600
+
+    def __init__(self) -> None:
+        self.matches: List[Dict[str, Any]] = []
+        self.results: List[Dict[str, Any]] = []
+        self.events: List[Dict[str, Any]] = []
+        self._match_team = NameIndex()
+        self._match_event = NameIndex()
+        self._result_team = NameIndex()
+        self._result_event = NameIndex()
+        self._result_stars: Dict[int, List[int]] = {}
+        # 结果 -> 最近一次在刷新数据中出现的时间
+        self._result_seen: Dict[Tuple, float] = {}
+        self._event_name = NameIndex()
+        self._event_tier: Dict[str, List[int]] = {}
+
+    # ---- 数据刷新 ----
+
+    def load_matches(self, matches: Iterable[Dict[str, Any]]) -> None:
+        self.matches = list(matches or [])
+        self._match_team, self._match_event = NameIndex(), NameIndex()
+        for i, match in enumerate(self.matches):
+            self._match_team.add(match.get("team1"), i)
+            self._match_team.add(match.get("team2"), i)
+            self._match_event.add(match.get("event"), i)
+
+    def load_results(self, results: Iterable[Dict[str, Any]], now: Optional[float] = None) -> None:
+        """合并新结果 (按星级筛选的结果是全部结果的子集，合并后索引仍然完整)
+
+        超过 RESULT_MAX_AGE 秒没有再出现的旧结果不再合并。
+        """
+        now = time.monotonic() if now is None else now
+        fresh = list(results or [])
+        seen = {self._result_key(r) for r in fresh}
+        for key in seen:
+            self._result_seen[key] = now
+        cutoff = now - self.RESULT_MAX_AGE
+        merged = fresh + [
+            r for r in self.results
+            if self._result_key(r) not in seen and self._result_seen.get(self._result_key(r), now) >= cutoff
+        ]
+        self.results = merged[: self.MAX_RESULTS]
+        kept = {self._result_key(r) for r in self.results}
+        self._result_seen = {key: t for key, t in self._result_seen.items() if key in kept}
+        self._result_team, self._result_event = NameIndex(), NameIndex()
+        self._result_stars = {}
+        for i, result in enumerate(self.results):
+            self._result_team.add(result.get("team1"), i)
+            self._result_team.add(result.get("team2"), i)
+            self._result_event.add(result.get("event"), i)
+            self._result_stars.setdefault(int(result.get("stars") or 0), []).append(i)
+
+    def load_events(self, events: Iterable[Dict[str, Any]]) -> None:
+        self.events = list(events or [])
+        self._event_name = NameIndex()
+        self._event_tier = {}
+        for i, evt in enumerate(self.events):
+            self._event_name.add(evt.get("name"), i)
+            self._event_tier.setdefault(str(evt.get("tier") or "").upper(), []).append(i)
+
+    @staticmethod
+    def _result_key(result: Dict[str, Any]) -> Tuple:
+        return (
+            result.get("team1"), result.get("team2"), result.get("event"),
+            result.get("score1"), result.get("score2"),
+        )
+
+    # ---- 查询 ----
+
+    def find_matches(self, query: str) -> List[Dict[str, Any]]:
+        """按战队名或赛事名筛选比赛"""
+        positions = set(self._match_team.lookup(query)) | set(self._match_event.lookup(query))
+        return [self.matches[i] for i in sorted(positions)]
+
+    def find_results(self, query: str = "", min_stars: int = 0) -> List[Dict[str, Any]]:
+        """按战队名/赛事名和最低星级筛选结果"""
+        if query:
+            positions = set(self._result_team.lookup(query)) | set(self._result_event.lookup(query))
+        else:
+            positions = set(range(len(self.results)))
+        if min_stars > 0:
+            starred = set()
+            for stars, items in self._result_stars.items():
+                if stars >= min_stars:
+                    starred.update(items)
+            positions &= starred
+        return [self.results[i] for i in sorted(positions)]
+
+    def find_events(self, query: str = "", tier: Optional[str] = None) -> List[Dict[str, Any]]:
+        positions = set(self._event_name.lookup(query)) if query else set(range(len(self.events)))
+        if tier:
+            positions &= set(self._event_tier.get(tier.upper(), []))
+        return [self.events[i] for i in sorted(positions)]
+
+    def team_schedule(self, team_name: str) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """返回战队的 (即将进行的比赛, 最近结果)，只做精确名称匹配"""
+        upcoming = [self.matches[i] for i in self._match_team.exact(team_name)]
+        recent = [self.results[i] for i in self._result_team.exact(team_name)]
+        return upcoming, recent
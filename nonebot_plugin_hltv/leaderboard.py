@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from __future__ import annotations
+
+import json
+import logging
+import math
+import time
+from array import array
+from itertools import islice
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .history import parse_stat
+from .indexes import normalize_name
+
+logger = logging.getLogger(__name__)
+
+# 榜单指标: 名称 -> (选手数据字段, 显示名, 是否越小越好)
+LEADERBOARD_METRICS: Dict[str, Tuple[str, str, bool]] = {
+    "rating": ("rating", "Rating", False),
+    "kpr": ("kpr", "KPR", False),
+    "adr": ("adr", "ADR", False),
+    "kast": ("kast", "KAST", False),
+    "kd": ("kd_ratio", "K/D", False),
+    "impact": ("impact", "Impact", False),
+    "dpr": ("dpr", "DPR", True),
+}
+METRIC_ALIASES = {
+    "评分": "rating",
+    "击杀": "kpr",
+    "伤害": "adr",
+    "kdr": "kd",
+    "k/d": "kd",
+    "影响力": "impact",
+    "死亡": "dpr",
+}
+
+
+def resolve_metric(text: str) -> Optional[str]:
+    """'ADR' / '伤害' -> 'adr', 不支持的指标返回 None"""
+    key = text.strip().lower()
+    key = METRIC_ALIASES.get(key, key)
+    return key if key in LEADERBOARD_METRICS else None
+
+
+class StatTable:
+    """排名战队选手的数据表
+
+    列式存储: 每行一名选手, 选手名/战队/国家各一列 (战队和国家存为编码),
+    每个指标一列 float 数组 (缺失为 nan)。榜单查询不需要请求 API。
+
+    查询索引在数据变化后的首次查询时按列构建: 每个指标一份按数值排好序的行号 (不含缺失值),
+    每个筛选条件一份行掩码。取前 N 名只需沿排序顺序取满足掩码的前 N 行, 不再排序或筛选整张表。
+    """
+
+    def __init__(self, path: Optional[Path] = None) -> None:
+        self.path = path
+        self.updated: Optional[float] = None
+        self._reset()
+        if path is not None:
+            self._load()
+
+    def _reset(self) -> None:
+        self.names: List[str] = []
+        self.teams = array("H")
+        self.countries = array("H")
+        self.columns: Dict[str, array] = {field: array("f") for field, _, _ in LEADERBOARD_METRICS.values()}
+        self._rows: Dict[str, int] = {}
+        # 战队/国家编码表
+        self.team_names: List[str] = []
+        self.country_names: List[str] = []
+        self._invalidate()
+
+    def _invalidate(self) -> None:
+        """数据变化后清除查询索引"""
+        # 指标字段 -> 按该指标从好到差排列的行号
+        self._orders: Dict[str, array] = {}
+        # (筛选类型, 编码) -> 行掩码 (第 i 字节为 1 表示第 i 行满足条件)
+        self._masks: Dict[Tuple[str, int], bytearray] = {}
+        # (指标字段, 筛选条件) -> 满足条件且有数据的选手数
+        self._counts: Dict[Tuple[str, Optional[Tuple[str, int]]], int] = {}
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __contains__(self, name: str) -> bool:
+        return normalize_name(name) in self._rows
+
+    def _load(self) -> None:
+        if not self.path or not self.path.exists():
+            return
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            self.team_names = list(data["team_names"])
+            self.country_names = list(data["country_names"])
+            self.names = list(data["names"])
+            self.teams = array("H", data["teams"])
+            self.countries = array("H", data["countries"])
+            for field in self.columns:
+                values = data["columns"].get(field) or [None] * len(self.names)
+                self.columns[field] = array("f", (math.nan if v is None else v for v in values))
+            self._rows = {normalize_name(name): i for i, name in enumerate(self.names)}
+            self.updated = data.get("updated")
+            self._invalidate()
+        except Exception as e:
+            logger.error(f"读取选手榜单数据失败: {e}")
+            self._reset()
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            data = {
+                "updated": self.updated,
+                "team_names": self.team_names,
+                "country_names": self.country_names,
+                "names": self.names,
+                "teams": self.teams.tolist(),
+                "countries": self.countries.tolist(),
+                "columns": {
+                    field: [None if math.isnan(v) else round(v, 3) for v in column]
+                    for field, column in self.columns.items()
+                },
+            }
+            tmp = self.path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(data, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+            tmp.replace(self.path)
+        except Exception as e:
+            logger.error(f"保存选手榜单数据失败: {e}")
+
+    @staticmethod
+    def _code(table: List[str], value: Any) -> int:
+        value = str(value or "Unknown")
+        try:
+            return table.index(value)
+        except ValueError:
+            table.append(value)
+            return len(table) - 1
+
+    def upsert(self, player: Dict[str, Any], team: Optional[str] = None) -> bool:
+        """写入一名选手的数据 (team 为空时使用选手数据中的战队), 返回是否为新行"""
+        name = player.get("name")
+        if not name:
+            return False
+        key = normalize_name(name)
+        row = self._rows.get(key)
+        team_code = self._code(self.team_names, team or player.get("team"))
+        country = player.get("country")
+        is_new = row is None
+        if is_new:
+            row = len(self.names)
+            self._rows[key] = row
+            self.names.append(name)
+            self.teams.append(team_code)
+            self.countries.append(self._code(self.country_names, country))
+            for column in self.columns.values():
+                column.append(math.nan)
+        else:
+            self.teams[row] = team_code
+            if country and country != "Unknown":
+                self.countries[row] = self._code(self.country_names, country)
+        for field, column in self.columns.items():
+            # 数据源不返回的字段保留旧值
+            if field in player:
+                column[row] = parse_stat(player[field])
+        self._invalidate()
+        return is_new
+
+    def update(self, player: Dict[str, Any]) -> bool:
+        """刷新监听器: 只更新表中已有的选手 (表中只保留排名战队的选手), 不写文件"""
+        if not isinstance(player, dict) or player.get("name", "") not in self:
+            return False
+        key = normalize_name(player["name"])
+        self.upsert(player, self.team_names[self.teams[self._rows[key]]])
+        return True
+
+    def retain(self, names: Iterable[str]) -> None:
+        """只保留 names 中的选手 (各列按保留的行号重新取值)"""
+        keep = {normalize_name(name) for name in names}
+        rows = [i for i, name in enumerate(self.names) if normalize_name(name) in keep]
+        if len(rows) == len(self.names):
+            return
+        self.names = [self.names[i] for i in rows]
+        self.teams = array("H", (self.teams[i] for i in rows))
+        self.countries = array("H", (self.countries[i] for i in rows))
+        for field, column in self.columns.items():
+            self.columns[field] = array("f", (column[i] for i in rows))
+        self._rows = {normalize_name(name): i for i, name in enumerate(self.names)}
+        self._invalidate()
+
+    def resolve_filter(self, text: str) -> Optional[Tuple[str, int]]:
+        """把筛选条件解析为 ("team", 编码) 或 ("country", 编码), 不是表中的战队或国家时返回 None"""
+        key = normalize_name(text)
+        if not key:
+            return None
+        for kind, table in (("team", self.team_names), ("country", self.country_names)):
+            for code, value in enumerate(table):
+                value = normalize_name(value)
+                if key in (value, f"team{value}") or value == f"team{key}":
+                    return kind, code
+        return None
+
+    def _order(self, metric: str) -> array:
+        """按指标从好到差排列的行号 (越小越好的指标升序), 不含缺失该指标的选手"""
+        field, _, ascending = LEADERBOARD_METRICS[metric]
+        order = self._orders.get(field)
+        if order is None:
+            column = self.columns[field]
+            rows = [i for i, value in enumerate(column) if not math.isnan(value)]
+            rows.sort(key=column.__getitem__, reverse=not ascending)
+            order = self._orders[field] = array("I", rows)
+        return order
+
+    def _mask(self, where: Tuple[str, int]) -> bytearray:
+        """筛选条件的行掩码"""
+        mask = self._masks.get(where)
+        if mask is None:
+            kind, code = where
+            codes = self.teams if kind == "team" else self.countries
+            mask = self._masks[where] = bytearray(c == code for c in codes)
+        return mask
+
+    def top(
+        self, metric: str, limit: int = 10, where: Optional[Tuple[str, int]] = None
+    ) -> List[Tuple[int, float]]:
+        """按指标取前 limit 名 (越小越好的指标取最小值), 返回 [(行号, 数值)], 跳过缺失该指标的选手"""
+        column = self.columns[LEADERBOARD_METRICS[metric][0]]
+        order = self._order(metric)
+        if where is None:
+            rows: Iterable[int] = order[:limit]
+        else:
+            mask = self._mask(where)
+            rows = islice((i for i in order if mask[i]), limit)
+        return [(i, column[i]) for i in rows]
+
+    def count(self, metric: str, where: Optional[Tuple[str, int]] = None) -> int:
+        """满足筛选条件且有该指标数据的选手数"""
+        key = (LEADERBOARD_METRICS[metric][0], where)
+        count = self._counts.get(key)
+        if count is None:
+            order = self._order(metric)
+            if where is None:
+                count = len(order)
+            else:
+                mask = self._mask(where)
+                count = sum(mask[i] for i in order)
+            self._counts[key] = count
+        return count
+
+    def mark_updated(self) -> None:
+        self.updated = time.time()
+        self.save()
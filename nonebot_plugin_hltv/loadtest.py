@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List
+
+from .metrics import percentile
+
+# 延迟直方图的桶上界 (毫秒), 最后一个桶为 +Inf
+LATENCY_BUCKETS_MS = (50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+# 压测的并发数和持续时间上限 (压测对象是后端, 上限保持在单个机器人的正常负载附近)
+MAX_CONCURRENCY = 20
+MAX_DURATION = 60
+
+
+async def run_load_test(
+    call: Callable[[], Awaitable[Dict[str, Any]]],
+    concurrency: int = 10,
+    duration: float = 10,
+) -> Dict[str, Any]:
+    """以固定并发数持续调用 call, 直到 duration 秒后停止发起新请求
+
+    每个并发槽位在上一次调用完成后立即发起下一次 (闭环压测),
+    吞吐量即后端在该并发下能达到的请求速率。
+
+    Returns:
+        并发数、持续时间、请求数、吞吐量、延迟百分位、延迟直方图和错误统计
+    """
+    concurrency = max(1, min(concurrency, MAX_CONCURRENCY))
+    duration = max(0.1, min(duration, MAX_DURATION))
+    latencies: List[float] = []
+    errors: Dict[str, int] = {}
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    deadline = started + duration
+
+    async def worker() -> None:
+        while loop.time() < deadline:
+            t0 = time.perf_counter()
+            try:
+                result = await call()
+                error = None if result.get("success") else str(result.get("message") or "未知错误")
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+            latencies.append(time.perf_counter() - t0)
+            if error is not None:
+                errors[error] = errors.get(error, 0) + 1
+            # 缓存命中时 call 不会挂起, 主动让出事件循环, 避免压测期间阻塞机器人
+            await asyncio.sleep(0)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = loop.time() - started
+
+    latencies.sort()
+    histogram = []
+    pos = 0
+    for bound in LATENCY_BUCKETS_MS:
+        count = 0
+        while pos < len(latencies) and latencies[pos] * 1000 <= bound:
+            count += 1
+            pos += 1
+        histogram.append({"le_ms": bound, "count": count})
+    histogram.append({"le_ms": "+Inf", "count": len(latencies) - pos})
+
+    failed = sum(errors.values())
+    return {
+        "concurrency": concurrency,
+        "duration": round(elapsed, 2),
+        "requests": len(latencies),
+        "succeeded": len(latencies) - failed,
+        "failed": failed,
+        "throughput": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": {
+            "min": round(latencies[0] * 1000, 1) if latencies else 0.0,
+            "p50": round(percentile(latencies, 50) * 1000, 1),
+            "p90": round(percentile(latencies, 90) * 1000, 1),
+            "p99": round(percentile(latencies, 99) * 1000, 1),
+            "max": round(latencies[-1] * 1000, 1) if latencies else 0.0,
+        },
+        "histogram": histogram,
+        "errors": dict(sorted(errors.items(), key=lambda kv: -kv[1])),
+    }
@@ -1,30 +1,286 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import asyncio
+import functools
 import logging
 import re
 import os
+import time
 from pathlib import Path
-from typing import Optional
-from datetime import datetime
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+from datetime import date, datetime
 
-from nonebot import on_command, require
-from nonebot.adapters.onebot.v11 import Bot, MessageEvent, Message, MessageSegment
+from nonebot import get_bots, get_driver, on_command, on_message, require
+from nonebot.adapters.onebot.v11 import (
+    GROUP_ADMIN,
+    GROUP_OWNER,
+    Bot,
+    GroupMessageEvent,
+    MessageEvent,
+    Message,
+    MessageSegment,
+)
+from nonebot.exception import MatcherException
 from nonebot.matcher import Matcher
+from nonebot.message import run_postprocessor, run_preprocessor
 from nonebot.params import CommandArg
+from nonebot.permission import SUPERUSER
+from nonebot.typing import T_State
 
-# 导入 htmlrender
-require("nonebot_plugin_htmlrender")
-from nonebot_plugin_htmlrender import template_to_pic
+from .budget import request_budget
+from .config import ConfigModel, get_config
+from .digest import DigestSender, DigestStore, seconds_until, select_results, todays_matches
+from .history import PlayerStatsHistory, RankingHistory, format_rank_delta
+from .leaderboard import LEADERBOARD_METRICS, StatTable, resolve_metric
+from .metrics import metrics
+from .scheduler import Priority, request_priority
+from .topic import TopicDetector, format_topic_hit
+from .tracing import create_exporter, tracer
 
-from .config import get_config
-from .real_client import HLTVClient
+if TYPE_CHECKING:
+    from .real_client import HLTVClient
+
+# htmlrender (及浏览器) 在第一次需要渲染图片时才加载
+template_to_pic = None
 
 logger = logging.getLogger(__name__)
 
-# 获取配置并初始化客户端
+# 话题检测词典, 随排名/比赛/赛事数据刷新增量更新
+topic_detector = TopicDetector()
+# (群号, 话题) -> 上次回复时间
+_topic_last_reply: Dict[Tuple[int, str], float] = {}
+
+# 获取配置
+# 配置对象不可变, 热更新时整体替换 config 和 hltv_client;
+# 处理器在开始时取一次快照 (cfg, client), 同一次处理中不会看到新旧配置混用
 config = get_config()
-hltv_client = HLTVClient(api_url=config.hltv_api_url)
+config_version = 1
+
+# 本地数据: (排名历史, 选手数据历史, 选手榜单数据表, 日报订阅)
+Stores = Tuple[RankingHistory, PlayerStatsHistory, StatTable, DigestStore]
+
+
+def open_stores(cfg: ConfigModel) -> Stores:
+    """从 hltv_data_dir 加载本地数据 (启动时及数据目录变化时调用)
+
+    各数据在记录时即写入文件, 切换目录前不需要额外保存。
+    """
+    data_dir = Path(cfg.hltv_data_dir)
+    return (
+        RankingHistory(data_dir / "ranking_history.json"),
+        PlayerStatsHistory(data_dir / "player_stats.bin"),
+        StatTable(data_dir / "leaderboard.json"),
+        DigestStore(data_dir / "digest.json"),
+    )
+
+
+# ranking_history: 排名历史快照, 每次获取排名数据时记录, 计算排名变化不需要额外请求
+# player_stats: 选手数据历史, 每次获取选手数据时记录, 计算选手数据趋势不需要额外请求
+# stat_table: 排名战队选手的数据表, 后台定期回填, 榜单查询只读本地数据
+# digest_store: 日报订阅及上一期日报时已有的比赛结果
+ranking_history, player_stats, stat_table, digest_store = open_stores(config)
+
+# 影响客户端的配置项, 这些配置变化时需要重建客户端
+CLIENT_SETTINGS = (
+    "hltv_api_url",
+    "enable_caching",
+    "cache_duration_matches",
+    "cache_duration_teams",
+    "cache_duration_results",
+    "cache_duration_players",
+    "cache_duration_not_found",
+    "cache_backend",
+    "cache_shared_path",
+    "hltv_data_dir",
+    "upstream_concurrency",
+    "poll_interval_min",
+    "poll_interval_max",
+    "max_teams_in_ranking",
+)
+
+
+def build_client(
+    cfg: ConfigModel, previous: Optional["HLTVClient"] = None, stores: Optional[Stores] = None
+) -> "HLTVClient":
+    """根据配置创建客户端并注册数据刷新监听器 (写入 stores, 默认为当前的本地数据)
+
+    后端地址不变时沿用旧客户端的缓存和索引, 地址变化时从空缓存开始。
+    """
+    from .archive import MatchArchive
+    from .poller import AdaptivePoller
+    from .real_client import HLTVClient
+    from .shared_cache import SharedCache
+
+    shared_cache = None
+    if cfg.enable_caching and cfg.cache_backend == "sqlite":
+        shared_cache = SharedCache(
+            cfg.cache_shared_path or str(Path(cfg.hltv_data_dir) / "shared_cache.db")
+        )
+    client = HLTVClient(
+        api_url=cfg.hltv_api_url,
+        enable_caching=cfg.enable_caching,
+        cache_ttl={
+            "/api/matches": cfg.cache_duration_matches,
+            "/api/rankings": cfg.cache_duration_teams,
+            "/api/team": cfg.cache_duration_teams,
+            "/api/results": cfg.cache_duration_results,
+            "/api/player": cfg.cache_duration_players,
+        },
+        shared_cache=shared_cache,
+        max_concurrency=cfg.upstream_concurrency,
+        not_found_ttl=cfg.cache_duration_not_found,
+        match_archive=MatchArchive(Path(cfg.hltv_data_dir) / "matches"),
+        ranked_team_limit=cfg.max_teams_in_ranking,
+        match_poller=AdaptivePoller(
+            cfg.poll_interval_min, cfg.poll_interval_max, fixed_interval=cfg.cache_duration_matches
+        ),
+    )
+    if previous is not None and previous.api_url == client.api_url:
+        client.adopt_state(previous)
+    client.add_refresh_listener("/api/rankings", topic_detector.load_rankings)
+    client.add_refresh_listener("/api/matches", topic_detector.load_matches)
+    client.add_refresh_listener("/api/events", topic_detector.load_events)
+    history, stats, table, _ = stores or (ranking_history, player_stats, stat_table, digest_store)
+    client.add_refresh_listener("/api/rankings", history.record)
+    client.add_refresh_listener("/api/player", stats.record)
+    client.add_refresh_listener("/api/player", table.update)
+    return client
+
+
+# 链路追踪相关配置, 变化时重新配置追踪
+TRACE_SETTINGS = ("trace_sample_rate", "trace_slow_threshold", "trace_export", "hltv_data_dir")
+
+
+def configure_tracing(cfg: ConfigModel) -> None:
+    target = cfg.trace_export or str(Path(cfg.hltv_data_dir) / "traces.jsonl")
+    enabled = cfg.trace_sample_rate > 0 or cfg.trace_slow_threshold > 0
+    tracer.configure(
+        cfg.trace_sample_rate,
+        cfg.trace_slow_threshold,
+        create_exporter(target) if enabled else None,
+    )
+
+
+configure_tracing(config)
+
+
+@get_driver().on_startup
+async def _start_tracing():
+    tracer.start()
+
+
+# 客户端在驱动启动时创建 (get_client 也会在需要时创建)
+hltv_client: Optional["HLTVClient"] = None
+
+
+def get_client() -> "HLTVClient":
+    """当前客户端"""
+    global hltv_client
+    if hltv_client is None:
+        hltv_client = build_client(config)
+    return hltv_client
+
+
+@get_driver().on_startup
+async def _create_client():
+    get_client()
+
+
+async def apply_config(updates: Dict[str, Any]) -> ConfigModel:
+    """校验并原子地应用新配置 (无需重启)
+
+    客户端相关配置变化时创建新客户端, 旧客户端在进行中的请求完成后关闭。
+
+    Raises:
+        ValidationError: 配置校验失败, 此时当前配置保持不变
+        OSError / sqlite3.Error: 无法打开新的数据目录或共享缓存, 此时当前配置同样保持不变
+    """
+    global config, hltv_client, config_version
+    global ranking_history, player_stats, stat_table, digest_store
+    new_config = ConfigModel(**{**config.dict(), **updates})
+    old_client = hltv_client
+    new_client = old_client
+    stores = (ranking_history, player_stats, stat_table, digest_store)
+    # 新的本地数据和客户端先创建为局部变量, 都成功后再一起替换
+    if new_config.hltv_data_dir != config.hltv_data_dir:
+        stores = open_stores(new_config)
+    # 客户端尚未创建时只替换配置, 之后按新配置创建
+    if old_client is not None and any(
+        getattr(new_config, k) != getattr(config, k) for k in CLIENT_SETTINGS
+    ):
+        new_client = build_client(new_config, previous=old_client, stores=stores)
+
+    # 以下赋值之间没有 await, 对其他协程来说是一次原子切换
+    old_config = config
+    config, hltv_client = new_config, new_client
+    ranking_history, player_stats, stat_table, digest_store = stores
+    config_version += 1
+    if new_config.hltv_data_dir != old_config.hltv_data_dir:
+        logger.info(f"数据目录已切换为 {new_config.hltv_data_dir}")
+    logger.info(f"配置已更新 (版本 {config_version}, API: {new_config.hltv_api_url or '默认'})")
+
+    if any(getattr(new_config, k) != getattr(old_config, k) for k in TRACE_SETTINGS):
+        # 已缓冲的 span 先写入旧的导出目标
+        await tracer.flush()
+        old_exporter = tracer.exporter
+        configure_tracing(new_config)
+        if old_exporter is not None:
+            await old_exporter.aclose()
+
+    if old_client is not None and new_client is not old_client:
+        old_client.spawn(old_client.aclose())
+    return new_config
+
+
+# 比赛数据后台刷新任务
+_match_polling_task: Optional[asyncio.Task] = None
+# 每日日报推送任务
+_digest_task: Optional[asyncio.Task] = None
+# 选手榜单后台刷新任务 / 正在进行的回填
+_leaderboard_task: Optional[asyncio.Task] = None
+_leaderboard_backfill: Optional[asyncio.Task] = None
+# 启动时预加载话题词典的任务
+_topic_warm_up_task: Optional[asyncio.Task] = None
+
+
+async def _poll_matches():
+    """按自适应间隔在后台刷新比赛数据 (预取优先级), 命令查询比赛时直接命中缓存"""
+    with request_priority(Priority.PREFETCH):
+        while True:
+            if config.enable_match_polling:
+                client = get_client()
+                try:
+                    await client.get_cs2_matches()
+                except Exception as e:
+                    logger.warning(f"刷新比赛数据失败: {e}")
+                # 缓存可能已被命令刷新, 等到当前缓存过期再请求
+                wait = client.cache.expires_in(client._cache_key("/api/matches"))
+                await asyncio.sleep(wait if wait is not None else client._ttl("/api/matches"))
+            else:
+                await asyncio.sleep(config.poll_interval_min)
+
+
+@get_driver().on_startup
+async def _start_match_polling():
+    global _match_polling_task
+    _match_polling_task = asyncio.create_task(_poll_matches())
+
+
+@get_driver().on_shutdown
+async def _close_client():
+    if _match_polling_task is not None:
+        _match_polling_task.cancel()
+    if _digest_task is not None:
+        _digest_task.cancel()
+    if _leaderboard_task is not None:
+        _leaderboard_task.cancel()
+    # 手动或定时开始的回填, 不在关闭中的客户端上继续请求
+    if _leaderboard_backfill is not None:
+        _leaderboard_backfill.cancel()
+    if hltv_client is not None:
+        await hltv_client.aclose(timeout=5)
+    await tracer.aclose()
 
 
 # 命令定义 - priority=1 确保优先于 llmchat (priority=99)
@@ -34,18 +290,179 @@ matcher_cs2_results = on_command("cs2结果", aliases={"查看结果", "cs2结
 matcher_cs2_ranking = on_command("cs2排名", aliases={"战队排名", "csgo排名"}, priority=1, block=True)
 matcher_cs2_player = on_command("cs2选手", aliases={"查询选手", "cs2选手查询"}, priority=1, block=True)
 matcher_cs2_events = on_command("cs2赛事", aliases={"cs2比赛赛程", "重要赛事"}, priority=1, block=True)
+matcher_cs2_compare = on_command("cs2对比", aliases={"选手对比", "cs2选手对比"}, priority=1, block=True)
+matcher_cs2_digest = on_command("cs2日报", aliases={"hltv日报"}, priority=1, block=True)
+matcher_cs2_detail = on_command("cs2详情", aliases={"比赛详情", "cs2比赛详情"}, priority=1, block=True)
+matcher_cs2_leaderboard = on_command("cs2榜单", aliases={"选手榜单", "cs2排行"}, priority=1, block=True)
+
+
+async def _topic_rule(event: GroupMessageEvent, state: T_State) -> bool:
+    """被动话题检测: 对每条群消息做一次多模式匹配"""
+    if not config.enable_topic_detection or not len(topic_detector):
+        return False
+    hits = topic_detector.detect(event.get_plaintext())
+    if not hits:
+        return False
+    state["topic_hits"] = hits
+    return True
+
+
+# 话题检测不阻断事件传播, 其他插件 (如 llmchat) 仍能收到消息
+matcher_topic = on_message(rule=_topic_rule, priority=50, block=False)
+
+
+COMMAND_MATCHERS = (
+    matcher_cs2_matches,
+    matcher_cs2_team,
+    matcher_cs2_results,
+    matcher_cs2_ranking,
+    matcher_cs2_player,
+    matcher_cs2_events,
+    matcher_cs2_compare,
+    matcher_cs2_digest,
+    matcher_cs2_detail,
+    matcher_cs2_leaderboard,
+)
+
+
+def command_handler(name: str):
+    """为命令处理器设置延迟预算 (command_budget) 并记录追踪根 span (数据请求、渲染等作为其子 span)
+
+    预处理器在独立的任务中运行, 其中设置的上下文不会传给处理器, 因此在处理器外层包装。
+    matcher.finish 等正常结束命令的异常不记为错误。
+    """
+
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            finished: Optional[MatcherException] = None
+            with request_budget(config.command_budget), tracer.span(f"command {name}", command=name):
+                try:
+                    return await func(*args, **kwargs)
+                except MatcherException as e:
+                    finished = e
+            raise finished
+
+        return wrapper
+
+    return decorator
+
+
+def stale_note(result: Dict[str, Any]) -> str:
+    """数据请求失败、改用过期的缓存数据时附加在回复末尾的说明"""
+    if not result.get("stale"):
+        return ""
+    age = int(result.get("stale_age", 0))
+    if age < 60:
+        ago = f"{age} 秒"
+    elif age < 3600:
+        ago = f"{age // 60} 分钟"
+    else:
+        ago = f"{age // 3600} 小时"
+    return f"(获取最新数据失败, 以上为 {ago}前的数据)"
+
+
+def with_stale_note(msg: str, result: Dict[str, Any]) -> str:
+    """在文本回复末尾附加 stale_note"""
+    note = stale_note(result)
+    return f"{msg.rstrip()}\n{note}" if note else msg
+
+
+@run_preprocessor
+async def _metrics_command_start(matcher: Matcher, state: T_State):
+    if type(matcher) in COMMAND_MATCHERS:
+        state["_hltv_started"] = time.monotonic()
+
+
+@run_postprocessor
+async def _metrics_command_done(matcher: Matcher, state: T_State):
+    started = state.get("_hltv_started")
+    if started is not None:
+        metrics.record_command(time.monotonic() - started)
+
+
+def _load_renderer():
+    """加载 htmlrender (首次渲染时调用, 浏览器在首次截图时启动)"""
+    global template_to_pic
+    if template_to_pic is None:
+        require("nonebot_plugin_htmlrender")
+        from nonebot_plugin_htmlrender import template_to_pic as _template_to_pic
+
+        template_to_pic = _template_to_pic
+    return template_to_pic
+
+
+async def render_template(**kwargs: Any) -> bytes:
+    """渲染 HTML 模板为图片 (统计排队中的渲染数)"""
+    metrics.render_pending += 1
+    try:
+        with tracer.span("render", template=kwargs.get("template_name", "")):
+            return await _load_renderer()(**kwargs)
+    finally:
+        metrics.render_pending -= 1
+
+
+@get_driver().on_startup
+async def _warm_up_topic_detector():
+    """启动时预加载话题词典"""
+    global _topic_warm_up_task
+    if not config.enable_topic_detection:
+        return
+
+    async def warm_up():
+        client = get_client()
+        await client.get_team_rankings(limit=config.max_teams_in_ranking)
+        await client.get_events()
+        logger.info(f"话题检测词典已加载: {len(topic_detector)} 个词条")
+
+    # 以预取优先级在后台加载, 不占用命令的上游请求槽位
+    _topic_warm_up_task = get_client().spawn(warm_up())
+
+
+@matcher_topic.handle()
+@command_handler("话题")
+async def handle_topic(event: GroupMessageEvent, matcher: Matcher, state: T_State):
+    """回复检测到的 CS2 话题 (同一群同一话题有冷却时间)"""
+    now = time.monotonic()
+    cooldown = config.topic_reply_cooldown
+    if len(_topic_last_reply) > 1024:
+        for key in [k for k, t in _topic_last_reply.items() if now - t >= cooldown]:
+            del _topic_last_reply[key]
+
+    for hit in state["topic_hits"]:
+        key = (event.group_id, hit.term.name)
+        last = _topic_last_reply.get(key)
+        if last is not None and now - last < cooldown:
+            continue
+        msg = format_topic_hit(hit)
+        if msg:
+            _topic_last_reply[key] = now
+            await matcher.finish(msg)
 
 
 @matcher_cs2_matches.handle()
-async def handle_cs2_matches(bot: Bot, event: MessageEvent, matcher: Matcher):
-    """处理CS2比赛查询"""
-    result = await hltv_client.get_cs2_matches()
+@command_handler("cs2比赛")
+async def handle_cs2_matches(
+    bot: Bot, event: MessageEvent, matcher: Matcher, args: Message = CommandArg()
+):
+    """处理CS2比赛查询
+
+    用法:
+        /cs2比赛            - 查看近期比赛
+        /cs2比赛 Vitality   - 按战队名或赛事名筛选
+    """
+    cfg, client = config, get_client()
+    query = args.extract_plain_text().strip()
+    result = await client.get_cs2_matches()
 
     if result.get("success"):
         matches = result.get("data", [])
+        if query:
+            # 在本地索引中筛选, 不需要额外请求
+            matches = client.indexes.find_matches(query)
         if matches:
-            msg = "【CS2实时比赛】\n"
-            limit = config.max_matches_per_query
+            msg = f"【CS2实时比赛{' - ' + query if query else ''}】\n"
+            limit = cfg.max_matches_per_query
             for i, match in enumerate(matches[:limit], 1):
                 team1 = match.get("team1", "TBD")
                 team2 = match.get("team2", "TBD")
@@ -56,25 +473,29 @@ async def handle_cs2_matches(bot: Bot, event: MessageEvent, matcher: Matcher):
                 msg += f"{i}. {team1} vs {team2}\n"
                 msg += f"   时间: {time_text} | {bo_type.upper()}\n"
                 msg += f"   赛事: {match_event}\n"
+        elif query:
+            msg = f"没有找到与 {query} 相关的比赛。\n"
         else:
             msg = "当前没有找到比赛信息。\n"
     else:
         msg = result.get("message", "获取比赛信息失败")
 
-    await matcher.finish(msg)
+    await matcher.finish(with_stale_note(msg, result))
 
 
 @matcher_cs2_team.handle()
+@command_handler("cs2战队")
 async def handle_cs2_team(
     bot: Bot, event: MessageEvent, matcher: Matcher, args: Message = CommandArg()
 ):
+    client = get_client()
     team_name = args.extract_plain_text().strip()
 
     if not team_name:
         await matcher.finish("请提供战队名称。\n示例: /cs2战队 Vitality")
         return
 
-    result = await hltv_client.get_team_info(team_name)
+    result = await client.get_team_info(team_name)
 
     if result.get("success"):
         team_data = result.get("data", {})
@@ -86,14 +507,27 @@ async def handle_cs2_team(
         coach = team_data.get('coach')
         if coach and coach != 'Unknown':
             msg += f"教练: {coach}\n"
+        upcoming = team_data.get('upcoming_matches', [])
+        if upcoming:
+            msg += "近期比赛:\n"
+            for match in upcoming[:3]:
+                msg += f"   {match.get('team1', 'TBD')} vs {match.get('team2', 'TBD')}"
+                msg += f" | {match.get('time', 'TBD')} | {match.get('event', 'Unknown')}\n"
+        recent = team_data.get('recent_results', [])
+        if recent:
+            msg += "最近结果:\n"
+            for match in recent[:5]:
+                msg += f"   {match.get('team1')} {match.get('score1', 0)}-{match.get('score2', 0)}"
+                msg += f" {match.get('team2')} | {match.get('event', 'Unknown')}\n"
         msg += f"详情: {team_data.get('url', 'N/A')}\n"
     else:
         msg = result.get("message", f"无法获取 {team_name} 的战队信息")
 
-    await matcher.finish(msg)
+    await matcher.finish(with_stale_note(msg, result))
 
 
 @matcher_cs2_results.handle()
+@command_handler("cs2结果")
 async def handle_cs2_results(
     bot: Bot, event: MessageEvent, matcher: Matcher, args: Message = CommandArg()
 ):
@@ -104,8 +538,11 @@ async def handle_cs2_results(
         /cs2结果 S    - 只看S级(5星)赛事
         /cs2结果 A    - 只看A级(4星)及以上
         /cs2结果 B    - 只看B级(3星)及以上
+        /cs2结果 Major / Vitality / S Vitality - 按赛事名或战队名筛选
     """
-    arg_text = args.extract_plain_text().strip().upper()
+    cfg, client = config, get_client()
+    arg_parts = args.extract_plain_text().strip().split(maxsplit=1)
+    arg_text = arg_parts[0].upper() if arg_parts else ""
     
     # 解析级别参数
     tier_map = {
@@ -116,22 +553,32 @@ async def handle_cs2_results(
     }
     
     stars = tier_map.get(arg_text, 0)  # 默认0表示全部
+    # 级别之外的参数作为战队名/赛事名筛选
+    if arg_text in tier_map:
+        query = arg_parts[1].strip() if len(arg_parts) > 1 else ""
+    else:
+        query = " ".join(arg_parts)
     
     filter_text = ""
     if arg_text in tier_map:
         filter_text = f"筛选: {arg_text}级及以上赛事 ({stars}星+)"
+    if query:
+        filter_text = f"{filter_text} | {query}" if filter_text else f"筛选: {query}"
     
-    days = config.default_query_days
-    result = await hltv_client.get_match_results(days=days, stars=stars)
+    days = cfg.default_query_days
+    result = await client.get_match_results(days=days, stars=stars)
 
     if result.get("success"):
         matches = result.get("data", [])
+        if query:
+            # 在本地索引中按名称和星级筛选
+            matches = client.indexes.find_results(query, min_stars=stars)
         if matches:
             # 使用 HTML 渲染
             template_path = Path(__file__).parent / "templates"
             
             try:
-                pic = await template_to_pic(
+                pic = await render_template(
                     template_path=str(template_path),
                     template_name="results.html",
                     templates={
@@ -143,12 +590,13 @@ async def handle_cs2_results(
                         "viewport": {"width": 800, "height": 100},
                     },
                 )
-                await matcher.finish(MessageSegment.image(pic))
+                note = stale_note(result)
+                await matcher.finish(MessageSegment.image(pic) + note if note else MessageSegment.image(pic))
             except Exception as e:
                 logger.error(f"渲染图片失败: {e}")
                 # 降级为文本输出
                 msg = f"【最近比赛结果】{' (' + filter_text + ')' if filter_text else ''}\n"
-                limit = config.max_results_per_query
+                limit = cfg.max_results_per_query
                 for i, match in enumerate(matches[:limit], 1):
                     team1 = match.get("team1", "TBD")
                     team2 = match.get("team2", "TBD")
@@ -160,50 +608,107 @@ async def handle_cs2_results(
                     winner = team1 if int(score1) > int(score2) else team2
                     msg += f"{i}. {team1} {score1}-{score2} {team2} {'★' * star_count}\n"
                     msg += f"   胜者: {winner} | 赛事: {evt}\n"
-                await matcher.finish(msg)
+                await matcher.finish(with_stale_note(msg, result))
         else:
-            await matcher.finish("当前没有找到比赛结果。\n")
+            await matcher.finish(f"没有找到与 {query} 相关的比赛结果。\n" if query else "当前没有找到比赛结果。\n")
     else:
         msg = result.get("message", "获取比赛结果失败")
         await matcher.finish(msg)
 
 
 @matcher_cs2_ranking.handle()
-async def handle_cs2_ranking(bot: Bot, event: MessageEvent, matcher: Matcher):
-    limit = config.max_teams_in_ranking
-    result = await hltv_client.get_team_rankings(limit=limit)
+@command_handler("cs2排名")
+async def handle_cs2_ranking(
+    bot: Bot, event: MessageEvent, matcher: Matcher, args: Message = CommandArg()
+):
+    """处理战队排名查询
+
+    用法:
+        /cs2排名        - 查看战队排名
+        /cs2排名 变化   - 查看排名/积分变化及近几周趋势
+    """
+    cfg, client = config, get_client()
+    show_changes = args.extract_plain_text().strip() in ("变化", "趋势")
+    limit = cfg.max_teams_in_ranking
+    weeks = cfg.ranking_trend_weeks
+    result = await client.get_team_rankings(limit=limit)
 
     if result.get("success"):
         teams = result.get("data", [])
-        if teams:
+        if not teams:
+            msg = "当前没有战队排名数据。\n"
+        elif show_changes:
+            previous, past = ranking_history.span(weeks)
+            if not previous:
+                await matcher.finish("暂无历史排名数据，HLTV 排名更新后即可查看变化。")
+            changes = ranking_history.changes(weeks)
+            msg = f"【CS2战队排名变化 Top {limit}】\n"
+            msg += f"对比: {previous} | 趋势: {past} 起\n"
+            for team in teams[:limit]:
+                name = team.get("title", "Unknown")
+                item = changes.get(name, {})
+                mark = format_rank_delta(item.get("rank_delta"), item.get("new", False))
+                msg += f"{team.get('rank', 'N/A')}. {name} {mark}".rstrip()
+                if item.get("points_delta") is not None:
+                    msg += f" ({team.get('points', 'N/A')}分, {item['points_delta']:+d})"
+                else:
+                    msg += f" ({team.get('points', 'N/A')}分)"
+                if item.get("trend_rank") is not None:
+                    trend = format_rank_delta(item["trend_rank"])
+                    msg += f" | {weeks}周: {trend} {item['trend_points']:+d}分"
+                msg += "\n"
+        else:
+            changes = ranking_history.changes(weeks) if cfg.show_ranking_changes else {}
             msg = f"【CS2战队排名 Top {limit}】\n"
             for team in teams[:limit]:
                 rank = team.get("rank", "N/A")
                 name = team.get("title", "Unknown")
                 points = team.get("points", "N/A")
-                msg += f"{rank}. {name} ({points}分)\n"
-        else:
-            msg = "当前没有战队排名数据。\n"
+                item = changes.get(name, {})
+                mark = format_rank_delta(item.get("rank_delta"), item.get("new", False))
+                mark = f" {mark}" if mark and mark != "-" else ""
+                msg += f"{rank}. {name} ({points}分){mark}\n"
     else:
         msg = result.get("message", "获取战队排名失败")
 
-    await matcher.finish(msg)
+    await matcher.finish(with_stale_note(msg, result))
+
+
+# 选手数据趋势的时间窗口 (天) 及各指标变化量的小数位数
+PLAYER_TREND_WINDOWS = (30, 90)
+PLAYER_TREND_DIGITS = {"rating": 2, "kpr": 2, "adr": 1, "kast": 1}
+
+
+def format_stat_trend(metric: str, trends: List[Tuple[int, Dict[str, float]]]) -> str:
+    """选手某项数据的趋势, 如 " (30天 +0.04 / 90天 -0.02)", 没有历史数据时为空"""
+    digits = PLAYER_TREND_DIGITS[metric]
+    parts = []
+    for days, deltas in trends:
+        delta = deltas.get(metric)
+        if delta is None:
+            continue
+        delta = round(delta, digits)
+        parts.append(f"{days}天 {'±0' if delta == 0 else f'{delta:+.{digits}f}'}")
+    return f" ({' / '.join(parts)})" if parts else ""
 
 
 @matcher_cs2_player.handle()
+@command_handler("cs2选手")
 async def handle_cs2_player(
     bot: Bot, event: MessageEvent, matcher: Matcher, args: Message = CommandArg()
 ):
+    client = get_client()
     player_name = args.extract_plain_text().strip()
 
     if not player_name:
         await matcher.finish("请提供选手名称。\n示例: /cs2选手 ZywOo")
         return
 
-    result = await hltv_client.get_player_info(player_name)
+    result = await client.get_player_info(player_name)
 
     if result.get("success"):
         player_data = result.get("data", {})
+        trends = player_stats.trends(player_data.get("name", player_name), PLAYER_TREND_WINDOWS)
         msg = f"【{player_data.get('full_name', player_name)} 选手信息】\n"
         msg += f"ID: {player_data.get('name', player_name)}\n"
         
@@ -217,19 +722,19 @@ async def handle_cs2_player(
         # 显示 Rating (3.0)
         rating = player_data.get('rating')
         if rating and rating != 'N/A':
-            msg += f"Rating: {rating}\n"
+            msg += f"Rating: {rating}{format_stat_trend('rating', trends)}\n"
         
         kpr = player_data.get('kpr')
         if kpr and kpr != 'N/A':
-            msg += f"KPR: {kpr}\n"
+            msg += f"KPR: {kpr}{format_stat_trend('kpr', trends)}\n"
         
         adr = player_data.get('adr')
         if adr and adr != 'N/A':
-            msg += f"ADR: {adr}\n"
+            msg += f"ADR: {adr}{format_stat_trend('adr', trends)}\n"
         
         kast = player_data.get('kast')
         if kast and kast != 'N/A':
-            msg += f"KAST: {kast}\n"
+            msg += f"KAST: {kast}{format_stat_trend('kast', trends)}\n"
         
         headshot = player_data.get('headshot_pct')
         if headshot and headshot != 'N/A':
@@ -239,13 +744,15 @@ async def handle_cs2_player(
     else:
         msg = result.get("message", f"无法获取 {player_name} 的选手信息")
 
-    await matcher.finish(msg)
+    await matcher.finish(with_stale_note(msg, result))
 
 
 @matcher_cs2_events.handle()
+@command_handler("cs2赛事")
 async def handle_cs2_events(bot: Bot, event: MessageEvent, matcher: Matcher):
     """处理CS2赛事查询"""
-    result = await hltv_client.get_events()
+    client = get_client()
+    result = await client.get_events()
 
     if result.get("success"):
         events = result.get("data", [])
@@ -272,5 +779,539 @@ async def handle_cs2_events(bot: Bot, event: MessageEvent, matcher: Matcher):
     else:
         msg = result.get("message", "获取赛事信息失败")
 
+    await matcher.finish(with_stale_note(msg, result))
+
+
+# 比赛ID: 纯数字或 HLTV 比赛链接 (https://www.hltv.org/matches/2370000/...)
+_MATCH_ID = re.compile(r"^(?:\d+|.*/matches/(\d+)(?:/.*)?)$")
+MATCH_STATUS_TEXT = {"finished": "已结束", "live": "进行中", "upcoming": "未开始"}
+
+
+def parse_match_id(text: str, client: "HLTVClient") -> Optional[int]:
+    """比赛ID、比赛链接, 或战队名/赛事名 (取本地比赛索引中第一场匹配的比赛)"""
+    m = _MATCH_ID.match(text)
+    if m:
+        return int(m.group(1) or text)
+    for match in client.indexes.find_matches(text):
+        m = _MATCH_ID.match(match.get("url") or "")
+        if m and m.group(1):
+            return int(m.group(1))
+    return None
+
+
+def format_player_lines(players: List[Dict[str, Any]]) -> str:
+    """按战队分组的选手数据行: 名字 K-D | ADR | KAST | Rating"""
+    msg = ""
+    team = None
+    for player in players:
+        if player.get("team") != team:
+            team = player.get("team")
+            msg += f" {team or '未知战队'}\n"
+        kills = player.get("kills")
+        deaths = player.get("deaths")
+        kd = f"{kills}-{deaths}" if kills is not None and deaths is not None else "N/A"
+        adr = player.get("adr")
+        rating = player.get("rating")
+        msg += f"   {player.get('name', '?')} {kd} | {adr if adr is not None else 'N/A'}"
+        msg += f" | {player.get('kast') or 'N/A'} | {rating if rating is not None else 'N/A'}\n"
+    return msg
+
+
+@matcher_cs2_detail.handle()
+@command_handler("cs2详情")
+async def handle_cs2_detail(
+    bot: Bot, event: MessageEvent, matcher: Matcher, args: Message = CommandArg()
+):
+    """处理比赛详情查询
+
+    用法:
+        /cs2详情 2370000        - 按比赛ID (或 HLTV 比赛链接) 查看各地图比分和全场选手数据
+        /cs2详情 Vitality       - 查看该战队 (或赛事) 的下一场/正在进行的比赛
+        /cs2详情 2370000 2      - 查看第 2 张地图的选手数据
+    """
+    client = get_client()
+    parts = args.extract_plain_text().strip().split()
+    map_index = None
+    if len(parts) > 1 and parts[-1].isdigit() and len(parts[-1]) <= 1:
+        map_index = int(parts.pop())
+    query = " ".join(parts)
+
+    if not query:
+        await matcher.finish("请提供比赛ID、比赛链接或战队名。\n示例: /cs2详情 2370000")
+    match_id = parse_match_id(query, client)
+    if match_id is None and not client.indexes.matches:
+        # 按战队名查找时需要比赛数据
+        await client.get_cs2_matches()
+        match_id = parse_match_id(query, client)
+    if match_id is None:
+        await matcher.finish(f"没有找到与 {query} 相关的比赛，请提供比赛ID或比赛链接。")
+
+    result = await client.get_match_detail(match_id)
+
+    if result.get("success"):
+        match = result.get("data", {})
+        status = MATCH_STATUS_TEXT.get(match.get("status"), "")
+        score = f" {match.get('score1')}-{match.get('score2')} " if match.get("score1") is not None else " vs "
+        msg = f"【{match.get('team1', 'TBD')}{score}{match.get('team2', 'TBD')}】{status}\n"
+        msg += f"赛事: {match.get('event', 'Unknown')}"
+        if match.get("timestamp"):
+            msg += f" | {datetime.fromtimestamp(match['timestamp']).strftime('%Y-%m-%d %H:%M')}"
+        msg += "\n"
+        maps = match.get("maps", [])
+        if maps:
+            msg += "地图:\n"
+            for i, game in enumerate(maps, 1):
+                score = f"{game.get('score1')}-{game.get('score2')}" if game.get("score1") is not None else "-"
+                msg += f"   {i}. {game.get('name', '?')} {score}\n"
+        if map_index is not None:
+            if not 1 <= map_index <= len(maps):
+                await matcher.finish(f"这场比赛只有 {len(maps)} 张地图。")
+            players = maps[map_index - 1].get("players", [])
+            title = f"第 {map_index} 张地图 {maps[map_index - 1].get('name', '')}"
+        else:
+            players = match.get("players", [])
+            title = "全场"
+        if players:
+            msg += f"{title}选手数据 (K-D | ADR | KAST | Rating):\n"
+            msg += format_player_lines(players)
+        elif map_index is not None and maps[map_index - 1].get("stats_url"):
+            msg += f"{title}选手数据暂时获取失败，请稍后再试。\n"
+        msg += f"详情: {match.get('url', 'N/A')}\n"
+    else:
+        msg = result.get("message", f"无法获取比赛 {match_id} 的详情")
+
+    await matcher.finish(with_stale_note(msg, result))
+
+
+# 选手对比项: (字段, 显示名)
+COMPARE_METRICS = [
+    ("rating", "Rating"),
+    ("kpr", "KPR"),
+    ("adr", "ADR"),
+    ("kast", "KAST"),
+    ("headshot_pct", "爆头率"),
+]
+
+
+def _parse_stat(value: Any) -> Optional[float]:
+    """解析 "1.27" / "74.1%" 这类数据, 无效值返回 None"""
+    try:
+        return float(str(value).strip().rstrip("%"))
+    except (TypeError, ValueError):
+        return None
+
+
+def _build_compare_rows(players: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """生成对比表的每一行, 并标出每项数据的最高值"""
+    rows = []
+    for key, label in COMPARE_METRICS:
+        values = [_parse_stat(p.get(key)) for p in players]
+        valid = [v for v in values if v is not None]
+        if not valid:
+            continue
+        best = max(valid)
+        rows.append({
+            "label": label,
+            "cells": [
+                {
+                    "text": players[i].get(key) if values[i] is not None else "N/A",
+                    "best": values[i] == best and len(valid) > 1,
+                }
+                for i in range(len(players))
+            ],
+        })
+    return rows
+
+
+@matcher_cs2_compare.handle()
+@command_handler("cs2对比")
+async def handle_cs2_compare(
+    bot: Bot, event: MessageEvent, matcher: Matcher, args: Message = CommandArg()
+):
+    """处理选手对比
+
+    用法:
+        /cs2对比 ZywOo donk m0NESY
+    """
+    cfg, client = config, get_client()
+    text = args.extract_plain_text().strip()
+    names: List[str] = []
+    for name in re.split(r"[\s,，、]+", text):
+        if name and name.lower() != "vs" and name.lower() not in [n.lower() for n in names]:
+            names.append(name)
+
+    max_players = cfg.max_players_in_compare
+    if len(names) < 2:
+        await matcher.finish(f"请提供 2~{max_players} 名选手。\n示例: /cs2对比 ZywOo donk")
+    if len(names) > max_players:
+        await matcher.finish(f"最多同时对比 {max_players} 名选手。")
+
+    results = await client.get_players_info(names, concurrency=cfg.compare_concurrency)
+
+    players: List[Dict[str, Any]] = []
+    failed: List[str] = []
+    for name, result in zip(names, results):
+        if result.get("success") and result.get("data"):
+            players.append(result["data"])
+        else:
+            failed.append(name)
+
+    if len(players) < 2:
+        msg = "可对比的选手不足 2 名。"
+        if failed:
+            msg += f"\n未找到: {', '.join(failed)}"
+        await matcher.finish(msg)
+
+    rows = _build_compare_rows(players)
+    template_path = Path(__file__).parent / "templates"
+    try:
+        pic = await render_template(
+            template_path=str(template_path),
+            template_name="compare.html",
+            templates={
+                "players": players,
+                "rows": rows,
+                "failed": failed,
+                "time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            },
+            pages={
+                "viewport": {"width": 240 + 160 * len(players), "height": 100},
+            },
+        )
+    except Exception as e:
+        logger.error(f"渲染图片失败: {e}")
+        pic = None
+
+    if pic:
+        await matcher.finish(MessageSegment.image(pic))
+
+    # 降级为文本输出
+    msg = "【选手对比】\n"
+    msg += " vs ".join(p.get("name", "?") for p in players) + "\n"
+    for row in rows:
+        msg += f"{row['label']}: " + " | ".join(
+            f"{cell['text']}{'★' if cell['best'] else ''}" for cell in row["cells"]
+        ) + "\n"
+    if failed:
+        msg += f"未找到: {', '.join(failed)}\n"
     await matcher.finish(msg)
 
+
+async def build_digest(
+    cfg: ConfigModel, client: "HLTVClient"
+) -> Tuple[Optional[Message], Optional[List[Dict[str, Any]]]]:
+    """获取并渲染一期日报, 返回 (消息, 本期获取到的全部比赛结果)
+
+    每期只获取和渲染一次, 同一条消息发送到所有订阅的群。数据都获取失败时消息为 None,
+    比赛结果获取失败时第二项为 None。
+    """
+    with request_priority(Priority.PREFETCH):
+        results, matches = await asyncio.gather(
+            client.get_match_results(stars=cfg.digest_min_stars), client.get_cs2_matches()
+        )
+    if not results.get("success") and not matches.get("success"):
+        return None, []
+    fetched = results.get("data", []) if results.get("success") else None
+    picked = select_results(fetched or [], cfg.digest_min_stars, digest_store.last_results)
+    picked = picked[: cfg.max_results_per_query]
+    today = todays_matches(matches.get("data", []) if matches.get("success") else [])
+    today = today[: cfg.max_matches_per_query]
+    title = f"CS2 日报 {date.today().isoformat()}"
+    filter_text = f"{cfg.digest_min_stars}星及以上赛事 · 上期日报以来的结果"
+
+    template_path = Path(__file__).parent / "templates"
+    try:
+        pic = await render_template(
+            template_path=str(template_path),
+            template_name="results.html",
+            templates={
+                "title": title,
+                "results": picked,
+                "matches": today,
+                "filter_text": filter_text,
+                "time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            },
+            pages={
+                "viewport": {"width": 800, "height": 100},
+            },
+        )
+        return Message(MessageSegment.image(pic)), fetched
+    except Exception as e:
+        logger.error(f"渲染日报图片失败: {e}")
+
+    # 降级为文本输出
+    msg = f"【{title}】\n{filter_text}\n"
+    for i, match in enumerate(picked, 1):
+        msg += f"{i}. {match.get('team1', 'TBD')} {match.get('score1', 0)}-{match.get('score2', 0)} "
+        msg += f"{match.get('team2', 'TBD')} {'★' * int(match.get('stars') or 0)}\n"
+        msg += f"   赛事: {match.get('event', 'Unknown')}\n"
+    if not picked:
+        msg += "暂无新的比赛结果\n"
+    msg += "【今日比赛】\n"
+    for match in today:
+        status = "LIVE" if match.get("live") else match.get("time", "TBD")
+        msg += f"   {match.get('team1', 'TBD')} vs {match.get('team2', 'TBD')} | {status} | {match.get('event', 'Unknown')}\n"
+    if not today:
+        msg += "今天没有安排的比赛\n"
+    return Message(msg), fetched
+
+
+# 同一时间只进行一次日报推送
+_digest_running = False
+
+
+async def broadcast_digest(scheduled: bool = False) -> Dict[str, Any]:
+    """获取并渲染一期日报后推送到所有订阅的群, 返回推送报告
+
+    Args:
+        scheduled: 是否为每天 digest_time 的定时推送 (手动推送不影响当天的定时推送)
+    """
+    global _digest_running
+    if _digest_running:
+        return {"success": False, "message": "日报正在推送中"}
+    if not len(digest_store):
+        return {"success": False, "message": "没有订阅日报的群"}
+    _digest_running = True
+    try:
+        cfg, client = config, get_client()
+        message, fetched = await build_digest(cfg, client)
+        if message is None:
+            return {"success": False, "message": "获取日报数据失败"}
+
+        bots = {self_id: bot for self_id, bot in get_bots().items() if isinstance(bot, Bot)}
+
+        async def send(self_id: str, group_id: int) -> None:
+            await bots[self_id].send_group_msg(group_id=group_id, message=message)
+
+        sender = DigestSender(cfg.digest_send_rate, cfg.digest_send_attempts)
+        report = await sender.broadcast(dict(digest_store.groups), list(bots), send)
+        metrics.digest = report
+        logger.info(
+            f"日报推送完成: {report['sent']}/{report['groups']} 个群, 失败 {report['failed']}, "
+            f"重试 {report['retries']}, 用时 {report['seconds']} 秒 ({report['throughput']} 条/秒)"
+        )
+        if report["sent"] and fetched is not None:
+            # 本期已获取到的结果都不再出现在下一期
+            digest_store.record_sent(fetched, scheduled=scheduled)
+        return {"success": True, "data": report}
+    finally:
+        _digest_running = False
+
+
+def format_digest_report(result: Dict[str, Any]) -> str:
+    if not result.get("success"):
+        return result.get("message", "日报推送失败")
+    report = result["data"]
+    msg = f"日报推送完成: {report['sent']}/{report['groups']} 个群成功\n"
+    msg += f"失败 {report['failed']} | 重试 {report['retries']} | 机器人账号 {report['bots']}\n"
+    msg += f"用时 {report['seconds']} 秒 ({report['throughput']} 条/秒)"
+    for failure in report["failures"][:5]:
+        msg += f"\n   群 {failure['group_id']}: {failure['error']}"
+    return msg
+
+
+async def _digest_loop():
+    """每天 digest_time 推送日报 (每分钟检查一次配置, 修改推送时间无需重启)"""
+    while True:
+        clock = config.digest_time
+        try:
+            wait = seconds_until(clock) if clock else None
+        except ValueError:
+            logger.error(f"日报推送时间格式错误: {clock} (应为 HH:MM)")
+            wait = None
+        if wait is None or wait > 60:
+            await asyncio.sleep(60)
+            continue
+        await asyncio.sleep(wait)
+        # 同一天已推送过 (如推送后重启) 时不重复推送
+        if digest_store.last_sent == date.today().isoformat():
+            continue
+        try:
+            await broadcast_digest(scheduled=True)
+        except Exception as e:
+            logger.error(f"日报推送失败: {e}")
+
+
+@get_driver().on_startup
+async def _start_digest():
+    global _digest_task
+    _digest_task = asyncio.create_task(_digest_loop())
+
+
+@matcher_cs2_digest.handle()
+@command_handler("cs2日报")
+async def handle_cs2_digest(
+    bot: Bot, event: MessageEvent, matcher: Matcher, args: Message = CommandArg()
+):
+    """每日日报订阅
+
+    用法:
+        /cs2日报        - 查看本群的订阅状态
+        /cs2日报 订阅   - 本群订阅每日日报 (群管理员)
+        /cs2日报 退订   - 本群取消订阅 (群管理员)
+        /cs2日报 推送   - 立即向所有订阅的群推送一期日报 (超级用户)
+    """
+    action = args.extract_plain_text().strip()
+
+    if action == "推送":
+        if not await SUPERUSER(bot, event):
+            await matcher.finish("只有超级用户可以手动推送日报。")
+        await matcher.send(f"开始推送日报到 {len(digest_store)} 个群...")
+
+        async def push():
+            await bot.send(event, format_digest_report(await broadcast_digest()))
+
+        # 推送耗时与订阅群数成正比, 在后台进行, 完成后回复推送报告
+        get_client().spawn(push())
+        await matcher.finish()
+
+    if not isinstance(event, GroupMessageEvent):
+        await matcher.finish("请在群聊中订阅日报。")
+    if action in ("订阅", "退订"):
+        if not await (SUPERUSER | GROUP_ADMIN | GROUP_OWNER)(bot, event):
+            await matcher.finish("只有群管理员可以订阅或退订日报。")
+        if action == "订阅":
+            digest_store.subscribe(event.group_id, bot.self_id)
+            msg = f"已订阅日报，每天 {config.digest_time or '(未设置推送时间)'} 推送。"
+        elif digest_store.unsubscribe(event.group_id):
+            msg = "已取消订阅日报。"
+        else:
+            msg = "本群未订阅日报。"
+        await matcher.finish(msg)
+
+    if event.group_id in digest_store.groups:
+        msg = f"本群已订阅日报，每天 {config.digest_time or '(未设置推送时间)'} 推送。"
+    else:
+        msg = "本群未订阅日报，发送 /cs2日报 订阅 开启。"
+    await matcher.finish(msg)
+
+
+async def backfill_leaderboard(cfg: ConfigModel, client: "HLTVClient") -> Dict[str, Any]:
+    """获取排名前 leaderboard_teams 支战队全部选手的数据写入榜单数据表 (批量优先级, 并发受限)
+
+    获取失败的选手保留旧数据, 已不在排名战队中的选手从表中移除。
+    """
+    started = time.monotonic()
+    with request_priority(Priority.BULK):
+        rankings = await client.get_team_rankings(limit=cfg.leaderboard_teams)
+        if not rankings.get("success"):
+            return {"success": False, "message": rankings.get("message", "获取战队排名失败")}
+        # 选手 -> 所在的排名战队
+        roster: Dict[str, str] = {}
+        for team in rankings.get("data", [])[: cfg.leaderboard_teams]:
+            for member in team.get("members") or []:
+                roster.setdefault(member, team.get("title", ""))
+        results = await client.get_players_info(list(roster), concurrency=cfg.leaderboard_concurrency)
+
+    stat_table.retain(roster)
+    failed = []
+    for (name, team), result in zip(roster.items(), results):
+        if result.get("success") and isinstance(result.get("data"), dict):
+            stat_table.upsert({**result["data"], "name": name}, team)
+        else:
+            failed.append(name)
+    if len(failed) < len(roster):
+        stat_table.mark_updated()
+    seconds = round(time.monotonic() - started, 1)
+    logger.info(
+        f"选手榜单已更新: {len(roster) - len(failed)}/{len(roster)} 名选手, 用时 {seconds} 秒"
+        + (f", 失败: {', '.join(failed[:10])}" if failed else "")
+    )
+    return {"success": True, "players": len(roster), "failed": failed, "seconds": seconds}
+
+
+def start_leaderboard_backfill() -> bool:
+    """在后台开始一次榜单回填, 已有回填在进行时返回 False"""
+    global _leaderboard_backfill
+    if _leaderboard_backfill is not None and not _leaderboard_backfill.done():
+        return False
+
+    async def run():
+        try:
+            await backfill_leaderboard(config, get_client())
+        except Exception as e:
+            logger.error(f"选手榜单更新失败: {e}")
+
+    _leaderboard_backfill = asyncio.create_task(run())
+    return True
+
+
+async def _leaderboard_loop():
+    """按 leaderboard_refresh 间隔在后台回填榜单 (重启后从上次更新时间继续计时)
+
+    回填失败时 (没有更新时间) 至少间隔 10 分钟再试。
+    """
+    while True:
+        interval = config.leaderboard_refresh
+        if interval <= 0:
+            await asyncio.sleep(60)
+            continue
+        elapsed = time.time() - stat_table.updated if stat_table.updated else interval
+        if elapsed < interval:
+            await asyncio.sleep(min(interval - elapsed, 60))
+            continue
+        if start_leaderboard_backfill():
+            await _leaderboard_backfill
+        await asyncio.sleep(min(interval, 600))
+
+
+@get_driver().on_startup
+async def _start_leaderboard():
+    global _leaderboard_task
+    _leaderboard_task = asyncio.create_task(_leaderboard_loop())
+
+
+# 榜单显示的选手数及各指标的小数位数
+LEADERBOARD_SIZE = 10
+LEADERBOARD_DIGITS = {"rating": 2, "kpr": 2, "adr": 1, "kast": 1, "kd": 2, "impact": 2, "dpr": 2}
+
+
+@matcher_cs2_leaderboard.handle()
+@command_handler("cs2榜单")
+async def handle_cs2_leaderboard(
+    bot: Bot, event: MessageEvent, matcher: Matcher, args: Message = CommandArg()
+):
+    """选手数据榜单
+
+    用法:
+        /cs2榜单 <指标> [战队/国家]
+        指标: rating / kpr / adr / kast / kd / impact / dpr
+    """
+    parts = args.extract_plain_text().split(maxsplit=1)
+    metric = resolve_metric(parts[0]) if parts else None
+    if metric is None:
+        await matcher.finish(
+            "用法: /cs2榜单 <指标> [战队/国家]\n"
+            f"指标: {' / '.join(LEADERBOARD_METRICS)}\n"
+            "示例: /cs2榜单 adr、/cs2榜单 rating Vitality"
+        )
+
+    if not len(stat_table):
+        started = start_leaderboard_backfill()
+        await matcher.finish(
+            f"榜单数据{'开始' if started else '正在'}收集中 (排名前 {config.leaderboard_teams} 战队的选手)，请稍后再试。"
+        )
+
+    where = None
+    scope = f"排名前 {config.leaderboard_teams} 战队"
+    if len(parts) > 1:
+        where = stat_table.resolve_filter(parts[1])
+        if where is None:
+            await matcher.finish(f"榜单中没有战队或国家 {parts[1]}。")
+        kind, code = where
+        scope = stat_table.team_names[code] if kind == "team" else stat_table.country_names[code]
+
+    _, label, ascending = LEADERBOARD_METRICS[metric]
+    top = stat_table.top(metric, LEADERBOARD_SIZE, where)
+    if not top:
+        await matcher.finish(f"暂无 {label} 数据 (当前数据源可能不提供该指标)。")
+
+    digits = LEADERBOARD_DIGITS[metric]
+    suffix = "%" if metric == "kast" else ""
+    msg = f"【{label} 榜单 · {scope}】{'(越低越好)' if ascending else ''}\n"
+    for i, (row, value) in enumerate(top, 1):
+        team = stat_table.team_names[stat_table.teams[row]]
+        msg += f"{i}. {stat_table.names[row]} ({team}) {value:.{digits}f}{suffix}\n"
+    updated = time.strftime("%m-%d %H:%M", time.localtime(stat_table.updated)) if stat_table.updated else "未知"
+    msg += f"共 {stat_table.count(metric, where)} 名选手有数据 · 更新于 {updated}"
+    await matcher.finish(msg)
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from __future__ import annotations
+
+import math
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Tuple
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """已排序数据的百分位数 (最近秩法)"""
+    if not sorted_values:
+        return 0.0
+    k = max(0, min(len(sorted_values) - 1, math.ceil(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[k]
+
+
+# 上游请求优先级 (与 scheduler.Priority 对应), 排队耗时按优先级分别统计
+QUEUE_CLASSES = ("interactive", "prefetch", "bulk")
+
+
+class Metrics:
+    """插件运行指标 (进程内, 滑动窗口)
+
+    记录命令和上游请求的耗时、缓存命中、各优先级的排队耗时、进行中的上游请求数、图片渲染排队数
+    和事件循环延迟，供 WebUI 仪表盘每秒推送一次快照。
+    """
+
+    def __init__(self, window: float = 60) -> None:
+        self.window = window
+        # (完成时间, 耗时秒数)
+        self._commands: Deque[Tuple[float, float]] = deque()
+        self._upstream: Deque[Tuple[float, float]] = deque()
+        self._upstream_errors: Deque[float] = deque()
+        self.cache_hits = 0
+        self.cache_misses = 0
+        # 跨进程共享缓存: 命中 / 等待其他进程刷新后命中 / 使用旧数据 / 本进程刷新
+        self.shared = {"hits": 0, "wait_hits": 0, "stale": 0, "refreshes": 0}
+        # 未找到的选手/战队: 由未找到缓存直接回答 / 请求上游后未找到 (不计入上面的缓存命中率)
+        self.not_found = {"cached": 0, "upstream": 0}
+        # 请求降级: 失败后重试 / 超出命令的延迟预算 / 失败时使用过期的缓存数据
+        self.degraded = {"retries": 0, "budget_exhausted": 0, "stale_served": 0}
+        self.upstream_inflight = 0
+        # 上游请求调度: 各优先级的排队数、进行中的请求数和排队耗时
+        self.queue_depth = {name: 0 for name in QUEUE_CLASSES}
+        self.queue_running = {name: 0 for name in QUEUE_CLASSES}
+        self._queue_wait: Dict[str, Deque[Tuple[float, float]]] = {name: deque() for name in QUEUE_CLASSES}
+        self.render_pending = 0
+        # 比赛数据自适应刷新的当前间隔和请求数统计 (AdaptivePoller.report)
+        self.match_polling: Dict[str, Any] = {}
+        # 最近一次日报推送的报告 (DigestSender.broadcast)
+        self.digest: Dict[str, Any] = {}
+        # 事件循环延迟 (LoopMonitor): (记录时间, 延迟秒数), 当前任务数, 最近的阻塞记录
+        self._loop_lag: Deque[Tuple[float, float]] = deque()
+        self.loop_tasks = 0
+        self.loop_blocks: Deque[Dict[str, Any]] = deque(maxlen=20)
+        self.started_at = time.time()
+
+    def _trim(self, now: float) -> None:
+        edge = now - self.window
+        for series in (self._commands, self._upstream, self._loop_lag, *self._queue_wait.values()):
+            while series and series[0][0] < edge:
+                series.popleft()
+        while self._upstream_errors and self._upstream_errors[0] < edge:
+            self._upstream_errors.popleft()
+
+    def record_command(self, seconds: float) -> None:
+        self._commands.append((time.monotonic(), seconds))
+
+    def record_upstream(self, seconds: float, ok: bool = True) -> None:
+        now = time.monotonic()
+        self._upstream.append((now, seconds))
+        if not ok:
+            self._upstream_errors.append(now)
+
+    def record_cache(self, hit: bool) -> None:
+        if hit:
+            self.cache_hits += 1
+        else:
+            self.cache_misses += 1
+
+    def record_queue(self, name: str, seconds: float) -> None:
+        self._queue_wait[name].append((time.monotonic(), seconds))
+
+    def record_shared(self, outcome: str) -> None:
+        self.shared[outcome] += 1
+
+    def record_not_found(self, cached: bool) -> None:
+        self.not_found["cached" if cached else "upstream"] += 1
+
+    def record_degraded(self, outcome: str) -> None:
+        self.degraded[outcome] += 1
+
+    def record_loop_lag(self, seconds: float) -> None:
+        self._loop_lag.append((time.monotonic(), seconds))
+
+    def record_loop_block(self, block: Dict[str, Any]) -> None:
+        """记录一次事件循环阻塞 (由看门狗线程调用)"""
+        self.loop_blocks.append(block)
+
+    @staticmethod
+    def _summary(series: Deque[Tuple[float, float]], now: float) -> Dict[str, float]:
+        # 速率取最近 10 秒的平均值, 百分位取整个窗口
+        recent = sum(1 for t, _ in series if t >= now - 10)
+        latencies = sorted(s for _, s in series)
+        return {
+            "rate": round(recent / 10, 2),
+            "count": len(latencies),
+            "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+            "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+            "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+        }
+
+    def loop_summary(self) -> Dict[str, Any]:
+        lags = sorted(s for _, s in self._loop_lag)
+        edge = time.time() - self.window
+        return {
+            "lag_p50_ms": round(percentile(lags, 50) * 1000, 1),
+            "lag_p99_ms": round(percentile(lags, 99) * 1000, 1),
+            "lag_max_ms": round(lags[-1] * 1000, 1) if lags else 0.0,
+            "tasks": self.loop_tasks,
+            "blocks": sum(1 for b in list(self.loop_blocks) if b["time"] >= edge),
+        }
+
+    def snapshot(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        self._trim(now)
+        lookups = self.cache_hits + self.cache_misses
+        return {
+            "time": time.time(),
+            "uptime": round(time.time() - self.started_at),
+            "window": self.window,
+            "commands": self._summary(self._commands, now),
+            "upstream": {
+                **self._summary(self._upstream, now),
+                "errors": len(self._upstream_errors),
+                "inflight": self.upstream_inflight,
+            },
+            "cache": {
+                "hits": self.cache_hits,
+                "misses": self.cache_misses,
+                "hit_ratio": round(self.cache_hits / lookups, 3) if lookups else 0.0,
+            },
+            "shared_cache": dict(self.shared),
+            "not_found": dict(self.not_found),
+            "degraded": dict(self.degraded),
+            "queues": {
+                name: {
+                    **self._summary(series, now),
+                    "queued": self.queue_depth[name],
+                    "running": self.queue_running[name],
+                }
+                for name, series in self._queue_wait.items()
+            },
+            "match_polling": self.match_polling,
+            "digest": self.digest,
+            "loop": self.loop_summary(),
+            "render_pending": self.render_pending,
+        }
+
+
+metrics = Metrics()
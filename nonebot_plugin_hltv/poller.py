@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from __future__ import annotations
+
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from .metrics import metrics
+
+
+class AdaptivePoller:
+    """比赛数据的自适应刷新间隔
+
+    根据比赛列表中的开始时间 (timestamp) 和直播标记 (live) 决定下次刷新前的等待时间:
+    有比赛正在进行或已到开始时间时使用最短间隔, 临近开始时逐渐缩短,
+    没有安排比赛时退避到最长间隔。API Server 未返回开始时间时使用固定间隔。
+
+    同时统计实际刷新次数, 与按固定间隔刷新相比估算每天节省的上游请求数。
+    """
+
+    # 距下一场比赛开始的时间除以该系数作为等待时间 (1 小时后开始 -> 15 分钟后再看)
+    LEAD_FACTOR = 4
+
+    def __init__(self, min_interval: float = 30, max_interval: float = 1800, fixed_interval: float = 60) -> None:
+        self.min_interval = max(1.0, float(min_interval))
+        self.max_interval = max(self.min_interval, float(max_interval))
+        # 未启用自适应时的固定刷新间隔 (cache_duration_matches), 作为节省次数的对照
+        self.fixed_interval = max(1.0, float(fixed_interval))
+        self.interval = self.fixed_interval
+        self.reason = "尚未获取数据"
+        self.next_match_in: Optional[float] = None
+        self.live = 0
+        self.polls = 0
+        self.started = time.time()
+
+    def next_interval(self, matches: Optional[List[Dict[str, Any]]], now: Optional[float] = None) -> Tuple[float, str]:
+        """根据比赛列表计算下次刷新前的等待秒数及原因"""
+        now = time.time() if now is None else now
+        matches = matches or []
+        self.live = sum(1 for m in matches if m.get("live"))
+        starts = [m["timestamp"] for m in matches if isinstance(m.get("timestamp"), (int, float))]
+        upcoming = [t - now for t in starts if t > now]
+        self.next_match_in = min(upcoming) if upcoming else None
+
+        if self.live:
+            return self.min_interval, f"{self.live} 场比赛进行中"
+        if len(starts) > len(upcoming):
+            # 已到开始时间但尚未标记为进行中 (比赛推迟或刚开始)
+            return self.min_interval, "比赛即将开始"
+        if upcoming:
+            wait = self.next_match_in / self.LEAD_FACTOR
+            return min(self.max_interval, max(self.min_interval, wait)), f"下一场比赛 {self.next_match_in / 60:.0f} 分钟后开始"
+        if matches and not starts:
+            # 旧版 API Server 不返回开始时间
+            return self.fixed_interval, "无开始时间, 使用固定间隔"
+        return self.max_interval, "没有安排的比赛"
+
+    def record(self, matches: Optional[List[Dict[str, Any]]], now: Optional[float] = None) -> float:
+        """记录一次从上游获取比赛数据, 返回下次刷新前的等待秒数"""
+        self.polls += 1
+        self.interval, self.reason = self.next_interval(matches, now)
+        metrics.match_polling = self.report(now)
+        return self.interval
+
+    def report(self, now: Optional[float] = None) -> Dict[str, Any]:
+        """当前间隔及与固定间隔相比的请求数统计
+
+        每天的数值按运行时间折算 (运行不足 1 小时时按 1 小时折算, 避免刚启动时数值失真)。
+        """
+        now = time.time() if now is None else now
+        elapsed = max(0.0, now - self.started)
+        # 固定间隔下的请求数 (两种方式都在启动时请求一次)
+        fixed_calls = 1 + int(elapsed // self.fixed_interval)
+        scale = 86400 / max(elapsed, 3600)
+        return {
+            "interval": round(self.interval, 1),
+            "reason": self.reason,
+            "live": self.live,
+            "next_match_in": round(self.next_match_in) if self.next_match_in is not None else None,
+            "polls": self.polls,
+            "fixed_polls": fixed_calls,
+            "calls_per_day": round(self.polls * scale),
+            "fixed_calls_per_day": round(86400 / self.fixed_interval),
+            "saved_per_day": round((fixed_calls - self.polls) * scale),
+        }
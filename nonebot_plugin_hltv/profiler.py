@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from __future__ import annotations
+
+import asyncio
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from types import FrameType
+from typing import Any, Dict, List, Optional
+
+from .metrics import metrics
+
+# 调用栈最大深度 (超出部分从根部截断)
+MAX_DEPTH = 128
+
+
+def _frame_label(frame: FrameType) -> str:
+    code = frame.f_code
+    name = getattr(code, "co_qualname", code.co_name)
+    return f"{name} ({Path(code.co_filename).name}:{code.co_firstlineno})"
+
+
+def _is_idle(frame: FrameType) -> bool:
+    """事件循环线程是否在等待 I/O (selector.select)"""
+    return frame.f_code.co_name in ("select", "poll", "control") and frame.f_code.co_filename.endswith("selectors.py")
+
+
+def collapse_stack(frame: Optional[FrameType]) -> str:
+    """调用栈转为 folded 格式 (根在前, 以 ; 分隔)"""
+    labels: List[str] = []
+    while frame is not None and len(labels) < MAX_DEPTH:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+
+class SamplingProfiler:
+    """事件循环线程的采样分析器
+
+    在独立线程中按固定间隔读取事件循环线程的调用栈 (sys._current_frames) 并计数,
+    不需要修改或重启正在运行的代码, 采样期间事件循环照常工作。
+    同一时间只允许一次采样。
+    """
+
+    def __init__(self) -> None:
+        self.running = False
+
+    @staticmethod
+    def _sample(thread_id: int, seconds: float, interval: float, include_idle: bool) -> Dict[str, Any]:
+        stacks: Counter = Counter()
+        samples = idle = 0
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            frame = sys._current_frames().get(thread_id)
+            if frame is not None:
+                samples += 1
+                if _is_idle(frame):
+                    idle += 1
+                    if include_idle:
+                        stacks["(idle)"] += 1
+                else:
+                    stacks[collapse_stack(frame)] += 1
+            del frame
+            time.sleep(interval)
+        return {"stacks": stacks, "samples": samples, "idle": idle}
+
+    async def profile(self, seconds: float, interval: float = 0.005, include_idle: bool = False) -> Dict[str, Any]:
+        """采样当前事件循环线程 seconds 秒
+
+        Returns:
+            stacks: folded 调用栈 -> 采样次数; samples: 总采样数; idle: 事件循环空闲的采样数
+
+        Raises:
+            RuntimeError: 已有采样在进行中
+        """
+        if self.running:
+            raise RuntimeError("已有采样在进行中")
+        self.running = True
+        try:
+            thread_id = threading.get_ident()
+            return await asyncio.to_thread(self._sample, thread_id, seconds, interval, include_idle)
+        finally:
+            self.running = False
+
+
+def format_collapsed(stacks: Dict[str, int]) -> str:
+    """folded 格式文本 (flamegraph.pl / speedscope / inferno 可直接读取)"""
+    return "".join(f"{stack} {count}\n" for stack, count in sorted(stacks.items(), key=lambda x: -x[1]))
+
+
+class LoopMonitor:
+    """事件循环延迟和任务数监控
+
+    后台任务每 INTERVAL 秒唤醒一次, 实际唤醒时间比预期晚的部分即事件循环延迟 (被同步代码占用的时间)。
+    看门狗线程发现心跳停止超过 BLOCK_THRESHOLD 秒时记录事件循环线程当前的调用栈,
+    用于定位阻塞事件循环的同步调用 (如大 JSON 序列化、模板渲染、同步文件 I/O)。
+    """
+
+    INTERVAL = 0.1
+    BLOCK_THRESHOLD = 0.1
+
+    def __init__(self) -> None:
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+        self._thread_id = 0
+        self._heartbeat = 0.0
+
+    def start(self) -> None:
+        if self._task is not None and not self._task.done():
+            return
+        self._thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stopped.clear()
+        self._task = asyncio.create_task(self._run())
+        self._watchdog = threading.Thread(target=self._watch, name="hltv-loop-watchdog", daemon=True)
+        self._watchdog.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            self._heartbeat = time.monotonic()
+            start = loop.time()
+            await asyncio.sleep(self.INTERVAL)
+            metrics.record_loop_lag(max(0.0, loop.time() - start - self.INTERVAL))
+            metrics.loop_tasks = len(asyncio.all_tasks(loop))
+
+    def _watch(self) -> None:
+        reported = None
+        while not self._stopped.wait(self.BLOCK_THRESHOLD / 2):
+            heartbeat = self._heartbeat
+            blocked = time.monotonic() - heartbeat - self.INTERVAL
+            if blocked < self.BLOCK_THRESHOLD:
+                continue
+            if reported is not None and reported["heartbeat"] == heartbeat:
+                # 同一次阻塞, 更新持续时间
+                reported["duration_ms"] = round(blocked * 1000, 1)
+                continue
+            frame = sys._current_frames().get(self._thread_id)
+            reported = {
+                "heartbeat": heartbeat,
+                "time": time.time(),
+                "duration_ms": round(blocked * 1000, 1),
+                "stack": collapse_stack(frame).split(";") if frame is not None else [],
+            }
+            del frame
+            metrics.record_loop_block(reported)
+
+
+def task_summary(limit: int = 20) -> Dict[str, Any]:
+    """当前事件循环中的任务数 (按协程名称分组)"""
+    tasks = asyncio.all_tasks()
+    groups: Counter = Counter()
+    for task in tasks:
+        coro = task.get_coro()
+        groups[getattr(coro, "__qualname__", type(coro).__name__)] += 1
+    return {
+        "total": len(tasks),
+        "by_coroutine": [{"name": name, "count": count} for name, count in groups.most_common(limit)],
+    }
+
+
+profiler = SamplingProfiler()
+loop_monitor = LoopMonitor()
@@ -3,11 +3,31 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
-from typing import Any, Dict, Optional
+import random
+import sqlite3
+import time
+from typing import Any, Callable, Dict, List, Optional, Set
 from datetime import datetime
+from urllib.parse import quote
 import aiohttp
 
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+from .archive import MatchArchive
+from .budget import remaining_budget
+from .cache import TTLCache
+from .indexes import DatasetIndexes, normalize_name
+from .metrics import metrics
+from .poller import AdaptivePoller
+from .scheduler import Priority, RequestScheduler, current_priority, request_priority
+from .shared_cache import SharedCache
+from .tracing import parse_server_timing, tracer
+
 logger = logging.getLogger(__name__)
 
 
@@ -17,38 +37,455 @@ class HLTVClient:
     BASE_URL = "https://www.hltv.org"
     # 默认 API 地址
     DEFAULT_API_URL = "https://hltv-api-proxy.shirasuazusa.workers.dev"
+    # 各接口默认缓存时间(秒)
+    DEFAULT_CACHE_TTL = {
+        "/api/matches": 60,
+        "/api/rankings": 3600,
+        "/api/results": 300,
+        "/api/events": 3600,
+        "/api/player": 600,
+        "/api/team": 3600,
+        # 进行中/未开始的比赛详情; 已结束的比赛保存在 match_archive 中, 不再请求
+        "/api/match": 30,
+    }
+    # 各列表接口只请求插件用到的字段 (命令、模板、话题检测和本地索引用到的字段的并集)
+    ENDPOINT_FIELDS = {
+        "/api/matches": "team1,team2,time,timestamp,live,event,bo_type,url",
+        "/api/results": "team1,team2,score1,score2,event,stars",
+        "/api/rankings": "rank,title,points,members",
+        "/api/events": "name,tier,tier_name,location,start_date,end_date",
+    }
+    MSGPACK_TYPES = ("application/msgpack", "application/x-msgpack")
+    # 战队页面获取失败后, 隔多久 (秒) 再在后台重试
+    TEAM_DETAIL_RETRY_AFTER = 120
+    # 其他进程正在刷新且没有旧数据时, 检查共享缓存的间隔 (秒)
+    SHARED_WAIT_INTERVAL = 0.1
+    # 按名称查询的接口, 未找到的名称 (归一化后) 缓存 not_found_ttl 秒
+    NAME_ENDPOINTS = ("/api/player", "/api/team")
+    # 各接口的 (连接超时, 读取超时) 秒; 选手/战队需要 API Server 抓取多个页面, 读取超时更长
+    ENDPOINT_TIMEOUTS = {
+        "/api/matches": (3, 10),
+        "/api/results": (3, 10),
+        "/api/rankings": (3, 15),
+        "/api/events": (3, 15),
+        "/api/player": (3, 25),
+        "/api/team": (3, 25),
+        "/api/match": (3, 25),
+    }
+    DEFAULT_TIMEOUT = (3, 15)
+    # 连接失败、超时和以下状态码时重试, 最多请求 RETRY_ATTEMPTS 次
+    RETRY_STATUS = (429, 500, 502, 503, 504)
+    RETRY_ATTEMPTS = 3
+    # 第 n 次重试前等待 [0, RETRY_BACKOFF * 2^n] 内的随机时间 (full jitter, 避免多个请求同时重试)
+    RETRY_BACKOFF = 0.5
+    # 剩余延迟预算不足该秒数时不再重试
+    MIN_ATTEMPT_TIME = 1.0
     
-    def __init__(self, api_url: str = "") -> None:
+    def __init__(
+        self,
+        api_url: str = "",
+        enable_caching: bool = True,
+        cache_ttl: Optional[Dict[str, int]] = None,
+        shared_cache: Optional[SharedCache] = None,
+        max_concurrency: int = 6,
+        match_poller: Optional[AdaptivePoller] = None,
+        not_found_ttl: float = 300,
+        match_archive: Optional[MatchArchive] = None,
+        ranked_team_limit: int = 30,
+    ) -> None:
         self.logger = logging.getLogger(__name__)
         # 如果没有配置，使用默认 API
         self.api_url = (api_url.rstrip("/") if api_url else self.DEFAULT_API_URL)
+        self.enable_caching = enable_caching
+        self.cache_ttl = {**self.DEFAULT_CACHE_TTL, **(cache_ttl or {})}
+        self.cache = TTLCache()
+        # 未找到的选手/战队: "接口:归一化名称" -> 未找到的响应
+        self.not_found_ttl = not_found_ttl
+        self.not_found_cache = TTLCache(max_size=1024)
+        # 已结束比赛的详情存档 (可选)
+        self.match_archive = match_archive
+        # 排名数据集的战队数 (与排名命令请求的数量相同, 共用一份缓存), 数据集内的战队直接由排名数据回答
+        self.ranked_team_limit = ranked_team_limit
+        # 后台获取战队页面失败的战队: 归一化名称 -> True, TEAM_DETAIL_RETRY_AFTER 秒内不再重试
+        self._team_detail_failed = TTLCache(max_size=256)
+        # 跨进程共享缓存 (可选), 本地缓存未命中时先查共享缓存
+        self.shared_cache = shared_cache
+        # 共享缓存中已通知过刷新监听器的数据: key -> 写入时间
+        self._shared_seen: Dict[str, float] = {}
+        # 比赛数据的自适应刷新间隔 (可选), 启用时代替固定的比赛缓存时间
+        self.match_poller = match_poller
+        # 上游请求调度 (全局并发上限, 用户命令优先于后台请求)
+        self.scheduler = RequestScheduler(max_concurrency)
+        # 正在进行的请求, 相同请求并发时只发起一次
+        self._inflight: Dict[str, asyncio.Future] = {}
+        # 后台任务 (保持引用, 避免被回收)
+        self._background: Set[asyncio.Task] = set()
+        # 共享连接池, 首次请求时创建
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._active_requests = 0
+        self.closed = False
+        # 数据刷新监听器: endpoint -> [callback(data)]
+        self._refresh_listeners: Dict[str, List[Callable[[Any], None]]] = {}
+        # 比赛/结果/赛事的本地索引, 随数据刷新重建
+        self.indexes = DatasetIndexes()
+        self.add_refresh_listener("/api/matches", lambda data: self.indexes.load_matches(data))
+        self.add_refresh_listener("/api/results", lambda data: self.indexes.load_results(data))
+        self.add_refresh_listener("/api/events", lambda data: self.indexes.load_events(data))
+        if match_poller is not None:
+            self.add_refresh_listener("/api/matches", match_poller.record)
         self.logger.info(f"HLTV客户端初始化完成 (API: {self.api_url})")
 
-    async def _api_request(self, endpoint: str, params: Optional[Dict] = None) -> Dict[str, Any]:
-        """通过 API Server 获取数据"""
+    def adopt_state(self, other: "HLTVClient") -> None:
+        """沿用另一个客户端 (同一后端) 的缓存和索引"""
+        self.cache = other.cache
+        self.not_found_cache = other.not_found_cache
+        self.indexes = other.indexes
+        self._shared_seen = other._shared_seen
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            # 关闭后不再创建连接池 (排空期间的请求仍使用原有连接池), 否则新连接池不会被关闭
+            if self.closed:
+                raise RuntimeError("客户端已关闭")
+            self._session = aiohttp.ClientSession()
+        return self._session
+
+    async def aclose(self, timeout: float = 30) -> None:
+        """等待进行中的请求完成 (最多 timeout 秒) 后关闭连接池"""
+        self.closed = True
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while self._active_requests and loop.time() < deadline:
+            await asyncio.sleep(0.05)
+        if self._active_requests:
+            self.logger.warning(f"关闭客户端时仍有 {self._active_requests} 个请求未完成")
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        if self.shared_cache is not None:
+            self.shared_cache.close()
+        self.logger.info(f"HLTV客户端已关闭 (API: {self.api_url})")
+
+    def add_refresh_listener(self, endpoint: str, callback: Callable[[Any], None]) -> None:
+        """注册数据刷新监听器, 每次从 API 成功获取 endpoint 的数据后调用"""
+        self._refresh_listeners.setdefault(endpoint, []).append(callback)
+
+    def _notify_refresh(self, endpoint: str, data: Dict[str, Any]) -> None:
+        if not data.get("success"):
+            return
+        for callback in self._refresh_listeners.get(endpoint, []):
+            try:
+                callback(data.get("data"))
+            except Exception as e:
+                self.logger.error(f"刷新监听器执行失败 {endpoint}: {e}")
+
+    @staticmethod
+    def _cache_key(endpoint: str, params: Optional[Dict] = None) -> str:
+        if not params:
+            return endpoint
+        query = "&".join(f"{k}={str(v).lower()}" for k, v in sorted(params.items()))
+        return f"{endpoint}?{query}"
+
+    def _not_found_key(self, endpoint: str, params: Optional[Dict] = None) -> Optional[str]:
+        if endpoint not in self.NAME_ENDPOINTS or not params:
+            return None
+        name = normalize_name(params.get("name"))
+        return f"{endpoint}:{name}" if name else None
+
+    @staticmethod
+    def _is_not_found(data: Dict[str, Any]) -> bool:
+        """是否为未找到的结果 (旧版 API Server 没有 not_found 标记, 按错误信息判断)"""
+        if data.get("success"):
+            return False
+        return bool(data.get("not_found")) or str(data.get("error") or "").startswith("未找到")
+
+    def _ttl(self, endpoint: str) -> float:
+        """接口数据的缓存时间 (比赛数据启用自适应间隔时使用最近一次计算的间隔)"""
+        if endpoint == "/api/matches" and self.match_poller is not None:
+            return self.match_poller.interval
+        return self.cache_ttl.get(endpoint, 60)
+
+    async def _api_request(
+        self, endpoint: str, params: Optional[Dict] = None, use_cache: bool = True
+    ) -> Dict[str, Any]:
+        """通过 API Server 获取数据 (带缓存), 每次调用记录一个追踪 span"""
+        with tracer.span("api_request", endpoint=endpoint) as span:
+            use_cache = use_cache and self.enable_caching
+            key = self._cache_key(endpoint, params)
+            if span is not None:
+                span.set("key", key)
+            not_found_key = self._not_found_key(endpoint, params) if use_cache and self.not_found_ttl > 0 else None
+            if not_found_key is not None:
+                missing = self.not_found_cache.get(not_found_key)
+                if missing is not None:
+                    metrics.record_not_found(cached=True)
+                    tracer.annotate(cache="not_found")
+                    return missing
+            if use_cache:
+                cached = self.cache.get(key)
+                metrics.record_cache(cached is not None)
+                if cached is not None:
+                    tracer.annotate(cache="hit")
+                    return cached
+
+            # 发起请求的协程被取消或出错时结果为 None, 由等待者中最先恢复的一个重新发起请求
+            inflight = self._inflight.get(key)
+            while inflight is not None:
+                # 相同请求可能正由后台任务排队获取, 按当前请求的优先级提升
+                self.scheduler.promote(key, current_priority())
+                tracer.annotate(cache="inflight")
+                try:
+                    data = await asyncio.wait_for(asyncio.shield(inflight), self._budget_left())
+                except asyncio.TimeoutError:
+                    data = self._budget_exhausted(endpoint)
+                if data is not None:
+                    return self._stale_fallback(key, data) if use_cache else data
+                inflight = self._inflight.get(key)
+
+            tracer.annotate(cache="miss" if use_cache else "bypass")
+            future = asyncio.get_running_loop().create_future()
+            self._inflight[key] = future
+            try:
+                if use_cache and self.shared_cache is not None:
+                    data = await self._shared_request(key, endpoint, params)
+                else:
+                    data = await self._fetch(endpoint, params)
+                    if data.get("success") and use_cache:
+                        self.cache.set(key, data, self._ttl(endpoint))
+                if not_found_key is not None and self._is_not_found(data):
+                    self.not_found_cache.set(not_found_key, data, self.not_found_ttl)
+                    metrics.record_not_found(cached=False)
+                future.set_result(data)
+                return self._stale_fallback(key, data) if use_cache else data
+            finally:
+                # 被取消或出错时没有结果, 交给等待者中的下一个重新请求
+                if not future.done():
+                    future.set_result(None)
+                self._inflight.pop(key, None)
+
+    @staticmethod
+    def _budget_left() -> Optional[float]:
+        """当前命令剩余的延迟预算 (不小于 0), 没有预算时返回 None"""
+        budget = remaining_budget()
+        return None if budget is None else max(budget, 0)
+
+    def _budget_exhausted(self, endpoint: str) -> Dict[str, Any]:
+        self.logger.warning(f"API请求超出延迟预算: {endpoint}")
+        metrics.record_degraded("budget_exhausted")
+        tracer.annotate(budget_exhausted=True)
+        return {"success": False, "message": "请求超时, 请稍后再试", "data": []}
+
+    def _stale_fallback(self, key: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        """请求失败 (超出延迟预算或重试后仍失败) 时改用过期的缓存数据, 标记 stale 和数据的缓存时长"""
+        if data.get("success") or self._is_not_found(data):
+            return data
+        stale = self.cache.get_stale(key)
+        if stale is None:
+            return data
+        value, age = stale
+        self.logger.warning(f"API请求失败, 使用 {age:.0f} 秒前的缓存数据: {key}")
+        metrics.record_degraded("stale_served")
+        tracer.annotate(stale=True, stale_age=round(age))
+        return {**value, "stale": True, "stale_age": round(age)}
+
+    async def _shared_request(
+        self, key: str, endpoint: str, params: Optional[Dict] = None
+    ) -> Dict[str, Any]:
+        """通过跨进程共享缓存获取数据
+
+        共享缓存中有未过期的数据时直接使用; 否则取得该键的租约后由本进程请求并写入共享缓存。
+        租约被其他进程持有时返回旧数据, 没有旧数据时等待其刷新完成 (最多租约时长)。
+        共享缓存不可用时退化为直接请求。
+        """
+        shared = self.shared_cache
+        # 不同进程可能使用不同的后端, 共享缓存的键包含后端地址
+        shared_key = f"{self.api_url}{key}"
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + shared.lease_ttl
+        waited = False
+        while True:
+            try:
+                entry = await asyncio.to_thread(shared.get, shared_key)
+                if entry is not None and entry.ttl > 0:
+                    metrics.record_shared("wait_hits" if waited else "hits")
+                    tracer.annotate(shared_cache="wait_hit" if waited else "hit")
+                    self.cache.set(key, entry.value, entry.ttl)
+                    # 其他进程获取的数据, 本进程的索引等也需要更新 (同一份数据只通知一次)
+                    if self._shared_seen.get(key) != entry.stored:
+                        self._shared_seen[key] = entry.stored
+                        self._notify_refresh(endpoint, entry.value)
+                    return entry.value
+                acquired = await asyncio.to_thread(shared.acquire, shared_key)
+            except sqlite3.Error as e:
+                self.logger.warning(f"共享缓存不可用, 直接请求 {endpoint}: {e}")
+                break
+
+            if acquired:
+                metrics.record_shared("refreshes")
+                tracer.annotate(shared_cache="refresh")
+                try:
+                    data = await self._fetch(endpoint, params)
+                except asyncio.CancelledError:
+                    # 请求被取消时立即释放租约, 其他进程不必等到租约过期
+                    try:
+                        shared.release(shared_key)
+                    except sqlite3.Error:
+                        pass
+                    raise
+                # 刷新监听器已执行, 自适应间隔已按新数据更新
+                ttl = self._ttl(endpoint)
+                try:
+                    if data.get("success"):
+                        self._shared_seen[key] = await asyncio.to_thread(shared.set, shared_key, data, ttl)
+                    else:
+                        await asyncio.to_thread(shared.release, shared_key)
+                except sqlite3.Error as e:
+                    self.logger.warning(f"写入共享缓存失败 {endpoint}: {e}")
+                if data.get("success"):
+                    self.cache.set(key, data, ttl)
+                return data
+
+            # 其他进程正在刷新: 有旧数据时先使用旧数据 (不写入本地缓存, 下次请求重新检查)
+            if entry is not None:
+                metrics.record_shared("stale")
+                tracer.annotate(shared_cache="stale")
+                return entry.value
+            if loop.time() >= deadline:
+                self.logger.warning(f"等待其他进程刷新超时, 直接请求 {endpoint}")
+                break
+            waited = True
+            await asyncio.sleep(self.SHARED_WAIT_INTERVAL)
+
+        data = await self._fetch(endpoint, params)
+        if data.get("success"):
+            self.cache.set(key, data, self._ttl(endpoint))
+        return data
+
+    async def _fetch(self, endpoint: str, params: Optional[Dict] = None) -> Dict[str, Any]:
+        """请求 API Server (排队、请求和重试都在当前命令的延迟预算内)"""
+        self._active_requests += 1
         try:
-            url = f"{self.api_url}{endpoint}"
-            self.logger.info(f"API请求: {url}")
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, params=params, timeout=aiohttp.ClientTimeout(total=30)) as resp:
+            budget = self._budget_left()
+            if budget is None:
+                return await self._fetch_with_retry(endpoint, params)
+            try:
+                return await asyncio.wait_for(self._fetch_with_retry(endpoint, params), budget)
+            except asyncio.TimeoutError:
+                return self._budget_exhausted(endpoint)
+        finally:
+            self._active_requests -= 1
+
+    async def _fetch_with_retry(self, endpoint: str, params: Optional[Dict] = None) -> Dict[str, Any]:
+        """经调度器排队后请求 (优先级取自当前上下文), 暂时性的失败按抖动的指数退避重试
+
+        每次重试重新排队, 等待期间不占用并发槽位。
+        """
+        priority = current_priority()
+        tag = self._cache_key(endpoint, params)
+        for attempt in range(self.RETRY_ATTEMPTS):
+            queued = time.monotonic()
+            async with self.scheduler.slot(priority, tag=tag):
+                tracer.annotate(priority=priority.name.lower(), queue_ms=round((time.monotonic() - queued) * 1000, 1))
+                data = await self._send(endpoint, params, budget=self._budget_left())
+            if not data.pop("retryable", False) or attempt == self.RETRY_ATTEMPTS - 1:
+                break
+            delay = random.uniform(0, self.RETRY_BACKOFF * 2 ** attempt)
+            budget = self._budget_left()
+            if budget is not None and budget - delay < self.MIN_ATTEMPT_TIME:
+                metrics.record_degraded("budget_exhausted")
+                break
+            self.logger.info(f"API请求重试 {endpoint} ({attempt + 1}/{self.RETRY_ATTEMPTS - 1}), {delay:.2f} 秒后")
+            metrics.record_degraded("retries")
+            tracer.annotate(retries=attempt + 1)
+            await asyncio.sleep(delay)
+        data.pop("retryable", None)
+        return data
+
+    def _timeout(self, endpoint: str, budget: Optional[float] = None) -> aiohttp.ClientTimeout:
+        """按接口的连接/读取超时, 总时长不超过剩余的延迟预算"""
+        connect, read = self.ENDPOINT_TIMEOUTS.get(endpoint, self.DEFAULT_TIMEOUT)
+        total = connect + read if budget is None else min(connect + read, budget)
+        return aiohttp.ClientTimeout(total=total, sock_connect=min(connect, total), sock_read=min(read, total))
+
+    async def fetch_uncached(self, endpoint: str, params: Optional[Dict] = None) -> Dict[str, Any]:
+        """直接请求后端一次: 不经过缓存、请求合并和调度器, 不通知刷新监听器, 不计入上游指标 (用于压测)"""
+        return await self._send(endpoint, params, observe=False)
+
+    async def _send(
+        self,
+        endpoint: str,
+        params: Optional[Dict] = None,
+        budget: Optional[float] = None,
+        observe: bool = True,
+    ) -> Dict[str, Any]:
+        """发送请求 (已占用并发槽位), 可重试的失败在结果中标记 retryable
+
+        observe 为 False 时不通知刷新监听器, 也不计入上游请求指标。
+        """
+        with tracer.span("http GET", kind="client", endpoint=endpoint) as span:
+            if observe:
+                metrics.upstream_inflight += 1
+            start = time.monotonic()
+            ok = False
+            try:
+                url = f"{self.api_url}{endpoint}"
+                self.logger.info(f"API请求: {url}")
+                fields = self.ENDPOINT_FIELDS.get(endpoint)
+                if fields:
+                    params = {**(params or {}), "fields": fields}
+                # 安装了 msgpack 时优先使用 MessagePack (服务端不支持时仍返回 JSON)
+                headers = {"Accept": "application/msgpack, application/json;q=0.9"} if msgpack else {}
+                # 传递追踪上下文, API Server 的 span 记录在同一条追踪下
+                traceparent = tracer.traceparent()
+                if traceparent:
+                    headers["traceparent"] = traceparent
+                session = self._get_session()
+                async with session.get(
+                    url, params=params, headers=headers, timeout=self._timeout(endpoint, budget)
+                ) as resp:
+                    if span is not None:
+                        span.set("http.status_code", resp.status)
+                        # API Server 各抓取/解析步骤的耗时 (未采样时服务端不导出, 记录在客户端 span 上)
+                        for step, ms in parse_server_timing(resp.headers.get("Server-Timing", "")).items():
+                            span.set(f"server.{step}_ms", ms)
                     if resp.status == 200:
-                        data = await resp.json()
+                        if msgpack and resp.content_type in self.MSGPACK_TYPES:
+                            data = msgpack.unpackb(await resp.read(), raw=False)
+                        else:
+                            data = await resp.json()
                         self.logger.info(f"API请求成功: {endpoint}")
+                        if observe:
+                            self._notify_refresh(endpoint, data)
+                        ok = True
                         return data
                     else:
                         self.logger.error(f"API请求失败 {endpoint}: HTTP {resp.status}")
+                        if span is not None:
+                            span.error = f"HTTP {resp.status}"
                         return {
                             "success": False,
                             "message": f"API请求失败: HTTP {resp.status}",
-                            "data": []
+                            "data": [],
+                            "retryable": resp.status in self.RETRY_STATUS,
                         }
-        except Exception as e:
-            self.logger.error(f"API请求失败 {endpoint}: {e}")
-            return {
-                "success": False,
-                "message": f"API请求失败: {str(e)}",
-                "data": []
-            }
+            except asyncio.TimeoutError:
+                self.logger.error(f"API请求超时 {endpoint}")
+                if span is not None:
+                    span.error = "timeout"
+                return {"success": False, "message": "API请求超时", "data": [], "retryable": True}
+            except Exception as e:
+                self.logger.error(f"API请求失败 {endpoint}: {e}")
+                if span is not None:
+                    span.error = f"{type(e).__name__}: {e}"
+                return {
+                    "success": False,
+                    "message": f"API请求失败: {str(e)}",
+                    "data": [],
+                    "retryable": isinstance(e, aiohttp.ClientConnectionError),
+                }
+            finally:
+                if observe:
+                    metrics.upstream_inflight -= 1
+                    metrics.record_upstream(time.monotonic() - start, ok)
 
     async def get_cs2_matches(self) -> Dict[str, Any]:
         """获取CS2比赛数据"""
@@ -74,9 +511,110 @@ class HLTVClient:
         """获取选手信息"""
         return await self._api_request("/api/player", {"name": player_name})
 
+    async def get_players_info(self, player_names: List[str], concurrency: int = 3) -> List[Dict[str, Any]]:
+        """并发获取多名选手信息 (并发数受限, 结果顺序与输入一致)"""
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+
+        async def fetch(name: str) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.get_player_info(name)
+
+        return list(await asyncio.gather(*(fetch(name) for name in player_names)))
+
+    async def _find_ranked_team(self, team_name: str) -> Optional[Dict[str, Any]]:
+        """在 (缓存的) 排名数据中查找战队"""
+        if not self.enable_caching:
+            return None
+        rankings = await self.get_team_rankings(limit=self.ranked_team_limit)
+        if not rankings.get("success"):
+            return None
+        key = normalize_name(team_name)
+        for team in rankings.get("data", []):
+            title = normalize_name(team.get("title"))
+            if key and key in (title, f"team{title}"):
+                return team
+        return None
+
+    def spawn(self, coro, priority: Priority = Priority.PREFETCH) -> asyncio.Task:
+        """在后台运行协程 (其中的上游请求默认按预取优先级排队), 返回任务"""
+
+        async def run():
+            with request_priority(priority):
+                return await coro
+
+        task = asyncio.create_task(run())
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+        return task
+
     async def get_team_info(self, team_name: str) -> Dict[str, Any]:
-        """获取战队详细信息"""
-        return await self._api_request("/api/team", {"name": team_name})
+        """获取战队详细信息 (附带本地索引中的近期比赛和结果)
+
+        排名内的战队直接使用排名数据中的排名、积分和阵容;
+        教练等排名数据没有的字段来自战队页面, 在后台获取并缓存, 之后的查询会带上。
+        """
+        ranked = await self._find_ranked_team(team_name)
+        if ranked is not None and ranked.get("members"):
+            name = ranked.get("title", team_name)
+            data: Dict[str, Any] = {
+                "name": name,
+                "rank": f"#{ranked.get('rank')}",
+                "points": ranked.get("points"),
+                "members": ranked.get("members"),
+                "url": f"{self.BASE_URL}/search?query={quote(name)}",
+            }
+            details = self.cache.get(self._cache_key("/api/team", {"name": name}), count=False)
+            if details is None:
+                if normalize_name(name) not in self._team_detail_failed:
+                    self.spawn(self._fetch_team_details(name))
+            elif details.get("success"):
+                extra = details.get("data") or {}
+                data["coach"] = extra.get("coach")
+                data["url"] = extra.get("url") or data["url"]
+            result: Dict[str, Any] = {"success": True, "data": data, "source": "rankings"}
+        else:
+            result = await self._api_request(
+                "/api/team", {"name": ranked.get("title") if ranked else team_name}
+            )
+        if not result.get("success") or not isinstance(result.get("data"), dict):
+            return result
+        data = result["data"]
+        upcoming, recent = self.indexes.team_schedule(data.get("name") or team_name)
+        return {
+            **result,
+            "data": {**data, "upcoming_matches": upcoming, "recent_results": recent},
+        }
+
+    async def _fetch_team_details(self, name: str) -> None:
+        """后台获取战队页面 (结果进入缓存); 失败时记录下来, 一段时间内不再重试"""
+        result = await self._api_request("/api/team", {"name": name})
+        if not result.get("success"):
+            self.logger.warning(f"获取战队页面失败 {name}: {result.get('message') or result.get('error')}")
+            self._team_detail_failed.set(normalize_name(name), True, self.TEAM_DETAIL_RETRY_AFTER)
+
+    async def get_match_detail(self, match_id: int) -> Dict[str, Any]:
+        """获取比赛详情 (各地图比分和选手数据)
+
+        已结束的比赛不会再变化, 首次获取后保存到 match_archive, 之后直接读取存档;
+        进行中和未开始的比赛、缺少地图数据 (partial) 的结果按 /api/match 的缓存时间缓存。
+        """
+        if self.match_archive is not None:
+            archived = await asyncio.to_thread(self.match_archive.get, match_id)
+            if archived is not None:
+                metrics.record_cache(True)
+                return {"success": True, "data": archived}
+        result = await self._api_request("/api/match", {"id": match_id})
+        data = result.get("data")
+        if (
+            self.match_archive is not None
+            and result.get("success")
+            and not result.get("stale")
+            and isinstance(data, dict)
+            and data.get("status") == "finished"
+            and not data.get("partial")
+        ):
+            await asyncio.to_thread(self.match_archive.put, match_id, data)
+        return result
 
     async def get_events(self) -> Dict[str, Any]:
         """获取重要赛事 (S级 Major + A级 国际LAN)"""
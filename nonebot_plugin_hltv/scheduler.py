@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import time
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from enum import IntEnum
+from typing import AsyncIterator, Dict, Iterator, List, Optional
+
+from .metrics import metrics
+
+
+class Priority(IntEnum):
+    """上游请求优先级 (数值越小越优先)"""
+
+    INTERACTIVE = 0  # 用户命令
+    PREFETCH = 1  # 预取、后台补全、订阅轮询
+    BULK = 2  # 批量回填
+
+
+# 当前上下文中发起的上游请求的优先级, 默认按用户命令处理
+_current_priority: ContextVar[Priority] = ContextVar("hltv_request_priority", default=Priority.INTERACTIVE)
+
+
+def current_priority() -> Priority:
+    return _current_priority.get()
+
+
+@contextmanager
+def request_priority(priority: Priority) -> Iterator[None]:
+    """在 with 块内 (包括其中创建的任务) 以指定优先级发起上游请求"""
+    token = _current_priority.set(priority)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+class _Waiter:
+    __slots__ = ("priority", "tag", "future", "enqueued", "entry", "dequeued")
+
+    def __init__(self, priority: Priority, tag: Optional[str], future: asyncio.Future) -> None:
+        self.priority = priority
+        self.tag = tag
+        self.future = future
+        self.enqueued = time.monotonic()
+        # 堆中的条目 [优先级, 序号, waiter], 提升优先级时旧条目的 waiter 置为 None
+        self.entry: List = []
+        # 已移出队列 (已计入 queue_depth 的减少)
+        self.dequeued = False
+
+
+class RequestScheduler:
+    """上游请求调度器: 限制全局并发数, 按优先级排队
+
+    后台请求需要留出空闲槽位才能开始 (预取留 1 个, 批量留 2 个),
+    因此用户命令最多等待其他用户命令, 不会排在预取或批量任务后面;
+    已开始的请求不会被中断。
+    """
+
+    # 各优先级开始请求时需要保留的空闲槽位数
+    RESERVED = {Priority.INTERACTIVE: 0, Priority.PREFETCH: 1, Priority.BULK: 2}
+
+    def __init__(self, max_concurrency: int = 6) -> None:
+        self.max_concurrency = max(1, max_concurrency)
+        self.active = 0
+        self._heap: List[List] = []
+        self._seq = itertools.count()
+        # tag -> 排队中的 waiter (用于提升优先级)
+        self._tagged: Dict[str, _Waiter] = {}
+
+    def _admissible(self, priority: Priority) -> bool:
+        reserved = min(self.RESERVED[priority], self.max_concurrency - 1)
+        return self.active + reserved < self.max_concurrency
+
+    def _top(self) -> Optional[_Waiter]:
+        """队首的有效 waiter (清理已取消和已提升的条目)"""
+        while self._heap:
+            waiter = self._heap[0][2]
+            if waiter is not None and not waiter.future.done():
+                return waiter
+            heapq.heappop(self._heap)
+            if waiter is not None:
+                self._dequeued(waiter)
+        return None
+
+    def _enqueue(self, waiter: _Waiter) -> None:
+        waiter.entry = [int(waiter.priority), next(self._seq), waiter]
+        heapq.heappush(self._heap, waiter.entry)
+
+    def _dequeued(self, waiter: _Waiter) -> None:
+        """移出队列时更新统计; 取消的 waiter 可能先被 _top 清理, 重复调用时忽略"""
+        if waiter.dequeued:
+            return
+        waiter.dequeued = True
+        metrics.queue_depth[waiter.priority.name.lower()] -= 1
+        if waiter.tag is not None and self._tagged.get(waiter.tag) is waiter:
+            del self._tagged[waiter.tag]
+
+    def _start(self, priority: Priority, waited: float) -> None:
+        self.active += 1
+        name = priority.name.lower()
+        metrics.queue_running[name] += 1
+        metrics.record_queue(name, waited)
+
+    def _dispatch(self) -> None:
+        """按优先级启动可以开始的 waiter"""
+        while True:
+            waiter = self._top()
+            if waiter is None or not self._admissible(waiter.priority):
+                return
+            heapq.heappop(self._heap)
+            self._dequeued(waiter)
+            self._start(waiter.priority, time.monotonic() - waiter.enqueued)
+            waiter.future.set_result(waiter.priority)
+
+    def promote(self, tag: str, priority: Priority) -> None:
+        """提升排队中请求的优先级 (例如用户命令等待的数据正由后台请求获取)"""
+        waiter = self._tagged.get(tag)
+        if waiter is None or waiter.future.done() or priority >= waiter.priority:
+            return
+        waiter.entry[2] = None
+        metrics.queue_depth[waiter.priority.name.lower()] -= 1
+        metrics.queue_depth[priority.name.lower()] += 1
+        waiter.priority = priority
+        self._enqueue(waiter)
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(self, priority: Priority, tag: Optional[str] = None) -> AsyncIterator[None]:
+        """占用一个并发槽位, 需要时按优先级排队"""
+        top = self._top()
+        if self._admissible(priority) and (top is None or top.priority > priority):
+            self._start(priority, 0.0)
+        else:
+            waiter = _Waiter(priority, tag, asyncio.get_running_loop().create_future())
+            metrics.queue_depth[priority.name.lower()] += 1
+            if tag is not None:
+                self._tagged[tag] = waiter
+            self._enqueue(waiter)
+            try:
+                # 优先级可能在排队期间被提升, 以实际开始时的优先级统计
+                priority = await waiter.future
+            except asyncio.CancelledError:
+                if waiter.future.cancelled():
+                    # 排队中被取消, 从队列中移除
+                    waiter.entry[2] = None
+                    self._dequeued(waiter)
+                else:
+                    # 已分配槽位但任务同时被取消
+                    self._release(waiter.future.result())
+                raise
+        try:
+            yield
+        finally:
+            self._release(priority)
+
+    def _release(self, priority: Priority) -> None:
+        self.active -= 1
+        metrics.queue_running[priority.name.lower()] -= 1
+        self._dispatch()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, NamedTuple, Optional
+
+
+class SharedEntry(NamedTuple):
+    """共享缓存中的一条数据"""
+
+    value: Any
+    # 过期时间和写入时间 (墙上时间)
+    expires: float
+    stored: float
+
+    @property
+    def ttl(self) -> float:
+        """剩余有效秒数 (<= 0 表示已过期)"""
+        return self.expires - time.time()
+
+
+class SharedCache:
+    """跨进程共享缓存 (SQLite)
+
+    同一台机器上的多个机器人进程使用同一个数据库文件, 一份数据只需要一个进程从上游获取。
+    刷新某个键前需要先取得该键的租约 (lease): 同一时间只有一个进程持有,
+    其他进程读取旧数据或等待刷新完成; 持有者崩溃时租约到期后自动失效。
+
+    所有方法都是同步的 (单次操作通常在 1 ms 以内), 在事件循环中通过 ``asyncio.to_thread`` 调用。
+    时间使用墙上时间 (time.time), 以便在进程间比较。
+    """
+
+    # 过期数据保留时间 (秒), 用于等待刷新时读取旧数据
+    STALE_KEEP = 86400
+
+    def __init__(self, path: str, lease_ttl: float = 30) -> None:
+        self.path = Path(path)
+        self.lease_ttl = lease_ttl
+        # 本进程的租约持有者标识
+        self.owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        # 连接在线程池中使用, 由 _lock 保证同一时间只有一个线程访问
+        self._conn = sqlite3.connect(
+            str(self.path), timeout=5, isolation_level=None, check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires REAL NOT NULL, stored REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS leases ("
+            "key TEXT PRIMARY KEY, owner TEXT NOT NULL, expires REAL NOT NULL)"
+        )
+        self.prune()
+
+    def get(self, key: str) -> Optional[SharedEntry]:
+        """读取数据 (包括已过期的), 不存在时返回 None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires, stored FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        return SharedEntry(json.loads(row[0]), row[1], row[2])
+
+    def set(self, key: str, value: Any, ttl: float) -> float:
+        """写入数据并释放本进程持有的该键租约, 返回写入时间"""
+        now = time.time()
+        payload = json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO entries (key, value, expires, stored) VALUES (?, ?, ?, ?)",
+                    (key, payload, now + ttl, now),
+                )
+                self._conn.execute(
+                    "DELETE FROM leases WHERE key = ? AND owner = ?", (key, self.owner)
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return now
+
+    def acquire(self, key: str) -> bool:
+        """尝试取得键的刷新租约, 已被其他进程持有且未到期时返回 False"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT owner, expires FROM leases WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None and row[0] != self.owner and row[1] > now:
+                    self._conn.execute("COMMIT")
+                    return False
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO leases (key, owner, expires) VALUES (?, ?, ?)",
+                    (key, self.owner, now + self.lease_ttl),
+                )
+                self._conn.execute("COMMIT")
+                return True
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def release(self, key: str) -> None:
+        """释放本进程持有的租约 (刷新失败时调用, 其他进程可以立即重试)"""
+        with self._lock:
+            self._conn.execute("DELETE FROM leases WHERE key = ? AND owner = ?", (key, self.owner))
+
+    def prune(self) -> int:
+        """删除过期很久的数据和失效的租约, 返回删除的数据条数"""
+        now = time.time()
+        with self._lock:
+            removed = self._conn.execute(
+                "DELETE FROM entries WHERE expires < ?", (now - self.STALE_KEEP,)
+            ).rowcount
+            self._conn.execute("DELETE FROM leases WHERE expires < ?", (now,))
+        return removed
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
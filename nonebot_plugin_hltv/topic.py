@@ -0,0 +1,435 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 常用别名 (规范名 -> 别名列表)，只有规范名出现在词典中时别名才生效
+TEAM_ALIASES: Dict[str, List[str]] = {
+    "Natus Vincere": ["NAVI", "Na'Vi", "天生赢家"],
+    "Vitality": ["小蜜蜂"],
+    "MOUZ": ["mousesports"],
+    "Cloud9": ["C9"],
+    "TYLOO": ["天禄"],
+    "FaZe": ["FaZe Clan"],
+    "G2": ["G2 Esports"],
+    "Liquid": ["Team Liquid"],
+    "The MongolZ": ["MongolZ"],
+}
+
+PLAYER_ALIASES: Dict[str, List[str]] = {
+    "ZywOo": ["载物"],
+    "s1mple": ["森破"],
+}
+
+# 本身没有指代意义的词，不作为话题词
+_GENERIC_TERMS = frozenset({
+    "the", "team", "major", "open", "cup", "unknown", "tbd", "online", "league", "series",
+})
+
+# 日常聊天中的普通词 (不少战队名、选手 ID 和别名就是普通词)，只有消息中有 CS 上下文时才算命中
+_COMMON_WORDS = frozenset("""
+    a about after again ago all also always and any apex area art attacker aurora back bad band
+    bank bear beast best better big bit black blast blaze blitz blue boss bot boy brave bright
+    build call can care carlo case cat chance change chaos chopper city clear close cloud cold
+    come complexity cool core could crazy crew crown cyber dark day deal dear device did
+    dignitas dog done down dragon dream drop each eagle eagles earth easy electronic else end
+    energy epic eternal even ever evil exit fair fake falcon falcons fall fallen fame far fast
+    fear few fine fire first flame flash fly force forest fox free fresh frozen full fun future
+    game gamer gas ghost giant give glory go gold good grace great green grim ground group guard
+    hard hawk heart heat help here hero heroic high hint hit hobbit hold home honey hope hot
+    hunter ice idea imperial iron just keep kid kind king kings knight lake last late legacy
+    legend legends let level life light like lion lions liquid little live lol long look lord
+    lost lot love low luck lucky made magic main make man many mercury mind monster monte moon
+    more most much must my name need never new next nice night ninja ninjas no nobody none not
+    nothing nova now noway off ok okay old omega one only order out over pain panda party
+    passion peace perfecto phoenix pirate play please point power pro pure queen quick rain rare
+    raven real rebel rebels red rest rich right rise river rock royal run saw say see shadow
+    shark sharks she side silver sinners sky slow smart smooth snow some somebody sorry soul
+    space speed spirit sprout star starry stars still stop storm story strong such summer sun
+    super sure take talk techno than thanks that them then there they thing think this thunder
+    tiger time titan today too top true try ultimate under unity up very victory viper vision
+    vitality wait want war water way well were what when where which white who why wild wildcard
+    will win wind wolf wolves world would yeah year yes yet you young your zero
+    小蜜蜂 天生赢家 载物
+""".split())
+
+# CS 上下文: 消息中出现这些词时，普通词命中才算话题
+_CS_CONTEXT = re.compile(
+    r"(?<![0-9a-z])(?:cs2?|csgo|cs:go|hltv|iem|esl|pgl)(?![0-9a-z])"
+    r"|反恐精英|比赛|战队|选手|赛事|决赛|世界排名"
+)
+
+_ASCII_WORD = re.compile(r"[0-9a-z]")
+_SHORT_WORD = re.compile(r"[a-z]{1,3}")
+
+
+def normalize_term(text: str) -> str:
+    """话题词归一化: 小写并压缩空白"""
+    return " ".join(text.lower().split())
+
+
+def _is_word_char(ch: str) -> bool:
+    return bool(ch) and ch.isascii() and bool(_ASCII_WORD.match(ch))
+
+
+def _is_ambiguous(key: str) -> bool:
+    """单独出现时不能确定是在聊 CS 的话题词: 普通词和不超过 3 个字母的单词 (如 BIG、jL)"""
+    return key in _COMMON_WORDS or bool(_SHORT_WORD.fullmatch(key))
+
+
+class AhoCorasick:
+    """Aho-Corasick 多模式匹配自动机
+
+    匹配耗时只与文本长度和命中数量有关，与词典大小无关。
+    支持增量添加模式串，删除的模式串只做标记，在 ``build`` 时统一修正失败指针。
+    ``build_steps`` 可分段计算失败指针，期间自动机仍可匹配 (只会漏掉尚未生效的新词)。
+    """
+
+    def __init__(self) -> None:
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[Tuple[int, ...]] = [()]
+        self._terminal: List[int] = [-1]
+        self._patterns: List[str] = []
+        self._active: List[bool] = []
+        self._active_count = 0
+        self._dirty = False
+
+    def __len__(self) -> int:
+        return self._active_count
+
+    @property
+    def dirty(self) -> bool:
+        """是否有尚未生效的增删"""
+        return self._dirty
+
+    @property
+    def dead_count(self) -> int:
+        return len(self._patterns) - len(self)
+
+    def add(self, pattern: str) -> int:
+        """插入模式串，返回模式串编号；调用 ``build`` 后生效"""
+        state = 0
+        for ch in pattern:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(())
+                self._terminal.append(-1)
+                self._goto[state][ch] = nxt
+            state = nxt
+        if self._terminal[state] >= 0:
+            pid = self._terminal[state]
+            if not self._active[pid]:
+                self._active[pid] = True
+                self._active_count += 1
+                self._dirty = True
+            return pid
+        pid = len(self._patterns)
+        self._patterns.append(pattern)
+        self._active.append(True)
+        self._active_count += 1
+        self._terminal[state] = pid
+        self._dirty = True
+        return pid
+
+    def discard(self, pid: int) -> None:
+        """停用模式串 (不缩小 trie)"""
+        if self._active[pid]:
+            self._active[pid] = False
+            self._active_count -= 1
+            self._dirty = True
+
+    def build(self) -> None:
+        """BFS 计算失败指针并合并输出集合"""
+        for _ in self.build_steps():
+            pass
+
+    def build_steps(self, chunk: int = 0) -> Iterator[None]:
+        """分段执行 ``build``: 每处理 chunk 个状态产出一次 (chunk 为 0 时不分段)
+
+        两次产出之间可以继续 ``add``/``discard``；失败指针只会指向更短但仍然有效的后缀，
+        不会产生误报。期间新增的模式串会重新标记 dirty，需要再构建一次。
+        """
+        if not self._dirty:
+            return
+        self._dirty = False
+        goto, fail, out = self._goto, self._fail, self._out
+        queue: List[int] = []
+        for nxt in goto[0].values():
+            fail[nxt] = 0
+            queue.append(nxt)
+        out[0] = ()
+        head = 0
+        while head < len(queue):
+            state = queue[head]
+            head += 1
+            pid = self._terminal[state]
+            own = (pid,) if pid >= 0 and self._active[pid] else ()
+            out[state] = own + out[fail[state]]
+            for ch, nxt in goto[state].items():
+                f = fail[state]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                fail[nxt] = goto[f].get(ch, 0)
+                queue.append(nxt)
+            if chunk and head % chunk == 0:
+                yield
+
+    def iter(self, text: str) -> Iterator[Tuple[int, int]]:
+        """遍历命中结果，产出 (结束下标, 模式串编号)"""
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                for pid in out[state]:
+                    yield i, pid
+
+    def pattern(self, pid: int) -> str:
+        return self._patterns[pid]
+
+
+@dataclass
+class TopicTerm:
+    """话题词条"""
+
+    kind: str  # team / player / event
+    name: str  # 规范名称
+    info: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class TopicHit:
+    term: TopicTerm
+    matched: str
+    start: int
+
+
+class TopicDetector:
+    """CS2 话题检测器
+
+    词典由战队排名、比赛、赛事数据和内置别名组成，每类数据源独立维护。
+    数据刷新时只对新增/删除的词条做增量更新，删除过多时整体重建自动机。
+    在事件循环中刷新时，失败指针在后台任务中分段计算，不阻塞消息处理。
+    """
+
+    # 同一个词出现在多个数据源时，按此顺序选用信息最全的词条
+    SOURCE_PRIORITY = ("rankings", "players", "events", "matches")
+    # 后台构建每处理多少个状态让出一次事件循环
+    BUILD_CHUNK = 2000
+
+    def __init__(self) -> None:
+        self._automaton = AhoCorasick()
+        self._sources: Dict[str, Dict[str, TopicTerm]] = {}
+        self._pid_by_key: Dict[str, int] = {}
+        self._rebuild_needed = False
+        self._build_task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._automaton)
+
+    def update_source(self, source: str, terms: Dict[str, TopicTerm]) -> Tuple[int, int]:
+        """用新的词条集合替换某个数据源，返回 (新增数, 删除数)"""
+        terms = {normalize_term(k): v for k, v in terms.items() if self._acceptable(k, v)}
+        old = self._sources.get(source, {})
+        self._sources[source] = terms
+        added = removed = 0
+        for key in old.keys() - terms.keys():
+            if not self._owned(key):
+                self._automaton.discard(self._pid_by_key.pop(key))
+                removed += 1
+        for key in terms.keys() - old.keys():
+            if key not in self._pid_by_key:
+                self._pid_by_key[key] = self._automaton.add(key)
+                added += 1
+        if self._automaton.dead_count > max(len(self._automaton), 256):
+            self._rebuild_needed = True
+        self._schedule_build()
+        return added, removed
+
+    def _owned(self, key: str) -> bool:
+        return any(key in terms for terms in self._sources.values())
+
+    def _schedule_build(self) -> None:
+        """有运行中的事件循环时在后台分段构建，否则直接构建"""
+        if not self._rebuild_needed and not self._automaton.dirty:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            if self._rebuild_needed:
+                self._rebuild()
+            self._automaton.build()
+            return
+        if self._build_task is None or self._build_task.done():
+            self._build_task = loop.create_task(self._build_in_background())
+
+    def _rebuild(self) -> None:
+        automaton = AhoCorasick()
+        pid_by_key = {key: automaton.add(key) for key in self._pid_by_key}
+        automaton.build()
+        self._automaton, self._pid_by_key = automaton, pid_by_key
+        self._rebuild_needed = False
+
+    async def _build_in_background(self) -> None:
+        """分段构建失败指针; 构建期间的刷新由下一轮循环处理"""
+        try:
+            while True:
+                if self._rebuild_needed:
+                    await self._rebuild_in_chunks()
+                elif self._automaton.dirty:
+                    for _ in self._automaton.build_steps(self.BUILD_CHUNK):
+                        await asyncio.sleep(0)
+                else:
+                    break
+        except Exception as e:
+            logger.error(f"构建话题词典失败: {e}")
+
+    async def _rebuild_in_chunks(self) -> None:
+        """在新自动机上重建词典, 构建完成后再替换 (替换前旧自动机继续提供匹配)"""
+        self._rebuild_needed = False
+        automaton = AhoCorasick()
+        pid_by_key: Dict[str, int] = {}
+        for i, key in enumerate(list(self._pid_by_key)):
+            pid_by_key[key] = automaton.add(key)
+            if i % self.BUILD_CHUNK == 0:
+                await asyncio.sleep(0)
+        for _ in automaton.build_steps(self.BUILD_CHUNK):
+            await asyncio.sleep(0)
+        # 合并重建期间的增删 (新增的词条由下一轮循环生效)
+        for key in pid_by_key.keys() - self._pid_by_key.keys():
+            automaton.discard(pid_by_key.pop(key))
+        for key in self._pid_by_key.keys() - pid_by_key.keys():
+            pid_by_key[key] = automaton.add(key)
+        self._automaton, self._pid_by_key = automaton, pid_by_key
+
+    async def wait_built(self) -> None:
+        """等待后台构建完成"""
+        while self._build_task is not None and not self._build_task.done():
+            await asyncio.shield(self._build_task)
+
+    def _resolve(self, key: str) -> Optional[TopicTerm]:
+        for source in self.SOURCE_PRIORITY:
+            term = self._sources.get(source, {}).get(key)
+            if term is not None:
+                return term
+        return None
+
+    @staticmethod
+    def _acceptable(text: str, term: TopicTerm) -> bool:
+        key = normalize_term(text)
+        return len(key) >= 2 and key not in _GENERIC_TERMS
+
+    def detect(self, text: str, limit: int = 3) -> List[TopicHit]:
+        """检测消息中的话题词，优先返回更长的命中
+
+        只命中普通词 (如 "it's a big deal" 中的 BIG、"let it snow" 中的 snow) 时，
+        消息中还需要有 CS 上下文 (其他话题词或 "cs2"、"比赛" 等) 才返回。
+        """
+        lowered = text.lower()
+        best: Dict[str, TopicHit] = {}
+        for end, pid in self._automaton.iter(lowered):
+            key = self._automaton.pattern(pid)
+            start = end - len(key) + 1
+            # ASCII 词要求词边界，避免 "ence" 命中 "experience"
+            if _is_word_char(key[0]) and start > 0 and _is_word_char(lowered[start - 1]):
+                continue
+            if _is_word_char(key[-1]) and end + 1 < len(lowered) and _is_word_char(lowered[end + 1]):
+                continue
+            term = self._resolve(key)
+            if term is None:
+                continue
+            hit = best.get(term.name)
+            if hit is None or len(key) > len(hit.matched):
+                best[term.name] = TopicHit(term=term, matched=key, start=start)
+        if not best:
+            return []
+        if all(_is_ambiguous(hit.matched) for hit in best.values()) and not _CS_CONTEXT.search(lowered):
+            return []
+        hits = sorted(best.values(), key=lambda h: (-len(h.matched), h.start))
+        return hits[:limit]
+
+    # ---- 数据源 ----
+
+    def load_rankings(self, teams: Iterable[Dict[str, Any]]) -> Tuple[int, int]:
+        team_terms: Dict[str, TopicTerm] = {}
+        player_terms: Dict[str, TopicTerm] = {}
+        for team in teams:
+            name = team.get("title")
+            if not name:
+                continue
+            term = TopicTerm("team", name, {"rank": team.get("rank"), "points": team.get("points")})
+            team_terms[name] = term
+            for alias in TEAM_ALIASES.get(name, []):
+                team_terms[alias] = term
+            for member in team.get("members", []) or []:
+                player = TopicTerm("player", member, {"team": name})
+                player_terms[member] = player
+                for alias in PLAYER_ALIASES.get(member, []):
+                    player_terms[alias] = player
+        added, removed = self.update_source("rankings", team_terms)
+        p_added, p_removed = self.update_source("players", player_terms)
+        return added + p_added, removed + p_removed
+
+    def load_matches(self, matches: Iterable[Dict[str, Any]]) -> Tuple[int, int]:
+        terms: Dict[str, TopicTerm] = {}
+        for match in matches:
+            event = match.get("event")
+            if event and event != "Unknown":
+                terms.setdefault(event, TopicTerm("event", event, {}))
+            for side in ("team1", "team2"):
+                team = match.get(side)
+                if team and team != "TBD":
+                    terms.setdefault(team, TopicTerm("team", team, {}))
+        return self.update_source("matches", terms)
+
+    def load_events(self, events: Iterable[Dict[str, Any]]) -> Tuple[int, int]:
+        terms: Dict[str, TopicTerm] = {}
+        for evt in events:
+            name = evt.get("name")
+            if not name or name == "Unknown":
+                continue
+            terms[name] = TopicTerm("event", name, {
+                "tier": evt.get("tier"),
+                "location": evt.get("location"),
+                "start_date": evt.get("start_date"),
+                "end_date": evt.get("end_date"),
+            })
+        return self.update_source("events", terms)
+
+
+def format_topic_hit(hit: TopicHit) -> Optional[str]:
+    """根据命中的词条生成简短提示"""
+    term = hit.term
+    info = term.info
+    if term.kind == "team":
+        if info.get("rank"):
+            return (
+                f"【{term.name}】世界排名 #{info['rank']} ({info.get('points', 'N/A')}分)\n"
+                f"发送 /cs2战队 {term.name} 查看详情"
+            )
+        return f"【{term.name}】发送 /cs2战队 {term.name} 查看战队信息"
+    if term.kind == "player":
+        team = f" ({info['team']})" if info.get("team") else ""
+        return f"【{term.name}{team}】发送 /cs2选手 {term.name} 查看选手数据"
+    if term.kind == "event":
+        if info.get("start_date"):
+            return (
+                f"【{term.name}】[{info.get('tier', '?')}级] {info.get('location') or 'TBD'}\n"
+                f"📅 {info['start_date']} ~ {info.get('end_date') or 'TBD'}"
+            )
+        return f"【{term.name}】发送 /cs2比赛 查看近期赛程"
+    return None
@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+SERVICE_NAME = "nonebot-plugin-hltv"
+
+
+class _Trace:
+    """一条追踪 (一次命令或一次后台请求) 中已结束的 span"""
+
+    __slots__ = ("trace_id", "sampled", "spans", "done", "kept")
+
+    def __init__(self, trace_id: str, sampled: bool) -> None:
+        self.trace_id = trace_id
+        self.sampled = sampled
+        self.spans: List["Span"] = []
+        self.done = False
+        self.kept = False
+
+
+class Span:
+    """一个计时区间 (命令 / 数据请求 / 上游 HTTP 请求等)"""
+
+    __slots__ = ("trace", "span_id", "parent_id", "name", "kind", "start_ns", "duration_ns", "attributes", "error", "_t0")
+
+    def __init__(self, trace: _Trace, parent_id: Optional[str], name: str, kind: str, attributes: Dict[str, Any]) -> None:
+        self.trace = trace
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.attributes = attributes
+        self.error: Optional[str] = None
+        self.start_ns = time.time_ns()
+        self.duration_ns = 0
+        self._t0 = time.perf_counter_ns()
+
+    @property
+    def trace_id(self) -> str:
+        return self.trace.trace_id
+
+    def set(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def to_dict(self) -> Dict[str, Any]:
+        """导出为 JSON Lines 的一行 (与 API Server 导出的格式相同)"""
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "kind": self.kind,
+            "service": SERVICE_NAME,
+            "start": self.start_ns / 1e9,
+            "duration_ms": round(self.duration_ns / 1e6, 3),
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("hltv_current_span", default=None)
+
+
+class JsonlExporter:
+    """写入本地 JSON Lines 文件 (超过 max_bytes 时轮转为 .1)"""
+
+    def __init__(self, path: str, max_bytes: int = 50 * 1024 * 1024) -> None:
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+
+    def _write(self, lines: List[str]) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            if self.path.stat().st_size > self.max_bytes:
+                os.replace(self.path, self.path.with_name(self.path.name + ".1"))
+        except FileNotFoundError:
+            pass
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write("".join(lines))
+
+    async def export(self, spans: List[Span]) -> None:
+        lines = [json.dumps(span.to_dict(), ensure_ascii=False) + "\n" for span in spans]
+        await asyncio.to_thread(self._write, lines)
+
+    async def aclose(self) -> None:
+        pass
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+_OTLP_KINDS = {"internal": 1, "server": 2, "client": 3}
+
+
+def otlp_payload(spans: List[Dict[str, Any]], service: str) -> Dict[str, Any]:
+    """JSON Lines 格式的 span 转为 OTLP/HTTP JSON 请求体"""
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": service}}]},
+            "scopeSpans": [{
+                "scope": {"name": "nonebot_plugin_hltv"},
+                "spans": [
+                    {
+                        "traceId": s["trace_id"],
+                        "spanId": s["span_id"],
+                        "parentSpanId": s["parent_id"] or "",
+                        "name": s["name"],
+                        "kind": _OTLP_KINDS.get(s["kind"], 1),
+                        "startTimeUnixNano": str(int(s["start"] * 1e9)),
+                        "endTimeUnixNano": str(int(s["start"] * 1e9 + s["duration_ms"] * 1e6)),
+                        "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in s["attributes"].items()],
+                        "status": {"code": 2, "message": s["error"]} if s["error"] else {"code": 1},
+                    }
+                    for s in spans
+                ],
+            }],
+        }]
+    }
+
+
+class OtlpExporter:
+    """以 OTLP/HTTP JSON 格式发送到采集器 (如 OpenTelemetry Collector / Jaeger / Tempo)"""
+
+    def __init__(self, endpoint: str) -> None:
+        endpoint = endpoint.rstrip("/")
+        self.url = endpoint if endpoint.endswith("/v1/traces") else f"{endpoint}/v1/traces"
+        self._session = None
+
+    async def export(self, spans: List[Span]) -> None:
+        import aiohttp
+
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession()
+        payload = otlp_payload([span.to_dict() for span in spans], SERVICE_NAME)
+        async with self._session.post(self.url, json=payload, timeout=aiohttp.ClientTimeout(total=10)) as resp:
+            if resp.status >= 300:
+                raise RuntimeError(f"HTTP {resp.status}")
+
+    async def aclose(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+
+def create_exporter(target: str):
+    """http(s) 地址使用 OTLP 导出, 其他视为本地文件路径"""
+    if target.startswith(("http://", "https://")):
+        return OtlpExporter(target)
+    return JsonlExporter(target)
+
+
+def parse_server_timing(header: str) -> Dict[str, float]:
+    """解析 Server-Timing 响应头: "fetch.matches;dur=812.3, parse.matches;dur=95.1" -> {名称: 毫秒}"""
+    timings: Dict[str, float] = {}
+    for item in header.split(","):
+        name, _, params = item.strip().partition(";")
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if name and key == "dur":
+                try:
+                    timings[name] = float(value)
+                except ValueError:
+                    pass
+    return timings
+
+
+class Tracer:
+    """进程内链路追踪
+
+    每条追踪在根 span (命令或后台请求) 开始时按 sample_rate 决定是否采样;
+    未采样的追踪仍会计时, 根 span 耗时超过 slow_threshold 时同样保留 (慢请求总能看到完整链路)。
+    保留的 span 放入缓冲区, 由后台任务定期批量导出, 命令处理中不做任何 I/O。
+    sample_rate 和 slow_threshold 都为 0 时不创建 span。
+    """
+
+    FLUSH_INTERVAL = 5
+    # 缓冲区上限 (导出失败或过慢时丢弃新的 span)
+    MAX_PENDING = 4096
+
+    def __init__(self) -> None:
+        self.sample_rate = 0.0
+        self.slow_threshold = 0.0
+        self.exporter = None
+        self.enabled = False
+        self._pending: List[Span] = []
+        self._flush_task: Optional[asyncio.Task] = None
+        self.exported = 0
+        self.dropped = 0
+
+    def configure(self, sample_rate: float = 0.0, slow_threshold: float = 0.0, exporter=None) -> None:
+        self.sample_rate = max(0.0, min(1.0, sample_rate))
+        self.slow_threshold = max(0.0, slow_threshold)
+        self.exporter = exporter
+        self.enabled = exporter is not None and (self.sample_rate > 0 or self.slow_threshold > 0)
+
+    def current(self) -> Optional[Span]:
+        return _current_span.get()
+
+    def annotate(self, **attributes: Any) -> None:
+        """为当前 span 添加属性"""
+        span = _current_span.get()
+        if span is not None:
+            span.attributes.update(attributes)
+
+    def traceparent(self) -> Optional[str]:
+        """当前 span 的 W3C traceparent 请求头 (传给 API Server 关联服务端 span)"""
+        span = _current_span.get()
+        if span is None:
+            return None
+        return f"00-{span.trace_id}-{span.span_id}-{'01' if span.trace.sampled else '00'}"
+
+    @contextmanager
+    def span(self, name: str, kind: str = "internal", **attributes: Any) -> Iterator[Optional[Span]]:
+        """在 with 块内记录一个 span (当前没有 span 时开始一条新追踪)"""
+        if not self.enabled:
+            yield None
+            return
+        parent = _current_span.get()
+        if parent is None:
+            trace = _Trace(f"{random.getrandbits(128):032x}", random.random() < self.sample_rate)
+            span = Span(trace, None, name, kind, attributes)
+        else:
+            span = Span(parent.trace, parent.span_id, name, kind, attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            if not isinstance(e, (asyncio.CancelledError, GeneratorExit)):
+                span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            _current_span.reset(token)
+            span.duration_ns = time.perf_counter_ns() - span._t0
+            self._finish(span, root=parent is None)
+
+    def _finish(self, span: Span, root: bool) -> None:
+        trace = span.trace
+        if trace.done:
+            # 根 span 结束后才完成的后台任务 (如命令中启动的预取)
+            if trace.kept:
+                self._buffer([span])
+            return
+        trace.spans.append(span)
+        if not root:
+            return
+        trace.done = True
+        trace.kept = trace.sampled or (
+            self.slow_threshold > 0 and span.duration_ns >= self.slow_threshold * 1e9
+        )
+        if trace.kept:
+            span.set("sampled", trace.sampled)
+            self._buffer(trace.spans)
+        trace.spans = []
+
+    def _buffer(self, spans: List[Span]) -> None:
+        room = self.MAX_PENDING - len(self._pending)
+        if room < len(spans):
+            self.dropped += len(spans) - max(room, 0)
+            spans = spans[:max(room, 0)]
+        self._pending.extend(spans)
+
+    async def flush(self) -> None:
+        if not self._pending or self.exporter is None:
+            return
+        spans, self._pending = self._pending, []
+        try:
+            await self.exporter.export(spans)
+            self.exported += len(spans)
+        except Exception as e:
+            self.dropped += len(spans)
+            logger.warning(f"导出追踪数据失败 ({len(spans)} 个 span): {e}")
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.FLUSH_INTERVAL)
+            await self.flush()
+
+    def start(self) -> None:
+        """启动后台导出任务"""
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def aclose(self) -> None:
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
+        await self.flush()
+        if self.exporter is not None:
+            await self.exporter.aclose()
+
+
+tracer = Tracer()
@@ -1,16 +1,24 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import asyncio
+import json
+import sqlite3
 from pathlib import Path
 from typing import Any, Dict
 
 import nonebot
 from fastapi import FastAPI, Request, APIRouter
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, PlainTextResponse, StreamingResponse
 from fastapi.templating import Jinja2Templates
 from nonebot.log import logger
+from pydantic import ValidationError
 
 from . import matcher
+from .loadtest import run_load_test
+from .metrics import metrics
+from .profiler import format_collapsed, loop_monitor, profiler, task_summary
+from .scheduler import Priority, request_priority
 
 # 模板目录
 TEMPLATES_DIR = Path(__file__).parent / "templates"
@@ -23,6 +31,63 @@ async def hltv_index(request: Request):
     """WebUI 首页"""
     return templates.TemplateResponse("index.html", {"request": request})
 
+@router.get("/dashboard", response_class=HTMLResponse)
+async def hltv_dashboard(request: Request):
+    """运行监控页"""
+    return templates.TemplateResponse("dashboard.html", {"request": request})
+
+@router.get("/api/metrics")
+async def get_metrics():
+    """当前运行指标快照"""
+    return metrics.snapshot()
+
+@router.get("/api/metrics/stream")
+async def stream_metrics(request: Request, interval: float = 1.0):
+    """以 SSE 每秒推送一次运行指标快照"""
+    interval = max(0.2, interval)
+
+    async def events():
+        while not await request.is_disconnected():
+            yield f"data: {json.dumps(metrics.snapshot(), ensure_ascii=False)}\n\n"
+            await asyncio.sleep(interval)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.get("/api/loop")
+async def get_loop_status():
+    """事件循环延迟、任务数 (按协程分组) 和最近的阻塞记录 (阻塞时事件循环线程的调用栈)"""
+    return {
+        **metrics.loop_summary(),
+        "task_groups": task_summary()["by_coroutine"],
+        "recent_blocks": [
+            {k: v for k, v in block.items() if k != "heartbeat"}
+            for block in reversed(metrics.loop_blocks)
+        ],
+    }
+
+@router.get("/api/profile")
+async def profile_event_loop(seconds: float = 10, interval_ms: float = 5, idle: bool = False):
+    """对事件循环线程采样 seconds 秒 (最长 120 秒)
+
+    返回 folded 格式的调用栈 (每行 "栈帧;栈帧;... 采样数"), 可直接用 flamegraph.pl、speedscope 等生成火焰图。
+    idle=true 时包含事件循环空闲 (等待 I/O) 的采样。
+    """
+    seconds = min(max(seconds, 1), 120)
+    interval = min(max(interval_ms, 1), 100) / 1000
+    try:
+        result = await profiler.profile(seconds, interval, include_idle=idle)
+    except RuntimeError as e:
+        return {"success": False, "message": str(e)}
+    logger.info(f"HLTV 采样完成: {seconds}s, {result['samples']} 次采样 (空闲 {result['idle']})")
+    return PlainTextResponse(
+        format_collapsed(result["stacks"]),
+        headers={"X-Profile-Samples": str(result["samples"]), "X-Profile-Idle": str(result["idle"])},
+    )
+
 @router.get("/api/config")
 async def get_config():
     """获取当前配置"""
@@ -30,46 +95,89 @@ async def get_config():
 
 @router.post("/api/config")
 async def update_config(new_config: Dict[str, Any]):
-    """更新配置"""
-    # 更新 matcher 中的 config 对象
-    for key, value in new_config.items():
-        if hasattr(matcher.config, key):
-            setattr(matcher.config, key, value)
-    
-    # 特殊处理: 如果更新了 API URL，需要重新初始化 client 或更新其属性
-    if "hltv_api_url" in new_config:
-        new_url = new_config["hltv_api_url"]
-        # 更新 client 的 api_url
-        # 注意: HLTVClient 的 api_url 处理逻辑在 __init__ 中，这里我们需要手动模拟
-        from .real_client import HLTVClient
-        if not new_url:
-            matcher.hltv_client.api_url = HLTVClient.DEFAULT_API_URL
-        else:
-            matcher.hltv_client.api_url = new_url.rstrip("/")
-            
-    return {"success": True, "message": "配置已更新"}
+    """更新配置 (校验后原子替换, 后端地址变化时重建客户端并清空缓存)"""
+    try:
+        await matcher.apply_config(new_config)
+    except ValidationError as e:
+        return {"success": False, "message": f"配置校验失败: {e}"}
+    except (OSError, sqlite3.Error) as e:
+        logger.error(f"应用配置失败: {e}")
+        return {"success": False, "message": f"应用配置失败 (配置未修改): {e}"}
+    return {"success": True, "message": "配置已更新", "version": matcher.config_version}
 
-@router.get("/api/test")
-async def test_api(type: str, arg: str = ""):
-    """测试 API"""
-    client = matcher.hltv_client
-    
+# 测试类型 -> (接口, 参数名), 用于绕过客户端缓存直接请求后端
+TEST_ENDPOINTS = {
+    "matches": ("/api/matches", None),
+    "results": ("/api/results", None),
+    "ranking": ("/api/rankings", None),
+    "team": ("/api/team", "name"),
+    "player": ("/api/player", "name"),
+}
+
+def _test_call(client, type: str, arg: str, use_cache: bool = True):
+    """返回执行一次测试请求的协程函数"""
+    if not use_cache:
+        # 绕过缓存、请求合并和调度器并发上限, 直接测量后端 (不更新索引和话题词典, 不计入上游指标)
+        endpoint, param = TEST_ENDPOINTS[type]
+        return lambda: client.fetch_uncached(endpoint, {param: arg} if param else None)
     if type == "matches":
-        return await client.get_cs2_matches()
+        return client.get_cs2_matches
     elif type == "results":
-        return await client.get_match_results()
+        return client.get_match_results
     elif type == "ranking":
-        return await client.get_team_rankings()
+        return client.get_team_rankings
     elif type == "team":
-        if not arg:
-            return {"success": False, "message": "缺少参数: 战队名"}
-        return await client.get_team_info(arg)
-    elif type == "player":
-        if not arg:
-            return {"success": False, "message": "缺少参数: 选手名"}
-        return await client.get_player_info(arg)
-    else:
+        return lambda: client.get_team_info(arg)
+    return lambda: client.get_player_info(arg)
+
+@router.get("/api/test")
+async def test_api(
+    type: str,
+    arg: str = "",
+    concurrency: int = 0,
+    duration: float = 10,
+    use_cache: bool = True,
+):
+    """测试 API
+
+    concurrency > 0 时为压测模式: 以 concurrency 个并发持续请求 duration 秒,
+    返回延迟直方图、错误统计和吞吐量。use_cache=false 时绕过客户端缓存直接请求后端。
+    压测模式需要开启 enable_load_test, 且不能绕过缓存压测默认的公共 API。
+    """
+    client = matcher.get_client()
+
+    if type not in TEST_ENDPOINTS:
         return {"success": False, "message": "未知测试类型"}
+    if type == "team" and not arg:
+        return {"success": False, "message": "缺少参数: 战队名"}
+    if type == "player" and not arg:
+        return {"success": False, "message": "缺少参数: 选手名"}
+
+    call = _test_call(client, type, arg, use_cache)
+    if concurrency <= 0:
+        return await call()
+    if not matcher.config.enable_load_test:
+        return {"success": False, "message": "压测未开启 (配置 enable_load_test)"}
+    if not use_cache and client.api_url == client.DEFAULT_API_URL:
+        return {"success": False, "message": "不能绕过缓存压测默认的公共 API, 请配置自建的 hltv_api_url"}
+
+    logger.info(f"HLTV 压测开始: {type} 并发 {concurrency} 持续 {duration}s (缓存: {use_cache})")
+    # 经过调度器的请求按批量优先级排队, 压测期间不影响用户命令
+    with request_priority(Priority.BULK):
+        report = await run_load_test(call, concurrency=concurrency, duration=duration)
+    logger.info(f"HLTV 压测结束: {report['requests']} 个请求, {report['throughput']} req/s")
+    return {
+        "success": True,
+        "data": {"type": type, "api_url": client.api_url, "use_cache": use_cache, **report},
+    }
+
+@nonebot.get_driver().on_startup
+async def _start_loop_monitor():
+    loop_monitor.start()
+
+@nonebot.get_driver().on_shutdown
+async def _stop_loop_monitor():
+    loop_monitor.stop()
 
 def init_web_ui():
     """初始化 WebUI"""
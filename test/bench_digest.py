@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+日报推送模拟
+
+模拟把一期日报发送到若干个群 (默认 240 个, 分布在 2 个机器人账号上, 其中一部分群的订阅账号不在线),
+每次发送有固定的网络延迟和一定比例的失败, 比较不同发送速率下的总耗时、吞吐量、重试和失败次数。
+
+    python test/bench_digest.py [--groups 240] [--bots 2] [--latency 0.05] [--fail 0.05] [--rates 2,5,10]
+"""
+
+import argparse
+import asyncio
+import random
+
+from plugin_modules import load_module
+
+
+async def run(DigestSender, args, rate: float):
+    rng = random.Random(args.seed)
+    bots = [str(10000 + i) for i in range(args.bots)]
+    # 约 1/10 的群由已离线的账号订阅, 需要分给在线账号
+    groups = {
+        100000 + i: (bots[i % len(bots)] if i % 10 else "offline") for i in range(args.groups)
+    }
+
+    async def send(self_id, group_id):
+        await asyncio.sleep(args.latency)
+        if rng.random() < args.fail:
+            raise RuntimeError("ActionFailed")
+
+    sender = DigestSender(rate=rate, attempts=args.attempts, backoff=args.backoff)
+    return await sender.broadcast(groups, bots, send)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="日报推送模拟")
+    parser.add_argument("--groups", type=int, default=240, help="订阅的群数")
+    parser.add_argument("--bots", type=int, default=2, help="在线的机器人账号数")
+    parser.add_argument("--latency", type=float, default=0.05, help="每次发送的耗时 (秒)")
+    parser.add_argument("--fail", type=float, default=0.05, help="每次发送失败的概率")
+    parser.add_argument("--attempts", type=int, default=3, help="每个群最多发送次数 (digest_send_attempts)")
+    parser.add_argument("--backoff", type=float, default=0.5, help="重试退避基数 (秒)")
+    parser.add_argument("--rates", default="2,5,10", help="每个账号的发送速率 (digest_send_rate), 逗号分隔")
+    parser.add_argument("--seed", type=int, default=2026)
+    args = parser.parse_args()
+
+    DigestSender = load_module("digest").DigestSender
+    print("=" * 64)
+    print(f"日报推送模拟 ({args.groups} 个群, {args.bots} 个账号, 失败率 {args.fail:.0%})")
+    print("=" * 64)
+    print(f"{'速率/账号':<12}{'耗时':>10}{'吞吐量':>12}{'成功':>8}{'重试':>8}{'失败':>8}")
+    for rate in (float(r) for r in args.rates.split(",")):
+        report = asyncio.run(run(DigestSender, args, rate))
+        print(
+            f"{rate:<12g}{report['seconds']:>9.1f}s{report['throughput']:>9.1f}/s"
+            f"{report['sent']:>8}{report['retries']:>8}{report['failed']:>8}"
+        )
+    print("=" * 64)
+
+
+if __name__ == "__main__":
+    main()
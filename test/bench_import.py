@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+插件导入耗时基准
+
+在子进程中以 `python -X importtime` 初始化 NoneBot (无驱动) 并加载插件,
+统计插件模块的累计导入耗时 (取多次运行的最小值), 同时检查渲染、HTTP 客户端、
+WebUI 等重量级依赖没有在导入时被加载。超出预算或加载了重量级依赖时以状态码 1 退出。
+
+    python test/bench_import.py [--runs 5] [--budget 200] [--verbose]
+
+NoneBot 本身的导入耗时不计入; 插件首次导入的 OneBot 适配器计入 (约 80 ms, 正常部署中适配器通常已先加载)。
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import List, Tuple
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+PLUGIN = "nonebot_plugin_hltv"
+
+# 插件导入耗时预算 (毫秒), 当前约 110 ms, 懒加载之前约 550 ms (含 WebUI)
+IMPORT_BUDGET_MS = 200
+
+# 导入插件时不应加载的模块: 渲染 (首次渲染图片时加载)、HTTP 客户端 (驱动启动时创建)、
+# WebUI (启用时才加载, 基准中关闭)
+HEAVY_MODULES = (
+    "nonebot_plugin_htmlrender",
+    "playwright",
+    "aiohttp",
+    "jinja2",
+    "fastapi",
+    f"{PLUGIN}.real_client",
+    f"{PLUGIN}.web_ui",
+)
+
+CHILD_SCRIPT = f"""
+import json, sys
+import nonebot
+nonebot.init(driver="~none", enable_web_ui=False, log_level="WARNING")
+nonebot.load_plugin({PLUGIN!r})
+heavy = [m for m in {HEAVY_MODULES!r} if m in sys.modules]
+print("HEAVY=" + json.dumps(heavy))
+"""
+
+
+def parse_importtime(stderr: str) -> List[Tuple[int, int, int, str]]:
+    """解析 -X importtime 输出为 (self_us, cumulative_us, depth, module)"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        head, cumulative_us, name = line.split("|", 2)
+        self_us = head.rsplit(":", 1)[1]
+        stripped = name.lstrip(" ")
+        # 模块名前有 1 个空格, 每层嵌套再缩进 2 个空格
+        depth = (len(name) - len(stripped) - 1) // 2
+        rows.append((int(self_us), int(cumulative_us), depth, stripped.strip()))
+    return rows
+
+
+def run_once(workdir: Path) -> Tuple[float, List[Tuple[int, int, int, str]], List[str]]:
+    """运行一次导入, 返回插件累计耗时 (毫秒)、插件相关的导入记录和被加载的重量级模块"""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(PROJECT_ROOT), env.get("PYTHONPATH")]))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", CHILD_SCRIPT],
+        cwd=workdir,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"插件加载失败:\n{proc.stderr[-2000:]}")
+    heavy = []
+    for line in proc.stdout.splitlines():
+        if line.startswith("HEAVY="):
+            heavy = json.loads(line[len("HEAVY="):])
+
+    # 插件包由 NoneBot 加载, 其子模块作为顶层条目出现; 子模块导入的第三方模块计入其累计耗时
+    rows = parse_importtime(proc.stderr)
+    total_us = sum(cum for _, cum, depth, name in rows if depth == 0 and name.split(".")[0] == PLUGIN)
+    plugin_rows = []
+    inside = False
+    for row in rows:
+        if row[2] == 0:
+            inside = row[3].split(".")[0] == PLUGIN
+        if inside or row[3].split(".")[0] == PLUGIN:
+            plugin_rows.append(row)
+    return total_us / 1000, plugin_rows, heavy
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="插件导入耗时基准")
+    parser.add_argument("--runs", type=int, default=5, help="运行次数, 取最小值")
+    parser.add_argument("--budget", type=float, default=IMPORT_BUDGET_MS, help="耗时预算 (毫秒)")
+    parser.add_argument("--verbose", action="store_true", help="列出插件导入中最慢的模块")
+    args = parser.parse_args()
+
+    # 插件会在工作目录下创建数据目录, 在临时目录中运行
+    with tempfile.TemporaryDirectory(prefix="hltv-import-") as tmp:
+        results = [run_once(Path(tmp)) for _ in range(max(1, args.runs))]
+
+    times = [ms for ms, _, _ in results]
+    best_ms, plugin_rows, heavy = min(results, key=lambda r: r[0])
+
+    print("=" * 60)
+    print("插件导入耗时基准")
+    print("=" * 60)
+    print(f"运行 {len(times)} 次: 最小 {best_ms:.1f} ms, 最大 {max(times):.1f} ms (预算 {args.budget:.0f} ms)")
+    if args.verbose:
+        print("最慢的模块 (自身耗时):")
+        for self_us, cum_us, depth, name in sorted(plugin_rows, key=lambda r: -r[0])[:15]:
+            print(f"  {self_us / 1000:>8.1f} ms  (累计 {cum_us / 1000:>7.1f} ms)  {name}")
+
+    failed = False
+    if heavy:
+        print(f"失败: 导入插件时加载了重量级模块: {', '.join(heavy)}")
+        failed = True
+    if best_ms > args.budget:
+        print(f"失败: 导入耗时 {best_ms:.1f} ms 超出预算 {args.budget:.0f} ms")
+        failed = True
+    if not failed:
+        print("通过")
+    print("=" * 60)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+选手数据历史基准
+
+模拟一年内反复查询若干名选手 (默认 200 名, 每人每 2 小时一次), 记录每次获取到的数据,
+报告文件大小、数据点数 (降采样后)、记录/加载耗时及计算 30/90 天趋势的耗时。
+
+    python test/bench_player_history.py [--players 200] [--days 365] [--interval 2]
+"""
+
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from plugin_modules import load_module
+
+
+def main():
+    parser = argparse.ArgumentParser(description="选手数据历史基准")
+    parser.add_argument("--players", type=int, default=200, help="选手数")
+    parser.add_argument("--days", type=int, default=365, help="模拟的天数")
+    parser.add_argument("--interval", type=float, default=2, help="每名选手的查询间隔 (小时)")
+    parser.add_argument("--seed", type=int, default=2026)
+    args = parser.parse_args()
+
+    PlayerStatsHistory = load_module("history").PlayerStatsHistory
+    rng = random.Random(args.seed)
+    names = [f"player{i}" for i in range(args.players)]
+    ratings = {name: rng.uniform(0.9, 1.3) for name in names}
+    start = time.time() - args.days * 86400
+    step = args.interval * 3600
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "player_stats.bin"
+        history = PlayerStatsHistory(path)
+        records = 0
+        began = time.perf_counter()
+        ts = start
+        while ts < start + args.days * 86400:
+            for name in names:
+                ratings[name] += rng.gauss(0, 0.005)
+                history.record(
+                    {
+                        "name": name,
+                        "rating": f"{ratings[name]:.2f}",
+                        "kpr": f"{ratings[name] * 0.6:.2f}",
+                        "adr": f"{ratings[name] * 65:.1f}",
+                        "kast": f"{rng.uniform(68, 78):.1f}%",
+                    },
+                    ts=ts + rng.uniform(0, step),
+                )
+                records += 1
+            ts += step
+        record_time = time.perf_counter() - began
+
+        began = time.perf_counter()
+        loaded = PlayerStatsHistory(path)
+        load_time = time.perf_counter() - began
+
+        now = start + args.days * 86400
+        began = time.perf_counter()
+        for name in names:
+            loaded.trends(name, (30, 90), now=now)
+        trend_time = (time.perf_counter() - began) / len(names)
+
+        print("=" * 56)
+        print(f"选手数据历史 ({args.players} 名选手, {args.days} 天, 每 {args.interval:g} 小时一次)")
+        print("=" * 56)
+        print(f"记录次数:     {records}")
+        print(f"保留数据点:   {len(loaded)} (每名选手 {len(loaded) / args.players:.0f} 个)")
+        print(f"文件大小:     {path.stat().st_size / 1024:.1f} KB")
+        print(f"记录耗时:     {record_time / records * 1e6:.1f} µs/次 (含降采样和重写)")
+        print(f"加载耗时:     {load_time * 1000:.1f} ms")
+        print(f"趋势计算:     {trend_time * 1e6:.1f} µs/名")
+        print("=" * 56)
+
+
+if __name__ == "__main__":
+    main()
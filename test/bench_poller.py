@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+比赛数据自适应刷新模拟
+
+按一天的比赛日程 (默认: 12 点到 23 点之间的若干场比赛, 每场持续约 90 分钟) 模拟
+按固定间隔刷新和 AdaptivePoller 自适应刷新, 比较每天的上游请求数,
+以及比赛开始后数据中出现 LIVE 标记的延迟。
+
+    python test/bench_poller.py [--matches 12] [--fixed 60] [--min 30] [--max 1800]
+"""
+
+import argparse
+import random
+
+from plugin_modules import load_module
+
+DAY = 86400
+
+
+def build_schedule(rng: random.Random, count: int):
+    """生成一天的比赛 (开始时间, 结束时间), 以当天 0 点为 0"""
+    schedule = []
+    for _ in range(count):
+        start = rng.randrange(12 * 3600, 23 * 3600)
+        schedule.append((start, start + rng.randint(60, 150) * 60))
+    return sorted(schedule)
+
+
+def match_list(schedule, now):
+    """模拟 /api/matches 在 now 时刻返回的数据: 未结束的比赛 (最多 15 场)"""
+    matches = []
+    for start, end in schedule:
+        if end <= now:
+            continue
+        live = start <= now
+        matches.append({"timestamp": start, "live": live, "time": "LIVE" if live else "--:--"})
+    return matches[:15]
+
+
+def simulate(schedule, next_interval):
+    """从 0 点开始模拟一天, 返回 (请求次数, 各场比赛 LIVE 标记的发现延迟列表)"""
+    # 起点错开整分钟, 避免固定间隔恰好与比赛开始时间对齐
+    now, polls = 17.0, 0
+    seen_live = {}
+    while now < DAY:
+        data = match_list(schedule, now)
+        polls += 1
+        for start, end in schedule:
+            if start <= now < end and start not in seen_live:
+                seen_live[start] = now - start
+        now += next_interval(data, now)
+    delays = [seen_live.get(start, end - start) for start, end in schedule]
+    return polls, delays
+
+
+def main():
+    parser = argparse.ArgumentParser(description="比赛数据自适应刷新模拟")
+    parser.add_argument("--matches", type=int, default=12, help="当天比赛场数")
+    parser.add_argument("--fixed", type=float, default=60, help="固定刷新间隔 (cache_duration_matches)")
+    parser.add_argument("--min", type=float, default=30, help="最短刷新间隔 (poll_interval_min)")
+    parser.add_argument("--max", type=float, default=1800, help="最长刷新间隔 (poll_interval_max)")
+    parser.add_argument("--seed", type=int, default=2026)
+    args = parser.parse_args()
+
+    AdaptivePoller = load_module("poller").AdaptivePoller
+    schedule = build_schedule(random.Random(args.seed), args.matches)
+    poller = AdaptivePoller(args.min, args.max, fixed_interval=args.fixed)
+
+    cases = [
+        (f"固定 {args.fixed:g}s", lambda data, now: args.fixed),
+        (f"自适应 {args.min:g}~{args.max:g}s", lambda data, now: poller.record(data, now)),
+    ]
+    print("=" * 64)
+    print(f"比赛数据刷新模拟 (一天 {len(schedule)} 场比赛)")
+    print("=" * 64)
+    print(f"{'策略':<20}{'请求/天':>10}{'LIVE 发现延迟 平均':>20}{'最大':>10}")
+    for label, next_interval in cases:
+        polls, delays = simulate(schedule, next_interval)
+        avg = sum(delays) / len(delays) if delays else 0
+        print(f"{label:<20}{polls:>10}{avg:>18.0f}s{max(delays or [0]):>9.0f}s")
+    print("=" * 64)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+跨进程共享缓存基准
+
+启动一个本地模拟 API Server (每次请求耗时 50 ms), 再启动 N 个进程模拟 N 个机器人,
+每个进程在持续时间内不断查询比赛、排名和选手数据。分别使用进程内缓存 (memory)
+和 SQLite 共享缓存 (sqlite) 运行, 比较上游收到的请求数随机器人数量的变化。
+
+    python test/bench_shared_cache.py [--bots 1,2,4,8] [--duration 6] [--ttl 2]
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import tempfile
+import time
+from pathlib import Path
+
+from aiohttp import web
+
+from plugin_modules import load_module
+
+ENDPOINTS = [
+    ("/api/matches", None),
+    ("/api/rankings", {"limit": 30}),
+    ("/api/player", {"name": "zywoo"}),
+]
+
+
+async def start_server(counter):
+    """模拟 API Server, 统计收到的请求数"""
+
+    async def handle(request: web.Request) -> web.Response:
+        with counter.get_lock():
+            counter.value += 1
+        await asyncio.sleep(0.05)
+        return web.json_response({"success": True, "data": [{"path": request.path, "t": time.time()}]})
+
+    app = web.Application()
+    app.router.add_get("/{tail:.*}", handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}"
+
+
+def bot_process(api_url, backend, db_path, ttl, duration, start_at, results):
+    HLTVClient, SharedCache = load_module("real_client").HLTVClient, load_module("shared_cache").SharedCache
+
+    async def run():
+        shared = SharedCache(db_path) if backend == "sqlite" else None
+        client = HLTVClient(
+            api_url=api_url,
+            cache_ttl={endpoint: ttl for endpoint, _ in ENDPOINTS},
+            shared_cache=shared,
+        )
+        # 所有进程同时开始
+        await asyncio.sleep(max(0.0, start_at - time.time()))
+        deadline = time.time() + duration
+        calls = failed = 0
+        while time.time() < deadline:
+            for endpoint, params in ENDPOINTS:
+                data = await client._api_request(endpoint, params)
+                calls += 1
+                failed += 0 if data.get("success") else 1
+            await asyncio.sleep(0.01)
+        await client.aclose(timeout=1)
+        results.put((calls, failed))
+
+    import logging
+
+    logging.disable(logging.WARNING)
+    asyncio.run(run())
+
+
+async def run_case(backend, bots, duration, ttl):
+    counter = multiprocessing.Value("i", 0)
+    runner, api_url = await start_server(counter)
+    results = multiprocessing.Queue()
+    with tempfile.TemporaryDirectory(prefix="hltv-shared-") as tmp:
+        db_path = str(Path(tmp) / "shared_cache.db")
+        start_at = time.time() + 1.5
+        procs = [
+            multiprocessing.Process(
+                target=bot_process,
+                args=(api_url, backend, db_path, ttl, duration, start_at, results),
+            )
+            for _ in range(bots)
+        ]
+        for proc in procs:
+            proc.start()
+        while any(proc.is_alive() for proc in procs):
+            await asyncio.sleep(0.1)
+        await runner.cleanup()
+    calls = failed = 0
+    for _ in procs:
+        c, f = results.get()
+        calls += c
+        failed += f
+    return counter.value, calls, failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="跨进程共享缓存基准")
+    parser.add_argument("--bots", default="1,2,4,8", help="机器人进程数列表")
+    parser.add_argument("--duration", type=float, default=6, help="每组持续秒数")
+    parser.add_argument("--ttl", type=float, default=2, help="缓存时间 (秒)")
+    args = parser.parse_args()
+    bots_list = [int(n) for n in args.bots.split(",")]
+    # 理想情况下每个键每个 TTL 周期只请求一次
+    ideal = len(ENDPOINTS) * (args.duration / args.ttl + 1)
+
+    print("=" * 64)
+    print(f"跨进程共享缓存基准 (持续 {args.duration:g} 秒, 缓存 {args.ttl:g} 秒, 理想上游请求约 {ideal:.0f} 次)")
+    print("=" * 64)
+    print(f"{'后端':<10}{'机器人数':>8}{'上游请求':>10}{'查询次数':>10}{'失败':>6}")
+    for backend in ("memory", "sqlite"):
+        for bots in bots_list:
+            upstream, calls, failed = asyncio.run(run_case(backend, bots, args.duration, args.ttl))
+            print(f"{backend:<10}{bots:>8}{upstream:>10}{calls:>10}{failed:>6}")
+        print("-" * 64)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+话题检测微基准
+
+构造数千个话题词的词典，测量每条群消息的平均检测耗时和话题规则 (判空 + 检测) 的总耗时 (微秒)，
+以及数据刷新时增量更新词典的耗时、在事件循环中刷新时单次阻塞事件循环的最长时间。
+
+    python test/bench_topic.py [词条数]
+"""
+
+import asyncio
+import random
+import string
+import sys
+import time
+
+from plugin_modules import load_module
+
+TopicDetector = load_module("topic").TopicDetector
+
+SAMPLE_MESSAGES = [
+    "今晚小蜜蜂打 NAVI 谁赢？",
+    "ZywOo 这波残局太离谱了",
+    "有人看 IEM Cologne 吗，感觉 FaZe 状态一般",
+    "吃饭了吗",
+    "今天天气不错，下班一起打两把？",
+    "donk 和 m0NESY 谁的 ADR 更高",
+    "I think Vitality will win the Major this year, their experience is unmatched",
+    "哈哈哈哈哈哈哈哈",
+    "明天上午开会，记得带电脑",
+    "MongolZ 这赛季进步好大",
+]
+
+
+def random_name(rng: random.Random) -> str:
+    length = rng.randint(3, 12)
+    return "".join(rng.choice(string.ascii_letters + string.digits) for _ in range(length))
+
+
+def build_dataset(rng: random.Random, size: int):
+    teams, members = [], []
+    for rank in range(1, size // 6 + 1):
+        roster = [random_name(rng) for _ in range(5)]
+        members.extend(roster)
+        teams.append({"title": random_name(rng), "rank": rank, "points": 1000 - rank, "members": roster})
+    teams[:4] = [
+        {"title": "Vitality", "rank": 1, "points": 1000, "members": ["ZywOo", "apEX", "ropz", "flameZ", "mezii"]},
+        {"title": "Natus Vincere", "rank": 2, "points": 900, "members": ["Aleksib", "iM", "b1t", "jL", "w0nderful"]},
+        {"title": "FaZe", "rank": 3, "points": 800, "members": ["karrigan", "rain", "broky", "frozen", "EliGE"]},
+        {"title": "Spirit", "rank": 4, "points": 700, "members": ["donk", "sh1ro", "chopper", "zont1x", "magixx"]},
+    ]
+    events = [{"name": f"{random_name(rng)} Masters {i}"} for i in range(size // 6)]
+    events.append({"name": "IEM Cologne", "tier": "A"})
+    return teams, events
+
+
+def topic_rule(detector, text: str) -> bool:
+    """与 matcher._topic_rule 相同的判断路径 (不含 NoneBot 事件和配置)"""
+    if not len(detector):
+        return False
+    return bool(detector.detect(text))
+
+
+async def refresh_in_loop(detector, teams) -> tuple:
+    """在事件循环中刷新词典, 返回 (总耗时 ms, 事件循环最长一次阻塞 ms)"""
+    gaps = []
+    done = False
+
+    async def ticker():
+        last = time.perf_counter()
+        while not done:
+            await asyncio.sleep(0)
+            now = time.perf_counter()
+            gaps.append(now - last)
+            last = now
+
+    tick = asyncio.create_task(ticker())
+    await asyncio.sleep(0)
+    start = time.perf_counter()
+    detector.load_rankings(teams)
+    await detector.wait_built()
+    total = time.perf_counter() - start
+    done = True
+    await tick
+    return total * 1000, max(gaps, default=0.0) * 1000
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    rng = random.Random(2026)
+    teams, events = build_dataset(rng, size)
+
+    detector = TopicDetector()
+    start = time.perf_counter()
+    detector.load_rankings(teams)
+    detector.load_events(events)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    print("=" * 60)
+    print("话题检测微基准")
+    print("=" * 60)
+    print(f"词典大小: {len(detector)} 个词条, 首次构建 {build_ms:.1f} ms")
+
+    rounds = 20000
+    start = time.perf_counter()
+    hits = 0
+    for i in range(rounds):
+        hits += len(detector.detect(SAMPLE_MESSAGES[i % len(SAMPLE_MESSAGES)]))
+    per_msg = (time.perf_counter() - start) / rounds * 1e6
+    avg_len = sum(len(m) for m in SAMPLE_MESSAGES) / len(SAMPLE_MESSAGES)
+    print(f"平均消息长度: {avg_len:.0f} 字符, 平均每条消息命中 {hits / rounds:.2f} 个话题")
+    print(f"每条消息检测耗时: {per_msg:.2f} µs")
+
+    start = time.perf_counter()
+    for i in range(rounds):
+        topic_rule(detector, SAMPLE_MESSAGES[i % len(SAMPLE_MESSAGES)])
+    per_rule = (time.perf_counter() - start) / rounds * 1e6
+    print(f"每条消息话题规则耗时 (判空 + 检测): {per_rule:.2f} µs")
+
+    # 模拟一次排名刷新: 替换约 5% 的战队
+    for team in teams[len(teams) // 2: len(teams) // 2 + max(1, len(teams) // 20)]:
+        team["title"] = random_name(rng)
+    start = time.perf_counter()
+    added, removed = detector.load_rankings(teams)
+    refresh_ms = (time.perf_counter() - start) * 1000
+    print(f"增量刷新: +{added} / -{removed} 个词条, 耗时 {refresh_ms:.1f} ms")
+
+    # 事件循环中的刷新: 失败指针在后台分段计算
+    for team in teams[len(teams) // 4: len(teams) // 4 + max(1, len(teams) // 20)]:
+        team["title"] = random_name(rng)
+    total_ms, block_ms = asyncio.run(refresh_in_loop(detector, teams))
+    print(f"事件循环中增量刷新: 耗时 {total_ms:.1f} ms, 最长阻塞事件循环 {block_ms:.2f} ms")
+
+    for msg in SAMPLE_MESSAGES[:3]:
+        print(f"  {msg!r} -> {[hit.term.name for hit in detector.detect(msg)]}")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
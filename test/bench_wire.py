@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+API 响应格式基准
+
+通过 API Server (快照模式, Flask test client) 请求各列表接口，比较以下响应的大小和客户端解码耗时:
+全字段 JSON / 插件实际请求的字段 (HLTVClient.ENDPOINT_FIELDS) 的 JSON / MessagePack / 以及 gzip 压缩后。
+
+默认使用按 HLTV 页面结构构造的模拟数据; 也可以指定快照模式生成的快照目录使用真实数据:
+
+    python test/bench_wire.py [快照目录]
+
+需要安装 api-server/requirements.txt 中的依赖。
+"""
+
+import gzip
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import msgpack
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+SNAPSHOT_DIR = sys.argv[1] if len(sys.argv) > 1 else tempfile.mkdtemp(prefix="hltv-bench-")
+os.environ["HLTV_SNAPSHOT_DIR"] = SNAPSHOT_DIR
+os.environ["HLTV_SNAPSHOT_SCHEDULER"] = "0"
+sys.path.insert(0, str(PROJECT_ROOT / "api-server" / "api"))
+import index as api_server  # noqa: E402
+
+from plugin_modules import load_module  # noqa: E402
+
+HLTVClient = load_module("real_client").HLTVClient
+
+ENDPOINTS = {
+    "/api/matches": "matches",
+    "/api/results": "results",
+    "/api/rankings": "rankings",
+    "/api/events": "events",
+}
+
+
+def build_dataset(rng: random.Random):
+    """构造与 API 返回结构一致的模拟数据"""
+    teams = [f"Team {rng.randint(100, 999)}" for _ in range(200)]
+    events = [f"{rng.choice(['IEM', 'BLAST', 'PGL', 'ESL'])} {rng.choice(['Cologne', 'Katowice', 'Austin', 'Shanghai'])} {2026}" for _ in range(20)]
+    matches = [
+        {
+            "team1": rng.choice(teams),
+            "team2": rng.choice(teams),
+            "event": rng.choice(events),
+            "time": f"{rng.randint(0, 23):02d}:{rng.choice(['00', '30'])}",
+            "bo_type": rng.choice(["bo1", "bo3", "bo5"]),
+            "url": f"https://www.hltv.org/matches/{2380000 + i}/team-a-vs-team-b-{events[0].lower().replace(' ', '-')}",
+        }
+        for i in range(15)
+    ]
+    results = [
+        {
+            "team1": rng.choice(teams),
+            "team2": rng.choice(teams),
+            "score1": 2,
+            "score2": rng.randint(0, 1),
+            "event": rng.choice(events),
+            "stars": rng.randint(0, 5),
+        }
+        for _ in range(20)
+    ]
+    rankings = [
+        {
+            "rank": i,
+            "title": teams[i],
+            "points": 1000 - i * 7,
+            "members": [f"player{rng.randint(1000, 9999)}" for _ in range(5)],
+        }
+        for i in range(1, 101)
+    ]
+    event_list = [
+        {
+            "name": f"{name} {i}",
+            "tier": rng.choice(["S", "A"]),
+            "tier_name": "国际LAN",
+            "event_type": "INTLLAN",
+            "location": rng.choice(["Cologne, Germany", "Shanghai, China", "Austin, USA"]),
+            "start_date": "2026-06-02",
+            "end_date": "2026-06-21",
+            "url": f"https://www.hltv.org/events/{8000 + i}/{name.lower().replace(' ', '-')}",
+        }
+        for i, name in enumerate(events * 2)
+    ]
+    return {"matches": matches, "results": results, "rankings": rankings, "events": event_list}
+
+
+def decode_time(body: bytes, use_msgpack: bool, gzipped: bool, rounds: int = 2000) -> float:
+    """平均解码耗时 (微秒)"""
+    start = time.perf_counter()
+    for _ in range(rounds):
+        raw = gzip.decompress(body) if gzipped else body
+        if use_msgpack:
+            msgpack.unpackb(raw, raw=False)
+        else:
+            json.loads(raw)
+    return (time.perf_counter() - start) / rounds * 1e6
+
+
+def main():
+    if len(sys.argv) <= 1:
+        for name, data in build_dataset(random.Random(2026)).items():
+            api_server.snapshot_store.publish(name, data)
+    # 快照 manifest 每秒最多检查一次
+    time.sleep(1.1)
+    client = api_server.app.test_client()
+
+    variants = [
+        ("JSON 全字段", False, False, False),
+        ("JSON fields", True, False, False),
+        ("msgpack fields", True, True, False),
+        ("JSON fields+gzip", True, False, True),
+        ("msgpack fields+gzip", True, True, True),
+    ]
+
+    print("=" * 72)
+    print("API 响应格式基准" + (f" (快照目录: {SNAPSHOT_DIR})" if len(sys.argv) > 1 else " (模拟数据)"))
+    print("=" * 72)
+    print(f"{'接口':<16}{'格式':<22}{'字节数':>10}{'相对全字段':>12}{'解码 µs':>10}")
+    for endpoint in ENDPOINTS:
+        baseline = None
+        for label, use_fields, use_msgpack, use_gzip in variants:
+            query = {"fields": HLTVClient.ENDPOINT_FIELDS[endpoint]} if use_fields else {}
+            if endpoint == "/api/rankings":
+                query["limit"] = HLTVClient().ranked_team_limit
+            headers = {"Accept": "application/msgpack" if use_msgpack else "application/json"}
+            if use_gzip:
+                headers["Accept-Encoding"] = "gzip"
+            resp = client.get(endpoint, query_string=query, headers=headers)
+            body = resp.get_data()
+            gzipped = resp.headers.get("Content-Encoding") == "gzip"
+            baseline = baseline or len(body)
+            us = decode_time(body, use_msgpack, gzipped)
+            note = "" if gzipped or not use_gzip else " (未压缩)"
+            print(f"{endpoint:<16}{label + note:<22}{len(body):>10}{len(body) / baseline:>11.0%}{us:>10.1f}")
+        print("-" * 72)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,15 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""pytest 配置: 初始化 NoneBot 并加载插件 (本地数据写入临时目录)"""
+
+import tempfile
+
+import nonebot
+from nonebot.adapters.onebot.v11 import Adapter
+
+# 需要网络的手动测试脚本, 不作为测试收集
+collect_ignore = ["test_plugin.py", "test_real_client.py", "local_test.py"]
+
+nonebot.init(command_start=["/"], hltv_data_dir=tempfile.mkdtemp(prefix="hltv-test-"))
+nonebot.get_driver().register_adapter(Adapter)
+nonebot.load_plugin("nonebot_plugin_hltv")
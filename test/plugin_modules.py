@@ -0,0 +1,24 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""基准脚本共用: 不初始化 NoneBot, 直接加载插件包中的模块"""
+
+import importlib
+import sys
+import types
+from pathlib import Path
+from types import ModuleType
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+
+def load_module(name: str) -> ModuleType:
+    """加载 nonebot_plugin_hltv.<name>
+
+    插件包的 __init__ 会注册命令, 需要先初始化 NoneBot; 包尚未导入时用一个空的包对象代替,
+    只导入需要的模块 (及其依赖的包内模块)。包已正常导入时直接使用。
+    """
+    if "nonebot_plugin_hltv" not in sys.modules:
+        pkg = types.ModuleType("nonebot_plugin_hltv")
+        pkg.__path__ = [str(PROJECT_ROOT / "nonebot_plugin_hltv")]
+        sys.modules["nonebot_plugin_hltv"] = pkg
+    return importlib.import_module(f"nonebot_plugin_hltv.{name}")
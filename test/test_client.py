@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""客户端: 相同请求合并、发起者取消或出错时的接力、过期数据回退和共享缓存租约"""
+
+import asyncio
+
+import pytest
+
+from nonebot_plugin_hltv.real_client import HLTVClient
+from nonebot_plugin_hltv.shared_cache import SharedCache
+
+
+@pytest.fixture
+async def client():
+    client = HLTVClient(api_url="http://127.0.0.1:9")
+    yield client
+    await client.aclose()
+
+
+def fake_fetch(client: HLTVClient, delay: float = 0.05, result=None):
+    """代替 _fetch, 记录请求次数; 第 n 次请求返回 data=[n]"""
+    calls = []
+
+    async def fetch(endpoint, params=None):
+        calls.append(endpoint)
+        await asyncio.sleep(delay)
+        return result or {"success": True, "data": [len(calls)]}
+
+    client._fetch = fetch
+    return calls
+
+
+async def test_concurrent_requests_share_one_fetch(client):
+    calls = fake_fetch(client)
+    results = await asyncio.gather(*(client.get_cs2_matches() for _ in range(5)))
+    assert calls == ["/api/matches"]
+    assert all(r == {"success": True, "data": [1]} for r in results)
+
+
+async def test_cancelled_leader_hands_fetch_to_waiter(client):
+    calls = fake_fetch(client, delay=0.1)
+    leader = asyncio.create_task(client.get_cs2_matches())
+    await asyncio.sleep(0.01)
+    waiters = [asyncio.create_task(client.get_cs2_matches()) for _ in range(3)]
+    await asyncio.sleep(0.01)
+    leader.cancel()
+    results = await asyncio.wait_for(asyncio.gather(*waiters), 2)
+    assert leader.cancelled()
+    assert len(calls) == 2
+    assert all(r == {"success": True, "data": [2]} for r in results)
+    assert not client._inflight
+
+
+async def test_failed_leader_does_not_strand_waiters(client):
+    calls = fake_fetch(client)
+    set_cache = client.cache.set
+
+    def fail_once(*args, **kwargs):
+        client.cache.set = set_cache
+        raise RuntimeError("boom")
+
+    client.cache.set = fail_once
+    results = await asyncio.wait_for(
+        asyncio.gather(*(client.get_cs2_matches() for _ in range(3)), return_exceptions=True), 2
+    )
+    assert isinstance(results[0], RuntimeError)
+    assert results[1] == results[2] == {"success": True, "data": [2]}
+    assert len(calls) == 2
+
+
+async def test_failure_falls_back_to_stale_cache(client):
+    key = client._cache_key("/api/matches")
+    client.cache.set(key, {"success": True, "data": ["old"]}, ttl=0)
+    fake_fetch(client, delay=0, result={"success": False, "message": "API请求超时", "data": []})
+    result = await client.get_cs2_matches()
+    assert result["success"] and result["data"] == ["old"]
+    assert result["stale"] is True and result["stale_age"] >= 0
+
+
+async def test_failure_without_stale_cache_is_returned(client):
+    fake_fetch(client, delay=0, result={"success": False, "message": "API请求超时", "data": []})
+    result = await client.get_cs2_matches()
+    assert result == {"success": False, "message": "API请求超时", "data": []}
+
+
+async def test_cancelled_refresh_releases_shared_lease(tmp_path):
+    path = str(tmp_path / "shared.db")
+    client = HLTVClient(api_url="http://127.0.0.1:9", shared_cache=SharedCache(path))
+    other = SharedCache(path)
+    try:
+        fake_fetch(client, delay=1)
+        task = asyncio.create_task(client.get_cs2_matches())
+        await asyncio.sleep(0.2)
+        shared_key = f"{client.api_url}{client._cache_key('/api/matches')}"
+        # 刷新期间租约由本进程持有
+        assert not other.acquire(shared_key)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        # 取消后立即释放, 其他进程不必等到租约过期
+        assert other.acquire(shared_key)
+    finally:
+        other.close()
+        await client.aclose()
+
+
+async def test_failed_refresh_releases_shared_lease(tmp_path):
+    path = str(tmp_path / "shared.db")
+    client = HLTVClient(api_url="http://127.0.0.1:9", shared_cache=SharedCache(path))
+    other = SharedCache(path)
+    try:
+        fake_fetch(client, delay=0, result={"success": False, "message": "HTTP 503", "data": []})
+        assert not (await client.get_cs2_matches())["success"]
+        assert other.acquire(f"{client.api_url}{client._cache_key('/api/matches')}")
+    finally:
+        other.close()
+        await client.aclose()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""运行中修改配置: 客户端切换和校验失败时保持原配置"""
+
+import asyncio
+
+import pytest
+from pydantic import ValidationError
+
+import nonebot_plugin_hltv.matcher as M
+
+
+@pytest.fixture
+async def fresh_client():
+    config, client = M.config, M.hltv_client
+    M.hltv_client = None
+    yield M.get_client()
+    if M.hltv_client is not None:
+        await M.hltv_client.aclose()
+    M.config, M.hltv_client = config, client
+
+
+async def test_client_setting_swaps_client(fresh_client):
+    old = fresh_client
+    version = M.config_version
+    await M.apply_config({"hltv_api_url": "http://127.0.0.1:9/", "max_matches_per_query": 3})
+    assert M.hltv_client is not old and M.hltv_client.api_url == "http://127.0.0.1:9"
+    assert M.config.max_matches_per_query == 3 and M.config_version == version + 1
+    # 旧客户端在进行中的请求完成后关闭
+    await asyncio.sleep(0.1)
+    assert old.closed and not M.hltv_client.closed
+
+
+async def test_same_backend_keeps_cache(fresh_client):
+    old = fresh_client
+    old.cache.set("/api/matches", {"success": True, "data": []}, 60)
+    await M.apply_config({"cache_duration_results": 123})
+    assert M.hltv_client is not old and M.hltv_client.cache is old.cache
+    assert M.hltv_client.cache_ttl["/api/results"] == 123
+
+
+async def test_other_settings_keep_client(fresh_client):
+    await M.apply_config({"max_matches_per_query": 4})
+    assert M.hltv_client is fresh_client and M.config.max_matches_per_query == 4
+
+
+async def test_invalid_update_keeps_config(fresh_client):
+    config, version = M.config, M.config_version
+    with pytest.raises(ValidationError):
+        await M.apply_config({"max_matches_per_query": "abc"})
+    assert M.config is config and M.hltv_client is fresh_client and M.config_version == version
+
+
+async def test_data_dir_switch_moves_stores(fresh_client, tmp_path):
+    stores = (M.ranking_history, M.player_stats, M.stat_table, M.digest_store)
+    try:
+        await M.apply_config({"hltv_data_dir": str(tmp_path)})
+        assert M.stat_table is not stores[2] and M.stat_table.path == tmp_path / "leaderboard.json"
+        assert M.digest_store.path == tmp_path / "digest.json"
+        # 新客户端的刷新监听器写入新目录
+        M.hltv_client._notify_refresh("/api/rankings", {"success": True, "data": [{"title": "Vitality", "rank": 1}]})
+        assert (tmp_path / "ranking_history.json").exists()
+    finally:
+        M.ranking_history, M.player_stats, M.stat_table, M.digest_store = stores
+
+
+async def test_failed_apply_changes_nothing(fresh_client, tmp_path):
+    blocker = tmp_path / "file"
+    blocker.write_text("")
+    config, version = M.config, M.config_version
+    stores = (M.ranking_history, M.player_stats, M.stat_table, M.digest_store)
+    with pytest.raises(OSError):
+        # 共享缓存目录无法创建
+        await M.apply_config({
+            "hltv_data_dir": str(tmp_path / "data"),
+            "cache_backend": "sqlite",
+            "cache_shared_path": str(blocker / "shared.db"),
+        })
+    assert M.config is config and M.config_version == version and M.hltv_client is fresh_client
+    assert (M.ranking_history, M.player_stats, M.stat_table, M.digest_store) == stores
+
+
+async def test_shutdown_cancels_leaderboard_backfill(fresh_client):
+    started = asyncio.Event()
+
+    async def get_team_rankings(limit=30):
+        started.set()
+        await asyncio.sleep(10)
+
+    fresh_client.get_team_rankings = get_team_rankings
+    assert M.start_leaderboard_backfill()
+    await started.wait()
+    await M._close_client()
+    await asyncio.sleep(0)
+    assert M._leaderboard_backfill.done()
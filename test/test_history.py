@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""排名历史的变化计算, 选手数据历史的降采样和趋势"""
+
+from nonebot_plugin_hltv.history import DAY, PlayerStatsHistory, RankingHistory
+
+NOW = 1_800_000_000
+
+
+def rows(*titles, points=None):
+    return [
+        {"title": title, "rank": i + 1, "points": (points or {}).get(title, 100 - i)}
+        for i, title in enumerate(titles)
+    ]
+
+
+def test_changes_against_previous_and_trend_snapshots():
+    history = RankingHistory()
+    history.record(rows("A", "B", "C", "D"), day="2026-01-01")
+    history.record(rows("B", "A", "C", "E"), day="2026-01-22")
+    history.record(rows("C", "B", "F", "A", "E", points={"C": 120, "E": 50}), day="2026-02-01")
+    changes = history.changes(trend_weeks=4)
+
+    assert list(changes) == ["C", "B", "F", "A", "E"]
+    assert changes["C"] == {
+        "rank": 1, "points": 120, "rank_delta": 2, "points_delta": 22,
+        "trend_rank": 2, "trend_points": 22, "new": False,
+    }
+    assert changes["A"]["rank_delta"] == -2 and changes["A"]["trend_rank"] == -3
+    # 上一快照只有 4 支队伍: 第 3 名的 F 是新上榜, 第 5 名的 E 只是上一快照没覆盖到
+    assert changes["F"]["new"] and changes["F"]["rank_delta"] is None
+    assert not changes["E"]["new"] and changes["E"]["rank_delta"] == -1
+    # E 在 4 周前的快照中不存在, 没有趋势
+    assert changes["E"]["trend_rank"] is None and changes["E"]["trend_points"] is None
+    assert history.span(4) == ("2026-01-22", "2026-01-01")
+
+
+def test_single_snapshot_has_no_deltas():
+    history = RankingHistory()
+    history.record(rows("A", "B"), day="2026-01-01")
+    item = history.changes()["B"]
+    assert item["rank"] == 2 and item["rank_delta"] is None and item["trend_rank"] is None
+    assert not item["new"]
+    assert RankingHistory().changes() == {}
+
+
+def player(rating, kast="70%"):
+    return {"name": "ZywOo", "rating": rating, "kpr": "0.8", "adr": "90", "kast": kast}
+
+
+def test_downsample_buckets_by_age():
+    history = PlayerStatsHistory(raw_days=2, daily_days=10, retention_days=60, compact_every=1000)
+    day = NOW // DAY * DAY
+    recorded = [
+        (day - 90 * DAY, "2.0"),                               # 超过保留期, 丢弃
+        (day - 20 * DAY, "1.0"), (day - 20 * DAY + 60, "1.2"),  # 同一周
+        (day - 5 * DAY + 10, "0.9"), (day - 5 * DAY + 20, "N/A"), (day - 5 * DAY + 30, "1.1"),  # 同一天
+        (day - 4 * DAY, "1.3"),
+        (NOW - DAY, "1.4"), (NOW - 60, "1.5"),                 # 最近 2 天, 保留原样
+    ]
+    for ts, rating in recorded:
+        history.record(player(rating, kast="N/A" if rating == "N/A" else "70%"), ts=ts)
+    assert history.compact(now=NOW) == 5 == len(history)
+
+    series = history.series("zywoo")
+    assert list(series.times) == [day - 20 * DAY + 60, day - 5 * DAY + 30, day - 4 * DAY, NOW - DAY, NOW - 60]
+    assert [round(v, 4) for v in series.values["rating"]] == [1.1, 1.0, 1.3, 1.4, 1.5]
+    # N/A 不参与均值
+    assert series.values["kast"][1] == 70
+
+
+def test_trends_per_window():
+    history = PlayerStatsHistory()
+    for days_ago, rating in ((100, "1.0"), (40, "1.1"), (20, "1.2"), (0, "1.3")):
+        history.record(player(rating), ts=NOW - days_ago * DAY)
+    trends = history.trends("ZywOo", (30, 90), now=NOW)
+    # 按窗口内最早数据点实际覆盖的天数
+    assert [days for days, _ in trends] == [20, 40]
+    assert round(trends[0][1]["rating"], 4) == 0.1 and round(trends[1][1]["rating"], 4) == 0.2
+    assert trends[0][1]["kast"] == 0
+    assert history.trends("nobody") == []
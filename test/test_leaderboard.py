@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""选手榜单数据表: 排序索引和筛选掩码与逐行计算的结果一致"""
+
+import heapq
+import math
+import random
+
+from nonebot_plugin_hltv.leaderboard import LEADERBOARD_METRICS, StatTable
+
+TEAMS = ["Vitality", "Spirit", "MOUZ", "FaZe", "Natus Vincere"]
+COUNTRIES = ["France", "Russia", "Denmark", "Brazil"]
+
+
+def build_table(rng: random.Random, players: int = 150) -> StatTable:
+    table = StatTable()
+    for i in range(players):
+        player = {"name": f"player{i}", "country": rng.choice(COUNTRIES)}
+        for field, _, _ in LEADERBOARD_METRICS.values():
+            if rng.random() > 0.1:
+                player[field] = round(rng.uniform(0.5, 1.5), 2)
+        table.upsert(player, rng.choice(TEAMS))
+    return table
+
+
+def reference_top(table, metric, limit, where):
+    field, _, ascending = LEADERBOARD_METRICS[metric]
+    column = table.columns[field]
+    rows = range(len(table))
+    if where is not None:
+        codes = table.teams if where[0] == "team" else table.countries
+        rows = [i for i in rows if codes[i] == where[1]]
+    rows = [i for i in rows if not math.isnan(column[i])]
+    pick = heapq.nsmallest if ascending else heapq.nlargest
+    return [(i, column[i]) for i in pick(limit, rows, key=column.__getitem__)]
+
+
+def test_top_and_count_match_row_scan():
+    table = build_table(random.Random(2026))
+    filters = [None, table.resolve_filter("Spirit"), table.resolve_filter("Brazil")]
+    for metric in LEADERBOARD_METRICS:
+        for where in filters:
+            expected = reference_top(table, metric, 10, where)
+            assert table.top(metric, 10, where) == expected
+            assert table.count(metric, where) == len(reference_top(table, metric, 1000, where))
+
+
+def test_indexes_follow_updates():
+    table = build_table(random.Random(7), players=20)
+    best = table.top("rating", 1)[0]
+    table.upsert({"name": "newcomer", "rating": 9.9, "country": "France"}, "MOUZ")
+    assert table.names[table.top("rating", 1)[0][0]] == "newcomer"
+    assert table.count("rating", table.resolve_filter("MOUZ")) == len(
+        reference_top(table, "rating", 1000, table.resolve_filter("MOUZ"))
+    )
+    table.retain(name for name in table.names if name != "newcomer")
+    assert table.top("rating", 1)[0] == best
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""上游请求调度器: 优先级、保留槽位、提升优先级和取消"""
+
+import asyncio
+
+from nonebot_plugin_hltv.metrics import metrics
+from nonebot_plugin_hltv.scheduler import Priority, RequestScheduler
+
+
+class Holder:
+    """占用一个槽位直到 release"""
+
+    def __init__(self, scheduler: RequestScheduler, priority: Priority, order: list, name: str, tag=None):
+        self.done = asyncio.Event()
+
+        async def run():
+            async with scheduler.slot(priority, tag):
+                order.append(name)
+                await self.done.wait()
+
+        self.task = asyncio.create_task(run())
+
+    def release(self):
+        self.done.set()
+
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+async def test_interactive_runs_before_queued_background():
+    scheduler = RequestScheduler(max_concurrency=1)
+    order = []
+    first = Holder(scheduler, Priority.INTERACTIVE, order, "first")
+    await settle()
+    bulk = Holder(scheduler, Priority.BULK, order, "bulk")
+    prefetch = Holder(scheduler, Priority.PREFETCH, order, "prefetch")
+    interactive = Holder(scheduler, Priority.INTERACTIVE, order, "interactive")
+    await settle()
+    assert order == ["first"]
+    for holder in (first, interactive, prefetch, bulk):
+        holder.release()
+        await settle()
+    assert order == ["first", "interactive", "prefetch", "bulk"]
+
+
+async def test_background_leaves_reserved_slots():
+    scheduler = RequestScheduler(max_concurrency=3)
+    order = []
+    holders = [Holder(scheduler, Priority.BULK, order, f"bulk{i}") for i in range(2)]
+    await settle()
+    # 批量请求留出 2 个空闲槽位, 3 个槽位时只能同时运行 1 个
+    assert order == ["bulk0"]
+    prefetch = [Holder(scheduler, Priority.PREFETCH, order, f"prefetch{i}") for i in range(2)]
+    await settle()
+    # 预取留出 1 个空闲槽位
+    assert order == ["bulk0", "prefetch0"]
+    interactive = Holder(scheduler, Priority.INTERACTIVE, order, "interactive")
+    await settle()
+    assert order[-1] == "interactive" and scheduler.active == 3
+    for holder in holders + prefetch + [interactive]:
+        holder.release()
+    await asyncio.gather(*(h.task for h in holders + prefetch + [interactive]))
+    assert scheduler.active == 0
+
+
+async def test_promote_moves_tagged_request_ahead():
+    scheduler = RequestScheduler(max_concurrency=1)
+    order = []
+    first = Holder(scheduler, Priority.INTERACTIVE, order, "first")
+    await settle()
+    prefetch = Holder(scheduler, Priority.PREFETCH, order, "prefetch")
+    bulk = Holder(scheduler, Priority.BULK, order, "bulk", tag="/api/matches")
+    await settle()
+    depth = dict(metrics.queue_depth)
+    scheduler.promote("/api/matches", Priority.INTERACTIVE)
+    assert metrics.queue_depth["bulk"] == depth["bulk"] - 1
+    assert metrics.queue_depth["interactive"] == depth["interactive"] + 1
+    first.release()
+    await settle()
+    assert order == ["first", "bulk"]
+    bulk.release()
+    prefetch.release()
+    await asyncio.gather(first.task, bulk.task, prefetch.task)
+
+
+async def test_cancelled_waiter_is_dequeued_once():
+    scheduler = RequestScheduler(max_concurrency=1)
+    order = []
+    depth = metrics.queue_depth["interactive"]
+    first = Holder(scheduler, Priority.INTERACTIVE, order, "first")
+    await settle()
+    waiting = Holder(scheduler, Priority.INTERACTIVE, order, "waiting")
+    await settle()
+    assert metrics.queue_depth["interactive"] == depth + 1
+    waiting.task.cancel()
+    # 任务恢复之前调度器已清理掉取消的 waiter
+    scheduler._dispatch()
+    await asyncio.gather(waiting.task, return_exceptions=True)
+    assert metrics.queue_depth["interactive"] == depth
+    first.release()
+    await first.task
+    assert scheduler.active == 0 and order == ["first"]
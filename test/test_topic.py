@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""话题检测: 日常聊天不误报, CS 话题正常命中"""
+
+import pytest
+
+from nonebot_plugin_hltv.topic import TopicDetector
+
+RANKINGS = [
+    {"title": "Vitality", "rank": 1, "points": 1000, "members": ["ZywOo", "apEX", "ropz", "flameZ", "mezii"]},
+    {"title": "Spirit", "rank": 2, "points": 900, "members": ["donk", "sh1ro", "chopper", "zont1x", "magixx"]},
+    {"title": "Natus Vincere", "rank": 3, "points": 800, "members": ["Aleksib", "iM", "b1t", "jL", "w0nderful"]},
+    {"title": "FaZe", "rank": 4, "points": 700, "members": ["karrigan", "rain", "broky", "frozen", "EliGE"]},
+    {"title": "MOUZ", "rank": 5, "points": 600, "members": ["torzsi", "Brollan", "Jimpphat", "xertioN", "Spinx"]},
+    {"title": "BIG", "rank": 10, "points": 300, "members": ["tabseN", "syrsoN", "JDC", "faveN", "Krimbo"]},
+    {"title": "paiN", "rank": 11, "points": 290, "members": ["biguzera", "snow", "nqz", "dav1deuS", "dgt"]},
+    {"title": "Legacy", "rank": 12, "points": 280, "members": ["latto", "dumau", "n1ssim", "saadzin", "lux"]},
+    {"title": "Complexity", "rank": 13, "points": 270, "members": ["hallzerk", "EliGE", "JT", "Grim", "nicx"]},
+    {"title": "Liquid", "rank": 14, "points": 260, "members": ["NAF", "Twistzz", "ultimate", "NertZ", "siuhy"]},
+    {"title": "Imperial", "rank": 15, "points": 250, "members": ["VINI", "felps", "chelo", "try", "decenty"]},
+    {"title": "Monte", "rank": 16, "points": 240, "members": ["DemQQ", "Woro2k", "kRaSnaL", "ryu", "Gizmy"]},
+    {"title": "Eternal Fire", "rank": 17, "points": 230, "members": ["XANTARES", "woxic", "Wicadia", "jottAAA", "MAJ3R"]},
+]
+MATCHES = [
+    {"team1": "Falcons", "team2": "Aurora", "event": "BLAST Premier World Final 2025"},
+    {"team1": "TBD", "team2": "Wildcard", "event": "Unknown"},
+]
+
+CHAT_LINES = [
+    "it's a big deal",
+    "so much pain lol",
+    "rain all day today",
+    "let it snow",
+    "this is legacy code",
+    "monte carlo test",
+    "apex legends anyone",
+    "I'm so frozen, the heater is broken",
+    "we need a chopper for this trip",
+    "team spirit is what matters at work",
+    "the complexity of this algorithm is too high",
+    "imperial units are confusing",
+    "try again later",
+    "that was the ultimate move",
+    "falcons and aurora over the lake",
+    "wildcard entries open today",
+    "eat liquid food and rest",
+    "grim news from the office",
+    "your vitality matters",
+    "今晚吃什么",
+    "小蜜蜂飞到花丛中",
+    "厚德载物",
+    "天生赢家就是我",
+    "明天上午开会，记得带电脑",
+]
+
+CS_LINES = [
+    ("今晚小蜜蜂打 NAVI 谁赢？", {"Vitality", "Natus Vincere"}),
+    ("ZywOo 这波残局太离谱了", {"ZywOo"}),
+    ("donk 和 ropz 谁的 ADR 更高", {"donk", "ropz"}),
+    ("spirit 今天的比赛打得真好", {"Spirit"}),
+    ("BIG vs paiN on hltv", {"BIG", "paiN"}),
+    ("Eternal Fire 进决赛了", {"Eternal Fire"}),
+]
+
+
+@pytest.fixture(scope="module")
+def detector():
+    detector = TopicDetector()
+    detector.load_rankings(RANKINGS)
+    detector.load_matches(MATCHES)
+    return detector
+
+
+@pytest.mark.parametrize("text", CHAT_LINES)
+def test_ordinary_chat_has_no_hits(detector, text):
+    assert detector.detect(text) == []
+
+
+@pytest.mark.parametrize("text,names", CS_LINES)
+def test_cs_chat_hits(detector, text, names):
+    assert {hit.term.name for hit in detector.detect(text)} == names
+
+
+def test_common_word_counts_with_other_topic(detector):
+    hits = detector.detect("FaZe 的 rain 还能打吗")
+    assert {hit.term.name for hit in hits} == {"FaZe", "rain"}
+
+
+def test_generic_terms_are_not_indexed(detector):
+    assert detector.detect("TBD vs unknown in the major") == []
+
+
+def test_len_counts_active_terms():
+    detector = TopicDetector()
+    detector.load_rankings(RANKINGS[:1])
+    # 队名及别名 "小蜜蜂" + 5 名选手及 ZywOo 的别名 "载物"
+    assert len(detector) == 8
+    detector.load_rankings([])
+    assert len(detector) == 0
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""WebUI 测试接口: 压测开关和默认公共 API 的保护"""
+
+import pytest
+
+import nonebot_plugin_hltv.matcher as M
+from nonebot_plugin_hltv import web_ui
+from nonebot_plugin_hltv.loadtest import run_load_test
+
+
+@pytest.fixture
+async def client():
+    config, previous = M.config, M.hltv_client
+    M.hltv_client = None
+    client = M.get_client()
+    calls = []
+
+    async def fetch(endpoint, params=None):
+        calls.append(endpoint)
+        return {"success": True, "data": []}
+
+    client._fetch = fetch
+    client._send = lambda endpoint, params=None, budget=None, observe=True: fetch(endpoint, params)
+    client.calls = calls
+    yield client
+    await client.aclose()
+    M.config, M.hltv_client = config, previous
+
+
+async def test_load_test_disabled_by_default(client):
+    result = await web_ui.test_api(type="matches", concurrency=5, duration=1)
+    assert not result["success"] and "enable_load_test" in result["message"]
+    assert client.calls == []
+
+
+async def test_uncached_load_test_refused_for_default_api(client):
+    M.config = M.config.copy(update={"enable_load_test": True})
+    result = await web_ui.test_api(type="matches", concurrency=5, duration=1, use_cache=False)
+    assert not result["success"] and client.calls == []
+
+
+async def test_single_request_still_allowed(client):
+    result = await web_ui.test_api(type="matches", use_cache=False)
+    assert result["success"] and client.calls == ["/api/matches"]
+
+
+async def test_load_test_limits():
+    async def call():
+        return {"success": True}
+
+    report = await run_load_test(call, concurrency=500, duration=0.2)
+    assert report["concurrency"] == 20